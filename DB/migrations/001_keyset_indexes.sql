@@ -0,0 +1,11 @@
+-- 001_keyset_indexes.sql
+-- Índices para paginación keyset (columna de orden, id) en bases ya creadas.
+SET search_path = restaurant, public;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_created_id ON orders(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_items_created_id ON order_items(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kitchen_tickets_created_id ON kitchen_tickets(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_created_id ON invoices(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_paid_id ON payments(paid_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_created_id ON audit_logs(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_reserved_id ON reservations(reserved_at, id);
@@ -0,0 +1,9 @@
+-- 002_inventory_depletion.sql
+-- Descuento de inventario por receta al preparar/servir líneas de orden.
+SET search_path = restaurant, public;
+
+-- Marca las líneas cuya receta ya se descontó (evita descontar dos veces y permite revertir)
+ALTER TABLE order_items ADD COLUMN IF NOT EXISTS stock_deducted BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Join order_items -> recipe_items por menu_item_id en el UPDATE ... FROM del descuento
+CREATE INDEX IF NOT EXISTS idx_recipe_items_menu_item ON recipe_items(menu_item_id, inventory_id);
@@ -0,0 +1,6 @@
+-- 003_kitchen_indexes.sql
+-- Índices para la pantalla de cocina (/kitchen/orders).
+SET search_path = restaurant, public;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kitchen_tickets_order ON kitchen_tickets(order_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kitchen_tickets_priority ON kitchen_tickets(priority DESC, created_at, id);
@@ -0,0 +1,13 @@
+-- 004_kitchen_ticket_queue.sql
+-- Cola de trabajo de tickets de cocina (claim con SKIP LOCKED, lease, ack/bump).
+SET search_path = restaurant, public;
+
+ALTER TABLE kitchen_tickets ADD COLUMN IF NOT EXISTS station VARCHAR(50);
+ALTER TABLE kitchen_tickets ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(100);
+ALTER TABLE kitchen_tickets ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP WITH TIME ZONE;
+ALTER TABLE kitchen_tickets ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITH TIME ZONE;
+
+-- Solo tickets pendientes, en el orden en que se toman
+CREATE INDEX IF NOT EXISTS idx_kitchen_tickets_queue
+    ON kitchen_tickets(station, priority DESC, created_at, id)
+    WHERE completed_at IS NULL;
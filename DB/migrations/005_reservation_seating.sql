@@ -0,0 +1,25 @@
+-- 005_reservation_seating.sql
+-- Disponibilidad de mesas: fin de cada reserva e índice GiST sobre su intervalo.
+SET search_path = restaurant, public;
+
+ALTER TABLE reservations ADD COLUMN IF NOT EXISTS ends_at TIMESTAMP WITH TIME ZONE;
+-- Reservas existentes: duración por defecto (RESERVATION_DURATION_MINUTES)
+UPDATE reservations SET ends_at = reserved_at + interval '120 minutes' WHERE ends_at IS NULL;
+ALTER TABLE reservations ALTER COLUMN ends_at SET NOT NULL;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+         WHERE conname = 'reservations_ends_after_start'
+           AND conrelid = 'reservations'::regclass
+    ) THEN
+        ALTER TABLE reservations ADD CONSTRAINT reservations_ends_after_start CHECK (ends_at > reserved_at);
+    END IF;
+END
+$$;
+
+-- tstzrange(timestamptz, timestamptz) es inmutable y puede indexarse;
+-- solo las reservas que ocupan la mesa
+CREATE INDEX IF NOT EXISTS idx_reservations_seating
+    ON reservations USING gist (tstzrange(reserved_at, ends_at))
+    WHERE table_id IS NOT NULL AND status IN ('confirmed', 'seated');
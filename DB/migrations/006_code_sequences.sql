@@ -0,0 +1,10 @@
+-- 006_code_sequences.sql
+-- Secuencias para order_code e invoice_number generados en el INSERT (app/codes.py).
+SET search_path = restaurant, public;
+
+-- CACHE: cada conexión reserva un bloque de valores en memoria (menos
+-- escrituras a la secuencia); los códigos no quedan en orden estricto entre
+-- conexiones y los bloques no usados se pierden al cerrar la conexión
+CREATE SEQUENCE IF NOT EXISTS order_code_seq CACHE 20;
+-- Facturas sin CACHE: la numeración solo pierde valores por rollback
+CREATE SEQUENCE IF NOT EXISTS invoice_number_seq;
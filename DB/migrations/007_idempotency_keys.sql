@@ -0,0 +1,17 @@
+-- 007_idempotency_keys.sql
+-- Claves Idempotency-Key de los POST de creación (app/idempotency.py).
+SET search_path = restaurant, public;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope VARCHAR(100) NOT NULL, -- ruta del POST
+    key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL, -- sha256 de método, ruta y cuerpo
+    status_code SMALLINT, -- NULL mientras la petición está en curso
+    response JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+
+-- Desalojo por TTL
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys(expires_at);
@@ -0,0 +1,8 @@
+-- 008_row_versions.sql
+-- Concurrencia optimista (version_id_col + If-Match) en órdenes, líneas y estado de mesa.
+SET search_path = restaurant, public;
+
+-- ADD COLUMN con DEFAULT constante no reescribe la tabla (PostgreSQL >= 11)
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE order_items ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE table_status ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
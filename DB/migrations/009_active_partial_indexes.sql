@@ -0,0 +1,25 @@
+-- 009_active_partial_indexes.sql
+-- Índices parciales WHERE is_active para las tablas con borrado lógico: los
+-- listados (orden por defecto + id para keyset) y las FK más consultadas no
+-- recorren las filas dadas de baja. El ORM agrega "is_active = true" a todos
+-- los SELECT de estas entidades (models.SoftDelete).
+SET search_path = restaurant, public;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_roles_active_name ON roles(name, id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_active_username ON users(username, id) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_active_role ON users(role_id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_active_name ON customers(name, id) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_active_created ON customers(created_at, id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_menu_categories_active_sort ON menu_categories(sort_order, id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_menu_items_active_name ON menu_items(name, id) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_menu_items_active_category ON menu_items(category_id, name, id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_active_name ON inventory(item_name, id) WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_items_active_id ON recipe_items(id) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_items_active_menu_item ON recipe_items(menu_item_id) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recipe_items_active_inventory ON recipe_items(inventory_id) WHERE is_active;
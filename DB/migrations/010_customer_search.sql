@@ -0,0 +1,18 @@
+-- 010_customer_search.sql
+-- Índices para GET /customers/search (crud.search_customers): prefijo de
+-- nombre/email y trigramas para nombre aproximado y fragmentos de teléfono.
+-- Las expresiones deben coincidir con las de la consulta.
+SET search_path = restaurant, public;
+
+-- En public (como en schema.sql), visible con el search_path por defecto de la app
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name_prefix
+    ON customers (lower(name) text_pattern_ops) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_email_prefix
+    ON customers (lower(email) text_pattern_ops) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name_trgm
+    ON customers USING gin (lower(name) gin_trgm_ops) WHERE is_active;
+-- Solo dígitos: "555-1234", "(555) 1234" y "5551234" se buscan igual
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_phone_trgm
+    ON customers USING gin (regexp_replace(phone, '[^0-9]', '', 'g') gin_trgm_ops) WHERE is_active;
@@ -0,0 +1,61 @@
+-- 011_menu_search.sql
+-- Búsqueda de texto del menú (GET /menu_items/search, crud.search_menu_items):
+-- columna tsvector con nombre, código, categoría y descripción, mantenida por
+-- triggers, e índice GIN.
+SET search_path = restaurant, public;
+
+-- "café" y "cafe" deben encontrarse igual
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public;
+
+-- Configuración 'simple' (sin stemming): el menú mezcla idiomas y la búsqueda
+-- por prefijo mientras se escribe no debe depender de la raíz de cada palabra.
+-- Pesos: A nombre y código, B categoría, C descripción (ts_rank los usa).
+CREATE OR REPLACE FUNCTION menu_item_search_document(
+    p_name TEXT, p_code TEXT, p_description TEXT, p_category_id UUID
+) RETURNS tsvector
+LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('simple', public.unaccent(coalesce(p_name, ''))), 'A')
+        || setweight(to_tsvector('simple', coalesce(p_code, '')), 'A')
+        || setweight(to_tsvector('simple', public.unaccent(coalesce(
+               (SELECT c.name FROM restaurant.menu_categories c WHERE c.id = p_category_id), ''))), 'B')
+        || setweight(to_tsvector('simple', public.unaccent(coalesce(p_description, ''))), 'C')
+$$;
+
+ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION menu_items_search_vector_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := menu_item_search_document(NEW.name, NEW.code, NEW.description, NEW.category_id);
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS menu_items_search_vector ON menu_items;
+CREATE TRIGGER menu_items_search_vector
+    BEFORE INSERT OR UPDATE OF name, code, description, category_id ON menu_items
+    FOR EACH ROW EXECUTE FUNCTION menu_items_search_vector_trg();
+
+-- Renombrar una categoría actualiza el documento de sus platos
+CREATE OR REPLACE FUNCTION menu_categories_search_vector_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE menu_items
+       SET search_vector = menu_item_search_document(name, code, description, category_id)
+     WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS menu_categories_search_vector ON menu_categories;
+CREATE TRIGGER menu_categories_search_vector
+    AFTER UPDATE OF name ON menu_categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION menu_categories_search_vector_trg();
+
+UPDATE menu_items
+   SET search_vector = menu_item_search_document(name, code, description, category_id)
+ WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_menu_items_search
+    ON menu_items USING gin (search_vector) WHERE is_active;
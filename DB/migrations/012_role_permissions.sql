@@ -0,0 +1,29 @@
+-- 012_role_permissions.sql
+-- Permisos por rol como bitset (app/auth/permissions.py, enum Permission) y
+-- versión de permisos que viaja en el access token ("rv").
+SET search_path = restaurant, public;
+
+ALTER TABLE roles ADD COLUMN IF NOT EXISTS permissions INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE roles ADD COLUMN IF NOT EXISTS perm_version INTEGER NOT NULL DEFAULT 1;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+         WHERE conname = 'roles_permissions_range'
+           AND conrelid = 'roles'::regclass
+    ) THEN
+        ALTER TABLE roles ADD CONSTRAINT roles_permissions_range CHECK (permissions BETWEEN 0 AND 1023);
+    END IF;
+END
+$$;
+
+-- Bits: 1 usuarios/roles, 2 clientes, 4 mesas, 8 reservas, 16 menú,
+-- 32 inventario/recetas, 64 pedidos, 128 cocina, 256 facturas/pagos, 512 auditoría
+UPDATE roles SET permissions = CASE name
+    WHEN 'Administrador' THEN 1023
+    WHEN 'Mesero' THEN 2 | 4 | 8 | 64
+    WHEN 'Cocina' THEN 64 | 128
+    WHEN 'Cajero' THEN 2 | 64 | 256
+    ELSE permissions
+END
+WHERE permissions = 0;
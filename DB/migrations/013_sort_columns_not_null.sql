@@ -0,0 +1,50 @@
+-- 013_sort_columns_not_null.sql
+-- NOT NULL en las columnas que son clave de orden de los listados
+-- (app/pagination.py). La paginación keyset compara (columna, id) contra la
+-- última fila de la página anterior; con un NULL la comparación no es
+-- verdadera y esas filas no aparecen en ninguna página.
+-- Los DEFAULT ya cubren las filas nuevas: se completan las viejas y se fija
+-- la restricción (SET NOT NULL recorre la tabla con lock exclusivo).
+SET search_path = restaurant, public;
+
+UPDATE roles SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE roles ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE users SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE users ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE customers SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE customers ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE reservations SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE reservations ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE menu_categories SET sort_order = coalesce(sort_order, 0), created_at = coalesce(created_at, now())
+ WHERE sort_order IS NULL OR created_at IS NULL;
+ALTER TABLE menu_categories ALTER COLUMN sort_order SET NOT NULL, ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE menu_items SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE menu_items ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE inventory SET last_updated = now() WHERE last_updated IS NULL;
+ALTER TABLE inventory ALTER COLUMN last_updated SET NOT NULL;
+
+UPDATE orders SET created_at = coalesce(created_at, updated_at, now()), updated_at = coalesce(updated_at, created_at, now())
+ WHERE created_at IS NULL OR updated_at IS NULL;
+ALTER TABLE orders ALTER COLUMN created_at SET NOT NULL, ALTER COLUMN updated_at SET NOT NULL;
+
+UPDATE order_items SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE order_items ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE kitchen_tickets SET priority = coalesce(priority, 0), created_at = coalesce(created_at, now())
+ WHERE priority IS NULL OR created_at IS NULL;
+ALTER TABLE kitchen_tickets ALTER COLUMN priority SET NOT NULL, ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE invoices SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE invoices ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE payments SET paid_at = now() WHERE paid_at IS NULL;
+ALTER TABLE payments ALTER COLUMN paid_at SET NOT NULL;
+
+UPDATE audit_logs SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE audit_logs ALTER COLUMN created_at SET NOT NULL;
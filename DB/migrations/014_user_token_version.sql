@@ -0,0 +1,7 @@
+-- 014_user_token_version.sql
+-- Versión de los tokens de cada usuario ("uv" en el access token, ver
+-- app/auth/permissions.py): se incrementa al cambiarle el rol o darlo de
+-- baja, y los tokens emitidos antes se rechazan.
+SET search_path = restaurant, public;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 1;
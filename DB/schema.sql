@@ -3,6 +3,8 @@
 
 -- 1) Extensiones útiles
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";  -- para gen_random_uuid()
+CREATE EXTENSION IF NOT EXISTS pg_trgm;     -- búsqueda de clientes por trigramas
+CREATE EXTENSION IF NOT EXISTS unaccent;    -- búsqueda del menú sin acentos
 
 -- 2) Esquema base
 CREATE SCHEMA IF NOT EXISTS restaurant;
@@ -13,8 +15,10 @@ CREATE TABLE roles (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(32) NOT NULL UNIQUE,
     description TEXT,
+    permissions INTEGER NOT NULL DEFAULT 0 CHECK (permissions BETWEEN 0 AND 1023), -- bitset de Permission
+    perm_version INTEGER NOT NULL DEFAULT 1, -- versión de permisos en el access token
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE users (
@@ -25,8 +29,9 @@ CREATE TABLE users (
     full_name VARCHAR(255),
     role_id UUID NOT NULL REFERENCES roles(id) ON DELETE RESTRICT,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-    last_login TIMESTAMP WITH TIME ZONE
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    last_login TIMESTAMP WITH TIME ZONE,
+    token_version INTEGER NOT NULL DEFAULT 1 -- versión de los tokens del usuario ("uv")
 );
 
 CREATE TABLE customers (
@@ -36,7 +41,7 @@ CREATE TABLE customers (
     email VARCHAR(255),
     notes TEXT,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE tables (
@@ -54,6 +59,7 @@ CREATE TABLE table_status (
     status VARCHAR(32) NOT NULL, -- 'free','occupied','reserved','cleaning'
     updated_by UUID REFERENCES users(id) ON DELETE SET NULL,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    version INTEGER NOT NULL DEFAULT 1, -- concurrencia optimista (If-Match)
     UNIQUE (table_id)
 );
 
@@ -61,21 +67,23 @@ CREATE TABLE reservations (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     customer_id UUID REFERENCES customers(id) ON DELETE SET NULL,
     reserved_at TIMESTAMP WITH TIME ZONE NOT NULL, -- fecha y hora reservada
+    ends_at TIMESTAMP WITH TIME ZONE NOT NULL, -- fin de la ocupación de la mesa
     people_smallint SMALLINT NOT NULL CHECK (people_smallint > 0),
     table_id UUID REFERENCES tables(id) ON DELETE SET NULL,
     status VARCHAR(32) NOT NULL DEFAULT 'confirmed', -- confirmed, cancelled, seated, no_show
     notes TEXT,
     created_by UUID REFERENCES users(id) ON DELETE SET NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    CHECK (ends_at > reserved_at)
 );
 
 CREATE TABLE menu_categories (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(100) NOT NULL UNIQUE,
     description TEXT,
-    sort_order INTEGER DEFAULT 0,
+    sort_order INTEGER NOT NULL DEFAULT 0,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE menu_items (
@@ -89,7 +97,8 @@ CREATE TABLE menu_items (
     is_available BOOLEAN DEFAULT TRUE,
     is_active BOOLEAN DEFAULT TRUE,
     requires_kitchen BOOLEAN DEFAULT TRUE, -- bebidas false, platos true
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    search_vector tsvector, -- mantenida por el trigger menu_items_search_vector
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE inventory (
@@ -100,7 +109,7 @@ CREATE TABLE inventory (
     quantity NUMERIC(12,3) DEFAULT 0,
     minimum_stock NUMERIC(12,3) DEFAULT 0,
     is_active BOOLEAN DEFAULT TRUE,
-    last_updated TIMESTAMP WITH TIME ZONE DEFAULT now()
+    last_updated TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE recipe_items (
@@ -112,6 +121,10 @@ CREATE TABLE recipe_items (
     unit VARCHAR(20)
 );
 
+-- Códigos generados en el INSERT por la API (app/codes.py)
+CREATE SEQUENCE order_code_seq CACHE 20;
+CREATE SEQUENCE invoice_number_seq;
+
 CREATE TABLE orders (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     order_code VARCHAR(50) UNIQUE,
@@ -120,8 +133,9 @@ CREATE TABLE orders (
     created_by UUID REFERENCES users(id) ON DELETE SET NULL,
     status VARCHAR(32) NOT NULL DEFAULT 'pending',
     is_takeaway BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    version INTEGER NOT NULL DEFAULT 1 -- concurrencia optimista (If-Match)
 );
 
 CREATE TABLE order_items (
@@ -133,15 +147,21 @@ CREATE TABLE order_items (
     tax_rate NUMERIC(4,2) DEFAULT 0.00,
     notes TEXT,
     status VARCHAR(32) DEFAULT 'pending',
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    stock_deducted BOOLEAN NOT NULL DEFAULT FALSE, -- receta descontada del inventario
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    version INTEGER NOT NULL DEFAULT 1 -- concurrencia optimista (If-Match)
 );
 
 CREATE TABLE kitchen_tickets (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     order_id UUID REFERENCES orders(id) ON DELETE CASCADE,
     printed BOOLEAN DEFAULT FALSE,
-    priority INTEGER DEFAULT 0,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    priority INTEGER NOT NULL DEFAULT 0,
+    station VARCHAR(50), -- NULL = cualquier estación
+    claimed_by VARCHAR(100),
+    claimed_until TIMESTAMP WITH TIME ZONE, -- lease de la estación que lo tomó
+    completed_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
 CREATE TABLE invoices (
@@ -154,7 +174,7 @@ CREATE TABLE invoices (
     discount_amount NUMERIC(12,2) NOT NULL DEFAULT 0 CHECK (discount_amount >= 0),
     total NUMERIC(12,2) NOT NULL CHECK (total >= 0),
     created_by UUID REFERENCES users(id) ON DELETE SET NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
     paid BOOLEAN DEFAULT FALSE
 );
 
@@ -164,7 +184,7 @@ CREATE TABLE payments (
     method VARCHAR(50) NOT NULL,
     amount NUMERIC(12,2) NOT NULL CHECK (amount > 0),
     transaction_ref VARCHAR(255),
-    paid_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    paid_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
     created_by UUID REFERENCES users(id) ON DELETE SET NULL
 );
 
@@ -177,19 +197,114 @@ CREATE TABLE audit_logs (
     new_data JSONB,
     performed_by UUID REFERENCES users(id) ON DELETE SET NULL,
     reason TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
 );
 
+-- Idempotency-Key de los POST de creación (app/idempotency.py)
+CREATE TABLE idempotency_keys (
+    scope VARCHAR(100) NOT NULL, -- ruta del POST
+    key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL, -- sha256 de método, ruta y cuerpo
+    status_code SMALLINT, -- NULL mientras la petición está en curso
+    response JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+
+-- Búsqueda de texto del menú (crud.search_menu_items)
+-- Configuración 'simple' (sin stemming): el menú mezcla idiomas y la búsqueda
+-- por prefijo mientras se escribe no debe depender de la raíz de cada palabra.
+-- Pesos: A nombre y código, B categoría, C descripción (ts_rank los usa).
+CREATE OR REPLACE FUNCTION menu_item_search_document(
+    p_name TEXT, p_code TEXT, p_description TEXT, p_category_id UUID
+) RETURNS tsvector
+LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('simple', public.unaccent(coalesce(p_name, ''))), 'A')
+        || setweight(to_tsvector('simple', coalesce(p_code, '')), 'A')
+        || setweight(to_tsvector('simple', public.unaccent(coalesce(
+               (SELECT c.name FROM restaurant.menu_categories c WHERE c.id = p_category_id), ''))), 'B')
+        || setweight(to_tsvector('simple', public.unaccent(coalesce(p_description, ''))), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION menu_items_search_vector_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := menu_item_search_document(NEW.name, NEW.code, NEW.description, NEW.category_id);
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER menu_items_search_vector
+    BEFORE INSERT OR UPDATE OF name, code, description, category_id ON menu_items
+    FOR EACH ROW EXECUTE FUNCTION menu_items_search_vector_trg();
+
+-- Renombrar una categoría actualiza el documento de sus platos
+CREATE OR REPLACE FUNCTION menu_categories_search_vector_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE menu_items
+       SET search_vector = menu_item_search_document(name, code, description, category_id)
+     WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER menu_categories_search_vector
+    AFTER UPDATE OF name ON menu_categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION menu_categories_search_vector_trg();
+
 CREATE INDEX idx_orders_status ON orders(status);
 CREATE INDEX idx_order_items_order ON order_items(order_id);
 CREATE INDEX idx_menu_items_name ON menu_items(name);
 CREATE INDEX idx_reservations_reserved_at ON reservations(reserved_at);
+CREATE INDEX idx_recipe_items_menu_item ON recipe_items(menu_item_id, inventory_id);
+CREATE INDEX idx_kitchen_tickets_order ON kitchen_tickets(order_id);
+CREATE INDEX idx_kitchen_tickets_priority ON kitchen_tickets(priority DESC, created_at, id);
+CREATE INDEX idx_kitchen_tickets_queue ON kitchen_tickets(station, priority DESC, created_at, id) WHERE completed_at IS NULL;
+CREATE INDEX idx_reservations_seating ON reservations USING gist (tstzrange(reserved_at, ends_at))
+    WHERE table_id IS NOT NULL AND status IN ('confirmed', 'seated');
+
+-- Índices para paginación keyset (columna de orden, id)
+CREATE INDEX idx_orders_created_id ON orders(created_at, id);
+CREATE INDEX idx_order_items_created_id ON order_items(created_at, id);
+CREATE INDEX idx_kitchen_tickets_created_id ON kitchen_tickets(created_at, id);
+CREATE INDEX idx_invoices_created_id ON invoices(created_at, id);
+CREATE INDEX idx_payments_paid_id ON payments(paid_at, id);
+CREATE INDEX idx_audit_logs_created_id ON audit_logs(created_at, id);
+CREATE INDEX idx_reservations_reserved_id ON reservations(reserved_at, id);
+CREATE INDEX idx_idempotency_keys_expires ON idempotency_keys(expires_at);
+
+-- Índices parciales de filas activas (borrado lógico con is_active)
+CREATE INDEX idx_roles_active_name ON roles(name, id) WHERE is_active;
+CREATE INDEX idx_users_active_username ON users(username, id) WHERE is_active;
+CREATE INDEX idx_users_active_role ON users(role_id) WHERE is_active;
+CREATE INDEX idx_customers_active_name ON customers(name, id) WHERE is_active;
+CREATE INDEX idx_customers_active_created ON customers(created_at, id) WHERE is_active;
+CREATE INDEX idx_menu_categories_active_sort ON menu_categories(sort_order, id) WHERE is_active;
+CREATE INDEX idx_menu_items_active_name ON menu_items(name, id) WHERE is_active;
+CREATE INDEX idx_menu_items_active_category ON menu_items(category_id, name, id) WHERE is_active;
+CREATE INDEX idx_inventory_active_name ON inventory(item_name, id) WHERE is_active;
+CREATE INDEX idx_recipe_items_active_id ON recipe_items(id) WHERE is_active;
+CREATE INDEX idx_recipe_items_active_menu_item ON recipe_items(menu_item_id) WHERE is_active;
+CREATE INDEX idx_recipe_items_active_inventory ON recipe_items(inventory_id) WHERE is_active;
+
+-- Búsqueda de clientes (crud.search_customers)
+CREATE INDEX idx_customers_name_prefix ON customers (lower(name) text_pattern_ops) WHERE is_active;
+CREATE INDEX idx_customers_email_prefix ON customers (lower(email) text_pattern_ops) WHERE is_active;
+CREATE INDEX idx_customers_name_trgm ON customers USING gin (lower(name) gin_trgm_ops) WHERE is_active;
+CREATE INDEX idx_customers_phone_trgm ON customers USING gin (regexp_replace(phone, '[^0-9]', '', 'g') gin_trgm_ops) WHERE is_active;
+
+-- Búsqueda de texto del menú (crud.search_menu_items)
+CREATE INDEX idx_menu_items_search ON menu_items USING gin (search_vector) WHERE is_active;
 
-INSERT INTO roles (name, description) VALUES
-('Administrador','Acceso total al sistema'),
-('Mesero','Toma pedidos y atiende mesas'),
-('Cocina','Recibe pedidos para preparar'),
-('Cajero','Gestiona facturacion y pagos')
+-- permissions: bits de app/auth/permissions.Permission (ver migración 012)
+INSERT INTO roles (name, description, permissions) VALUES
+('Administrador','Acceso total al sistema', 1023),
+('Mesero','Toma pedidos y atiende mesas', 2 | 4 | 8 | 64),
+('Cocina','Recibe pedidos para preparar', 64 | 128),
+('Cajero','Gestiona facturacion y pagos', 2 | 64 | 256)
 ON CONFLICT (name) DO NOTHING;
 
 INSERT INTO users (username, email, password_hash, full_name, role_id)
@@ -1,12 +1,141 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Costo de Argon2 configurable; los hashes con otros parámetros se
+# regeneran en el siguiente login exitoso (needs_update / verify_and_update)
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class HashingBusy(Exception):
+    """
+    Hay demasiados hashes en curso o en espera; la API responde 503.
+    """
+
+
+# ----------------------------
+# Funciones que corren en el pool de procesos
+# ----------------------------
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _noop():
+    return None
+
+
+# ----------------------------
+# Pool de procesos y admisión
+# ----------------------------
+class _HashPool:
+    """
+    Ejecuta Argon2 en un pool de procesos acotado (HASH_WORKERS), fuera de
+    los hilos del threadpool y sin retener el GIL de la API.
+
+    La admisión limita el trabajo de autenticación: como máximo
+    HASH_MAX_CONCURRENCY hashes en curso y HASH_MAX_PENDING peticiones entre
+    en curso y en espera. Las demás reciben HashingBusy de inmediato, así
+    una ráfaga de logins no ocupa todo el threadpool ni frena los pedidos.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(settings.HASH_MAX_CONCURRENCY)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: los procesos hijos no heredan hilos ni conexiones del worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    @contextmanager
+    def _admission(self):
+        with self._pending_lock:
+            if self._pending >= settings.HASH_MAX_PENDING:
+                raise HashingBusy()
+            self._pending += 1
+        try:
+            if not self._slots.acquire(timeout=settings.HASH_QUEUE_TIMEOUT_SECONDS):
+                raise HashingBusy()
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def run(self, fn, *args):
+        with self._admission():
+            # HASH_WORKERS=0: en el mismo proceso (desarrollo)
+            if settings.HASH_WORKERS <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+
+    def warmup(self):
+        # Arranca los procesos antes del primer login (spawn tarda)
+        if settings.HASH_WORKERS <= 0:
+            return
+        try:
+            executor = self._get_executor()
+            for future in [executor.submit(_noop) for _ in range(settings.HASH_WORKERS)]:
+                future.result()
+        except Exception as exc:
+            logger.warning("No se pudo iniciar el pool de hashing: %s", exc)
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hash_pool = _HashPool()
+
 
 class Hasher:
     @staticmethod
     def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
+        return hash_pool.run(_hash, password)
 
     @staticmethod
     def verify_password(password: str, hashed: str) -> bool:
-        return pwd_context.verify(password, hashed)
+        return hash_pool.run(_verify, password, hashed)
+
+    @staticmethod
+    def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica y, si el hash usa parámetros viejos, devuelve también el
+        hash nuevo para guardarlo (None si no hace falta).
+        """
+        return hash_pool.run(_verify_and_update, password, hashed)
@@ -8,18 +8,31 @@ from app.core.config import settings
 # FUNCIONES DE JWT
 # ========================
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, role=None, user=None) -> str:
     """
     Crea un JWT de acceso con expiración.
 
+    Incluye los claims de autorización (ver app/auth/permissions.py): "perm"
+    (bitset de permisos), "rid" y "rv" (id del rol y versión de sus permisos
+    al emitir el token), "uid" y "uv" (id del usuario y su token_version).
+
     Args:
         data (dict): Datos a codificar en el token (ej. {"sub": username})
         expires_delta (timedelta, optional): Tiempo de expiración del token.
+        role (models.Role, optional): Rol del usuario; sin rol o con el rol
+            dado de baja, "perm" es 0.
+        user (models.User, optional): Usuario dueño del token.
 
     Returns:
         str: Token JWT codificado
     """
     to_encode = data.copy()
+    active_role = role is not None and role.is_active is not False
+    to_encode["perm"] = int(role.permissions or 0) if active_role else 0
+    if role is not None:
+        to_encode.update({"rid": str(role.id), "rv": role.perm_version})
+    if user is not None:
+        to_encode.update({"uid": str(user.id), "uv": user.token_version})
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import TIMESTAMP, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# last_login con escritura diferida
+# ----------------------------
+class LastLoginBuffer:
+    """
+    Acumula los last_login de los logins y los escribe en lote.
+
+    Varios logins del mismo usuario entre dos flush se reducen a uno (el más
+    reciente). Cada flush es un único UPDATE ... FROM (VALUES ...) por lote
+    de LAST_LOGIN_BATCH_SIZE filas, cada LAST_LOGIN_FLUSH_SECONDS o antes si
+    el buffer se llena. Si la escritura falla, el lote vuelve al buffer.
+
+    Mientras la tarea no está corriendo (scripts, arranque), record() devuelve
+    False y el llamador escribe last_login directamente.
+    """
+
+    def __init__(self):
+        self._pending: Dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, user_id: uuid.UUID, at: datetime) -> bool:
+        if not self.running:
+            return False
+        with self._lock:
+            self._merge(user_id, at)
+            full = len(self._pending) >= settings.LAST_LOGIN_BATCH_SIZE
+        if full:
+            # record() corre en el threadpool: se despierta al flusher en su loop
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def _merge(self, user_id: uuid.UUID, at: datetime):
+        current = self._pending.get(user_id)
+        if current is None or at > current:
+            self._pending[user_id] = at
+
+    def _take(self) -> Dict[uuid.UUID, datetime]:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def flush(self):
+        """
+        Escribe lo acumulado (sync; se ejecuta en el threadpool).
+        """
+        batch = self._take()
+        if not batch:
+            return
+        items = list(batch.items())
+        try:
+            with SessionLocal() as db:
+                for start in range(0, len(items), settings.LAST_LOGIN_BATCH_SIZE):
+                    db.execute(last_login_update_stmt(items[start:start + settings.LAST_LOGIN_BATCH_SIZE]))
+                db.commit()
+        except Exception as exc:
+            logger.warning("No se pudo guardar last_login de %d usuarios: %s", len(items), exc)
+            with self._lock:
+                for user_id, at in items:
+                    self._merge(user_id, at)
+
+    # ----------------------------
+    # Ciclo de vida
+    # ----------------------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Lo que quedó en el buffer se escribe antes de apagar
+        await run_in_threadpool(self.flush)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.LAST_LOGIN_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await run_in_threadpool(self.flush)
+
+
+def last_login_update_stmt(items):
+    """
+    UPDATE users SET last_login = v.last_login FROM (VALUES ...) v WHERE users.id = v.id
+    """
+    rows = values(
+        column("id", UUID(as_uuid=True)),
+        column("last_login", TIMESTAMP),
+        name="v",
+    ).data(items)
+    return (
+        update(models.User)
+        .where(models.User.id == rows.c.id)
+        .values(last_login=rows.c.last_login)
+        .execution_options(synchronize_session=False)
+    )
+
+
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,199 @@
+import asyncio
+import enum
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+
+from app import models
+from app.auth.jwt_handler import decode_token
+from app.core.config import settings
+from app.database import SessionLocal
+from app.notify_bus import affects, bus
+
+logger = logging.getLogger(__name__)
+
+# Métodos que solo leen: piden el permiso de lectura de la ruta
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# auto_error=False: con RBAC_ENFORCE apagado las rutas siguen sin exigir token
+_bearer = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+
+# ----------------------------
+# Permisos (bitset por rol)
+# ----------------------------
+class Permission(enum.IntFlag):
+    """
+    Un bit por área. Los valores se guardan en roles.permissions y viajan en
+    el claim "perm" del access token: no se deben renumerar.
+    """
+    NONE = 0
+    USERS = 1 << 0          # usuarios y roles
+    CUSTOMERS = 1 << 1
+    TABLES = 1 << 2         # mesas y su estado
+    RESERVATIONS = 1 << 3
+    MENU = 1 << 4           # alta y cambios del menú (leerlo solo pide token)
+    INVENTORY = 1 << 5      # inventario y recetas
+    ORDERS = 1 << 6         # pedidos y sus ítems
+    KITCHEN = 1 << 7        # tickets y cola de cocina
+    BILLING = 1 << 8        # facturas y pagos
+    AUDIT = 1 << 9
+
+    ALL = (1 << 10) - 1
+
+
+# ----------------------------
+# Versiones de los tokens (por rol y por usuario)
+# ----------------------------
+class TokenVersions:
+    """
+    Última versión conocida de cada rol (roles.perm_version) o usuario
+    (users.token_version).
+
+    El token lleva las versiones con las que se emitió ("rv" del rol, "uv"
+    del usuario); si el rol o el usuario cambió después, la versión local es
+    mayor y el token se rechaza sin consultar la base de datos. Se llena al
+    arrancar, en login/refresh y con los cambios (locales o de otros
+    workers, vía bus).
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: Any, version: int):
+        # Las versiones solo crecen: un evento atrasado no la hace retroceder
+        key = str(key)
+        with self._lock:
+            if version > self._versions.get(key, 0):
+                self._versions[key] = version
+
+    def is_stale(self, key: Any, version: int) -> bool:
+        return version < self._versions.get(str(key), 0)
+
+
+role_versions = TokenVersions()
+user_versions = TokenVersions()
+
+
+def load_token_versions():
+    """
+    Carga las versiones de todos los roles y de los usuarios con tokens
+    revocados (se llama al arrancar y tras un resync del bus). Si la base de
+    datos no responde, la API arranca igual y las versiones se conocen con
+    el primer login o cambio.
+    """
+    try:
+        with SessionLocal() as db:
+            roles = db.execute(
+                select(models.Role.id, models.Role.perm_version).execution_options(include_inactive=True)
+            ).all()
+            # token_version = 1 es el valor inicial: no invalida nada
+            users = db.execute(
+                select(models.User.id, models.User.token_version)
+                .where(models.User.token_version > 1)
+                .execution_options(include_inactive=True)
+            ).all()
+    except Exception as exc:
+        logger.warning("No se pudieron cargar las versiones de permisos: %s", exc)
+        return
+    for role_id, version in roles:
+        role_versions.observe(role_id, version)
+    for user_id, version in users:
+        user_versions.observe(user_id, version)
+
+
+def role_changed(role):
+    """
+    Se llama desde crud después del commit que cambia los permisos de un rol
+    o lo da de baja.
+    """
+    role_versions.observe(role.id, role.perm_version)
+    bus.notify({"entity": "role", "action": "updated", "id": str(role.id), "rv": role.perm_version})
+
+
+def user_token_revoked(user):
+    """
+    Se llama desde crud después del commit que cambia el rol de un usuario o
+    lo da de baja: sus tokens emitidos antes dejan de valer.
+    """
+    user_versions.observe(user.id, user.token_version)
+    bus.notify({"entity": "user", "action": "revoked", "id": str(user.id), "uv": user.token_version})
+
+
+@bus.on_remote
+def _on_remote_change(event):
+    if event.get("entity") == "*":
+        # Pudo perderse algún cambio mientras el bus estuvo desconectado
+        asyncio.get_running_loop().run_in_executor(None, load_token_versions)
+        return
+    if affects(event, "role") and event.get("id") and event.get("rv"):
+        role_versions.observe(event["id"], int(event["rv"]))
+    if affects(event, "user") and event.get("id") and event.get("uv"):
+        user_versions.observe(event["id"], int(event["uv"]))
+
+
+# ----------------------------
+# Claims del access token
+# ----------------------------
+def token_permissions(payload: Dict[str, Any]) -> Permission:
+    """
+    Permisos de un token ya verificado. Un token emitido antes de un cambio
+    de permisos de su rol, o de un cambio de rol o baja del usuario, se
+    rechaza: el cliente debe renovarlo con /auth/refresh-token, que lee los
+    permisos vigentes.
+    """
+    if "perm" not in payload:
+        # Solo los access tokens llevan permisos (no se acepta un refresh token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    role_id, role_version = payload.get("rid"), payload.get("rv")
+    user_id, user_version = payload.get("uid"), payload.get("uv")
+    if (
+        (role_id is not None and role_version is not None and role_versions.is_stale(role_id, int(role_version)))
+        or (user_id is not None and user_version is not None and user_versions.is_stale(user_id, int(user_version)))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Permisos desactualizados: renueve el token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Permission(int(payload.get("perm", 0)) & Permission.ALL)
+
+
+# ----------------------------
+# Dependencia de autorización
+# ----------------------------
+def authorize(write: Permission, read: Optional[Permission] = None):
+    """
+    Dependencia para include_router(..., dependencies=[...]): exige `write`
+    en las escrituras y `read` (por defecto el mismo permiso) en las lecturas.
+
+    Solo usa los claims del token firmado; no consulta la base de datos.
+    Con RBAC_ENFORCE apagado no exige nada (compatibilidad con clientes
+    que todavía no envían el token).
+    """
+    read = write if read is None else read
+
+    def _authorize(request: Request, token: Optional[str] = Depends(_bearer)):
+        if not settings.RBAC_ENFORCE:
+            return
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="No autenticado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        granted = token_permissions(decode_token(token))
+        required = read if request.method in SAFE_METHODS else write
+        if granted & required != required:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permiso insuficiente")
+
+    return _authorize
@@ -0,0 +1,100 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from app.core.config import settings
+from app.notify_bus import affects, bus
+
+
+# ----------------------------
+# Identidad del usuario autenticado
+# ----------------------------
+class Principal(NamedTuple):
+    """
+    Snapshot de la identidad detrás de un token (sub = username).
+    """
+    id: uuid.UUID
+    username: str
+    role: Optional[str]
+    is_active: bool
+
+
+# ----------------------------
+# Caché token -> Principal
+# ----------------------------
+class PrincipalCache:
+    """
+    Caché en proceso de sub -> Principal, acotada (LRU) y con TTL.
+
+    Con la entrada vigente, una petición autenticada no consulta la base de
+    datos. Los cambios de usuario o rol la invalidan explícitamente (también
+    en los demás workers, vía bus); el TTL acota lo que puede durar un dato
+    viejo si se pierde una invalidación. Igual que VersionedCache, una carga
+    que se cruza con una invalidación se devuelve pero no se guarda.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Principal]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, subject: str, loader: Callable[[], Optional[Principal]]) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(subject)
+            if cached is not None and cached[0] > now:
+                self._entries.move_to_end(subject)
+                return cached[1]
+            generation = self._generation
+
+        principal = loader()
+        # Los "no encontrado" no se guardan: el usuario puede crearse después
+        if principal is None:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                self._entries[subject] = (now + self.ttl_seconds, principal)
+                self._entries.move_to_end(subject)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: Optional[uuid.UUID] = None):
+        """
+        Descarta las entradas del usuario indicado, o todas si es None.
+        """
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+                return
+            stale = [sub for sub, (_, principal) in self._entries.items() if principal.id == user_id]
+            for sub in stale:
+                del self._entries[sub]
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: Optional[uuid.UUID] = None):
+    """
+    Se llama desde crud después del commit que cambia un usuario (o un rol,
+    con user_id=None).
+    """
+    principal_cache.invalidate(user_id)
+    bus.notify({"entity": "user", "action": "invalidated", "id": str(user_id) if user_id else None})
+
+
+@bus.on_remote
+def _on_remote_change(event):
+    if not affects(event, "user"):
+        return
+    raw_id = event.get("id")
+    try:
+        principal_cache.invalidate(uuid.UUID(raw_id) if raw_id else None)
+    except ValueError:
+        principal_cache.invalidate()
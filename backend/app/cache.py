@@ -0,0 +1,142 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+# ----------------------------
+# Entrada cacheada
+# ----------------------------
+class CachedEntry(NamedTuple):
+    data: Any       # Objetos originales (para búsquedas en memoria)
+    body: bytes     # JSON ya serializado
+    etag: str       # ETag fuerte de esta entrada
+    headers: Optional[Dict[str, str]] = None  # Cabeceras extra (ej. X-Next-Cursor)
+
+
+# ----------------------------
+# Caché versionada en memoria
+# ----------------------------
+class VersionedCache:
+    """
+    Caché en proceso invalidada por número de versión.
+
+    Cada escritura relevante llama a invalidate(), que incrementa la versión y
+    descarta las entradas. Las lecturas se sirven desde memoria con el JSON ya
+    serializado y un ETag derivado del contenido (igual en todos los workers),
+    de modo que un cliente con el ETag vigente recibe 304 sin tocar la base
+    de datos.
+
+    Las claves dependen de la petición (filtros, limit, cursor, sort): se
+    guardan como máximo CACHE_MAX_ENTRIES y se descartan las menos usadas.
+    """
+
+    def __init__(self, name: str, max_entries: Optional[int] = None):
+        self.name = name
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self._version = 0
+        self._entries: "OrderedDict[Hashable, CachedEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _etag(self, body: bytes, headers: Optional[Dict[str, str]]) -> str:
+        digest = hashlib.sha256(body)
+        if headers:
+            digest.update(json.dumps(headers, sort_keys=True).encode())
+        return f'"{self.name}-{digest.hexdigest()[:32]}"'
+
+    def _get(self, key: Hashable) -> Optional[CachedEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> CachedEntry:
+        """
+        Devuelve la entrada cacheada para `key` o la carga con `loader`.
+
+        Si la versión cambia mientras se carga, el resultado se devuelve pero
+        no se guarda, para no publicar datos anteriores a la invalidación.
+        Tampoco se guardan las cargas que devuelven None (ej. id inexistente).
+        """
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+
+        version = self._version
+        data = loader()
+        return self._store(key, version, data)
+
+    def get_or_load_page(self, key: Hashable, loader: Callable[[], Tuple[Any, Optional[str]]]) -> CachedEntry:
+        """
+        Igual que get_or_load para listados paginados: `loader` devuelve
+        (filas, next_cursor) y el cursor se guarda como cabecera de la entrada.
+        """
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+
+        version = self._version
+        data, next_cursor = loader()
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return self._store(key, version, data, headers)
+
+    def _store(self, key: Hashable, version: int, data: Any, headers: Optional[Dict[str, str]] = None) -> CachedEntry:
+        body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+        entry = CachedEntry(data=data, body=body, etag=self._etag(body, headers), headers=headers)
+        with self._lock:
+            if data is not None and version == self._version:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> CachedEntry:
+        """
+        Igual que get_or_load, con un loader async (AsyncSession).
+        """
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+
+        version = self._version
+        data = await loader()
+        return self._store(key, version, data)
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+
+# ----------------------------
+# Respuestas con ETag
+# ----------------------------
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_response(request: Request, entry: CachedEntry) -> Response:
+    """
+    Devuelve 304 si el cliente ya tiene la versión vigente, o el JSON cacheado.
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **(entry.headers or {})}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,36 @@
+from sqlalchemy import Sequence, String, cast, func, literal, select
+
+from app.core.config import settings
+
+
+# ----------------------------
+# Códigos de orden y número de factura
+# ----------------------------
+def generated_code(prefix: str, sequence: Sequence):
+    """
+    Expresión SQL para un código PREFIJO-SUCURSAL-FECHA-000123, usada como
+    default de columna: se evalúa dentro del mismo INSERT, sin round trip.
+
+    nextval() no bloquea a otras transacciones ni se revierte con un rollback,
+    así que no hay contención ni reintentos por unique violation (a cambio
+    pueden quedar huecos en la numeración).
+    """
+    parts = [literal(part) for part in (prefix, settings.CODE_BRANCH) if part]
+    if settings.CODE_DATE_FORMAT:
+        parts.append(func.to_char(func.now(), settings.CODE_DATE_FORMAT))
+
+    # nextval una sola vez; lpad trunca, por eso el ancho crece si el número no cabe
+    next_value = select(sequence.next_value().label("n")).subquery()
+    number = cast(next_value.c.n, String)
+    parts.append(
+        select(func.lpad(number, func.greatest(settings.CODE_SEQ_DIGITS, func.length(number)), "0"))
+        .scalar_subquery()
+    )
+    return func.concat_ws("-", *parts)
+
+
+def drop_empty_code(values: dict, field: str) -> dict:
+    # Un None explícito anularía el default de la columna
+    if not values.get(field):
+        values.pop(field, None)
+    return values
@@ -0,0 +1,64 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+CONFLICT_DETAIL = "Resource was modified by another request"
+
+
+# ----------------------------
+# Concurrencia optimista (version + If-Match)
+# ----------------------------
+class VersionConflict(Exception):
+    """
+    La fila cambió desde que el cliente la leyó: la versión de If-Match no
+    coincide o el UPDATE ... WHERE version = :v no encontró la fila.
+    """
+
+
+def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    Dependencia: versión esperada según If-Match ("3", W/"3" o 3). Sin
+    cabecera o con "*" el cliente no pide comprobación (último en escribir gana).
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
+
+def set_etag(response: Response, version: Optional[int]):
+    if version is not None:
+        response.headers["ETag"] = f'"{version}"'
+
+
+def check_version(obj, expected_version: Optional[int]):
+    if expected_version is not None and obj.version != expected_version:
+        raise VersionConflict()
+
+
+def flush_versioned(db: Session):
+    """
+    Flush de un objeto con version_id_col: si otro request lo cambió entre la
+    lectura y el UPDATE, SQLAlchemy no encuentra la fila (StaleDataError).
+    """
+    try:
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise VersionConflict()
+
+
+async def aflush_versioned(db: AsyncSession):
+    try:
+        await db.flush()
+    except StaleDataError:
+        await db.rollback()
+        raise VersionConflict()
@@ -10,6 +10,21 @@ class Settings:
     # BASE DE DATOS
     # --------------------
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Modo async (asyncpg + AsyncSession) para los routers de alto tráfico
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    # Si no se define, se deriva de DATABASE_URL con el driver asyncpg
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Pool de conexiones (por worker): pool_size + max_overflow debe caber en max_connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Conexiones que se abren al arrancar (0 = sin precalentamiento)
+    DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", 2))
+    # Detrás de PgBouncer (transaction pooling): NullPool y sin prepared statements
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
 
     # --------------------
     # JWT
@@ -18,6 +33,98 @@ class Settings:
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+    # Caché token -> usuario (app/auth/principals.py): vigencia y máximo de entradas
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 1000))
+    # Costo de Argon2 (tiempo, memoria en KiB, hilos); cambiarlo regenera
+    # cada hash en el siguiente login exitoso del usuario
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", 3))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", 4))
+    # Procesos de hashing por worker (0 = en el hilo de la petición)
+    HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", 2))
+    # Hashes en curso y peticiones en curso + en espera; el resto recibe 503
+    HASH_MAX_CONCURRENCY: int = int(os.getenv("HASH_MAX_CONCURRENCY", 2))
+    HASH_MAX_PENDING: int = int(os.getenv("HASH_MAX_PENDING", 8))
+    HASH_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("HASH_QUEUE_TIMEOUT_SECONDS", 2))
+    # last_login se escribe en lote (app/auth/last_login.py): intervalo y filas por UPDATE
+    LAST_LOGIN_FLUSH_SECONDS: float = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", 5))
+    LAST_LOGIN_BATCH_SIZE: int = int(os.getenv("LAST_LOGIN_BATCH_SIZE", 500))
+    # Exigir permisos por rol (app/auth/permissions.authorize) en los routers;
+    # apagado, las rutas no piden token (clientes que aún no lo envían)
+    RBAC_ENFORCE: bool = os.getenv("RBAC_ENFORCE", "false").lower() in ("1", "true", "yes")
+
+    # --------------------
+    # PAGINACIÓN
+    # --------------------
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", 100))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", 500))
+
+    # --------------------
+    # CACHÉ EN MEMORIA (menú, plano de mesas)
+    # --------------------
+    # Entradas por caché (una por combinación de filtros y página)
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+
+    # --------------------
+    # OPERACIONES EN LOTE
+    # --------------------
+    # Filas por transacción y máximo de filas por petición
+    BULK_BATCH_SIZE: int = int(os.getenv("BULK_BATCH_SIZE", 500))
+    BULK_MAX_ROWS: int = int(os.getenv("BULK_MAX_ROWS", 5000))
+
+    # --------------------
+    # IDEMPOTENCIA (Idempotency-Key)
+    # --------------------
+    # Tiempo que se guarda la respuesta para repetirla en los reintentos
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+    # Una clave en curso que no terminó en este tiempo se puede reclamar de nuevo
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+    # Cada cuántas claves nuevas (por worker) se borran las vencidas
+    IDEMPOTENCY_PURGE_EVERY: int = int(os.getenv("IDEMPOTENCY_PURGE_EVERY", 500))
+
+    # --------------------
+    # RESERVAS
+    # --------------------
+    # Duración por defecto de una reserva (ocupación de la mesa)
+    RESERVATION_DURATION_MINUTES: int = int(os.getenv("RESERVATION_DURATION_MINUTES", 120))
+
+    # --------------------
+    # CÓDIGOS DE ORDEN Y FACTURA
+    # --------------------
+    # Formato: PREFIJO-SUCURSAL-FECHA-000123 (las partes vacías se omiten)
+    ORDER_CODE_PREFIX: str = os.getenv("ORDER_CODE_PREFIX", "ORD")
+    INVOICE_NUMBER_PREFIX: str = os.getenv("INVOICE_NUMBER_PREFIX", "FAC")
+    CODE_BRANCH: str = os.getenv("CODE_BRANCH", "")
+    # Formato de to_char() de Postgres
+    CODE_DATE_FORMAT: str = os.getenv("CODE_DATE_FORMAT", "YYYYMMDD")
+    CODE_SEQ_DIGITS: int = int(os.getenv("CODE_SEQ_DIGITS", 6))
+
+    # --------------------
+    # COLA DE COCINA
+    # --------------------
+    # Duración del lease de un ticket tomado; vencido, vuelve a la cola
+    KITCHEN_LEASE_SECONDS: int = int(os.getenv("KITCHEN_LEASE_SECONDS", 300))
+    KITCHEN_CLAIM_MAX: int = int(os.getenv("KITCHEN_CLAIM_MAX", 20))
+
+    # --------------------
+    # EVENTOS (SSE / WebSocket)
+    # --------------------
+    # Eventos pendientes por cliente antes de forzar un "resync"
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+    # Intervalo del keep-alive cuando no hay eventos
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+
+    # --------------------
+    # NOTIFICACIONES ENTRE WORKERS (LISTEN/NOTIFY)
+    # --------------------
+    NOTIFY_ENABLED: bool = os.getenv("NOTIFY_ENABLED", "true").lower() in ("1", "true", "yes")
+    NOTIFY_CHANNEL: str = os.getenv("NOTIFY_CHANNEL", "restaurant_changes")
+    # Conexión directa a Postgres para LISTEN (no pasa por PgBouncer); por defecto DATABASE_URL
+    NOTIFY_DATABASE_URL: str = os.getenv("NOTIFY_DATABASE_URL", "")
+    NOTIFY_RECONNECT_SECONDS: float = float(os.getenv("NOTIFY_RECONNECT_SECONDS", 5))
+    # Eventos pendientes de enviar mientras no hay conexión
+    NOTIFY_OUTBOX_SIZE: int = int(os.getenv("NOTIFY_OUTBOX_SIZE", 1000))
 
 
 # Instancia global para usar en toda la app
@@ -1,39 +1,98 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
+from sqlalchemy import Float, insert, update, delete, select, bindparam, case, cast, func, or_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from app import models, schemas, seating, stock
+from app.core.config import settings
+from app.events import publish
 from app.auth.hashing import Hasher
-from typing import List
+from app.auth.permissions import role_changed, user_token_revoked
+from app.auth.principals import Principal, invalidate_principal
+from app.codes import drop_empty_code
+from app.concurrency import check_version, flush_versioned
+from app.floor_plan import invalidate_floor_plan
+from app.menu_cache import invalidate_menu
+from app.pagination import PageParams, DateRange, apply_filters, apply_in_filter, apply_date_range, encode_cursor, keyset, paginate
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import re
 import uuid
 
+# ----------------------------
+# Bajas lógicas
+# ----------------------------
+# Las lecturas por id no ven las filas dadas de baja (models.SoftDelete);
+# editar y restaurar sí las alcanzan
+def _get_any(db: Session, model, obj_id: uuid.UUID):
+    return db.query(model).filter(model.id == obj_id).execution_options(include_inactive=True).first()
+
+def _restore(db: Session, model, obj_id: uuid.UUID):
+    db_obj = _get_any(db, model, obj_id)
+    if db_obj:
+        db_obj.is_active = True
+        db.commit()
+        db.refresh(db_obj)
+    return db_obj
+
+
 # ----------------------------
 # Roles CRUD
 # ----------------------------
 def create_role(db: Session, role: schemas.RoleCreate):
-    db_role = models.Role(name=role.name, description=role.description)
+    db_role = models.Role(name=role.name, description=role.description, permissions=role.permissions or 0)
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
     return db_role
 
-def get_roles(db: Session) -> List[models.Role]:
-    return db.query(models.Role).filter(models.Role.is_active == True).all()
+ROLE_SORTS = {"name": models.Role.name, "created_at": models.Role.created_at}
+
+def get_roles(db: Session, page: PageParams):
+    query = db.query(models.Role)
+    return paginate(query, models.Role.id, ROLE_SORTS, page, default_sort="name")
 
 def get_role(db: Session, role_id: uuid.UUID):
     return db.query(models.Role).filter(models.Role.id == role_id).first()
 
 def update_role(db: Session, role_id: uuid.UUID, role: schemas.RoleCreate):
-    db_role = get_role(db, role_id)
+    db_role = _get_any(db, models.Role, role_id)
     if db_role:
         db_role.name = role.name
         db_role.description = role.description
+        permissions_changed = role.permissions is not None and role.permissions != db_role.permissions
+        if permissions_changed:
+            db_role.permissions = role.permissions
+            db_role.perm_version = models.Role.perm_version + 1
         db.commit()
         db.refresh(db_role)
+        # El nombre del rol va en el Principal de cada usuario
+        invalidate_principal()
+        if permissions_changed:
+            role_changed(db_role)
     return db_role
 
 def delete_role(db: Session, role_id: uuid.UUID):
     db_role = get_role(db, role_id)
     if db_role:
         db_role.is_active = False
+        # Los tokens emitidos con el rol dejan de valer (los nuevos llevan perm=0)
+        db_role.perm_version = models.Role.perm_version + 1
+        db.commit()
+        db.refresh(db_role)
+        invalidate_principal()
+        role_changed(db_role)
+    return db_role
+
+def restore_role(db: Session, role_id: uuid.UUID):
+    db_role = _get_any(db, models.Role, role_id)
+    if db_role:
+        db_role.is_active = True
+        # Los tokens emitidos mientras estuvo de baja llevan perm=0: se renuevan
+        db_role.perm_version = models.Role.perm_version + 1
         db.commit()
+        db.refresh(db_role)
+        invalidate_principal()
+        role_changed(db_role)
     return db_role
 
 
@@ -54,36 +113,98 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
-def get_users(db: Session) -> List[models.User]:
-    return db.query(models.User).filter(models.User.is_active == True).all()
+USER_SORTS = {"username": models.User.username, "created_at": models.User.created_at}
+
+def get_users(db: Session, page: PageParams, role_id: Optional[uuid.UUID] = None):
+    query = db.query(models.User)
+    query = apply_filters(query, [(models.User.role_id, role_id)])
+    return paginate(query, models.User.id, USER_SORTS, page, default_sort="username")
 
 def get_user(db: Session, user_id: uuid.UUID):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
+# Búsquedas de identidad: incluyen usuarios inactivos (login responde "Usuario
+# inactivo" y el alta no debe repetir un username existente)
 def get_user_by_username(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+    return (
+        db.query(models.User)
+        .filter(models.User.username == username)
+        .execution_options(include_inactive=True)
+        .first()
+    )
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    return (
+        db.query(models.User)
+        .filter(models.User.email == email)
+        .execution_options(include_inactive=True)
+        .first()
+    )
+
+def get_user_for_login(db: Session, username_or_email: str):
+    """
+    Login en una sola consulta: username o email (ambos con índice único) y
+    el rol ya cargado. Si un valor coincide con el username de un usuario y
+    el email de otro, gana el username (igual que la búsqueda anterior).
+    """
+    u = models.User
+    return (
+        db.query(u)
+        .options(joinedload(u.role))
+        .filter(or_(u.username == username_or_email, u.email == username_or_email))
+        .order_by(case((u.username == username_or_email, 0), else_=1))
+        .execution_options(include_inactive=True)
+        .first()
+    )
+
+def get_principal(db: Session, username: str) -> Optional[Principal]:
+    """
+    Identidad para get_current_user en una sola consulta (usuario + nombre
+    del rol), incluidos los inactivos para poder rechazarlos con 403.
+    """
+    row = db.execute(
+        select(models.User.id, models.User.username, models.Role.name, models.User.is_active)
+        .outerjoin(models.Role, models.Role.id == models.User.role_id)
+        .where(models.User.username == username)
+        .execution_options(include_inactive=True)
+    ).first()
+    return Principal(row.id, row.username, row.name, bool(row.is_active)) if row else None
 
 def update_user(db: Session, user_id: uuid.UUID, user_data: schemas.UserCreate):
-    db_user = get_user(db, user_id)
+    db_user = _get_any(db, models.User, user_id)
     if db_user:
         db_user.username = user_data.username
         db_user.email = user_data.email
         db_user.full_name = user_data.full_name
-        db_user.role_id = user_data.role_id
+        new_role = user_data.role_id != db_user.role_id
+        if new_role:
+            db_user.role_id = user_data.role_id
+            # Los tokens emitidos con el rol anterior dejan de valer
+            db_user.token_version = models.User.token_version + 1
         if user_data.password:
             db_user.password_hash = Hasher.get_password_hash(user_data.password)
         db.commit()
         db.refresh(db_user)
+        invalidate_principal(db_user.id)
+        if new_role:
+            user_token_revoked(db_user)
     return db_user
 
 def delete_user(db: Session, user_id: uuid.UUID):
     db_user = get_user(db, user_id)
     if db_user:
         db_user.is_active = False
+        db_user.token_version = models.User.token_version + 1
         db.commit()
+        db.refresh(db_user)
+        invalidate_principal(db_user.id)
+        user_token_revoked(db_user)
+    return db_user
+
+def restore_user(db: Session, user_id: uuid.UUID):
+    db_user = _restore(db, models.User, user_id)
+    if db_user:
+        invalidate_principal(db_user.id)
     return db_user
 
 
@@ -97,14 +218,61 @@ def create_customer(db: Session, customer: schemas.CustomerCreate):
     db.refresh(db_customer)
     return db_customer
 
-def get_customers(db: Session) -> List[models.Customer]:
-    return db.query(models.Customer).filter(models.Customer.is_active == True).all()
+CUSTOMER_SORTS = {"name": models.Customer.name, "created_at": models.Customer.created_at}
+
+def get_customers(db: Session, page: PageParams, created: Optional[DateRange] = None):
+    query = db.query(models.Customer)
+    query = apply_date_range(query, models.Customer.created_at, created)
+    return paginate(query, models.Customer.id, CUSTOMER_SORTS, page, default_sort="name")
+
+def customer_phone_digits(column):
+    # Misma expresión que idx_customers_phone_trgm: solo los dígitos del teléfono
+    return func.regexp_replace(column, "[^0-9]", "", "g")
+
+def search_customers(db: Session, term: str, limit: int = 10):
+    """
+    Autocompletado de clientes activos por nombre, email o teléfono.
+
+    Cada condición usa un índice (migración 010): prefijo de nombre y email
+    con text_pattern_ops, y trigramas (pg_trgm) para nombre aproximado o
+    contenido y para fragmentos del teléfono sin separadores. Se ordena
+    primero por coincidencias exactas, luego por prefijo y luego por
+    similitud del nombre.
+    """
+    c = models.Customer
+    text = term.strip().lower()
+    digits = re.sub(r"\D", "", term)
+    name = func.lower(c.name)
+    email = func.lower(c.email)
+    phone = customer_phone_digits(c.phone)
+
+    prefix = [name.startswith(text, autoescape=True), email.startswith(text, autoescape=True)]
+    conditions = list(prefix)
+    if len(text) >= 3:
+        # Con menos de 3 caracteres no hay trigramas y el índice GIN no sirve
+        conditions += [name.contains(text, autoescape=True), name.op("%")(text)]
+    if len(digits) >= 3:
+        prefix.append(phone.startswith(digits))
+        conditions.append(phone.contains(digits))
+
+    rank = case(
+        (or_(name == text, email == text), 0),
+        (or_(*prefix), 1),
+        else_=2,
+    )
+    return (
+        db.query(c)
+        .filter(or_(*conditions))
+        .order_by(rank, func.similarity(name, text).desc(), c.name, c.id)
+        .limit(limit)
+        .all()
+    )
 
 def get_customer(db: Session, customer_id: uuid.UUID):
     return db.query(models.Customer).filter(models.Customer.id == customer_id).first()
 
 def update_customer(db: Session, customer_id: uuid.UUID, customer_data: schemas.CustomerCreate):
-    db_customer = get_customer(db, customer_id)
+    db_customer = _get_any(db, models.Customer, customer_id)
     if db_customer:
         for key, value in customer_data.dict(exclude_unset=True).items():
             setattr(db_customer, key, value)
@@ -119,10 +287,30 @@ def delete_customer(db: Session, customer_id: uuid.UUID):
         db.commit()
     return db_customer
 
+def restore_customer(db: Session, customer_id: uuid.UUID):
+    return _restore(db, models.Customer, customer_id)
+
 
 # ----------------------------
 # Tables - Tables Status CRUD
 # ----------------------------
+def table_with_status(table: models.Table, status_obj: Optional[models.TableStatus]) -> schemas.TableWithStatus:
+    """
+    Mesa combinada con su estado. status_version es la versión para If-Match
+    en PATCH /tables/{id}/status; una mesa sin fila de estado figura "free".
+    """
+    return schemas.TableWithStatus(
+        id=table.id,
+        code=table.code,
+        seats=table.seats,
+        location=table.location,
+        is_active=table.is_active,
+        created_at=table.created_at,
+        status=status_obj.status if status_obj else "free",
+        status_id=status_obj.id if status_obj else None,
+        status_version=status_obj.version if status_obj else None,
+    )
+
 # Crear mesa y estado inicial
 def create_table(db: Session, table_data: schemas.TableCreate):
     # Crear mesa
@@ -139,69 +327,48 @@ def create_table(db: Session, table_data: schemas.TableCreate):
     db.add(db_status)
     db.commit()
     db.refresh(db_status)
+    invalidate_floor_plan()
+    publish("table", "created", db_table.id, status=db_status.status)
 
     # Devolver mesa con estado combinado
-    return schemas.TableWithStatus(
-        id=db_table.id,
-        code=db_table.code,
-        seats=db_table.seats,
-        location=db_table.location,
-        is_active=db_table.is_active,
-        created_at=db_table.created_at,
-        status=db_status.status,
-        status_id=db_status.id
-    )
+    return table_with_status(db_table, db_status)
 
 # ----------------------------
 # Obtener mesas con su estado
 # ----------------------------
 def get_tables_with_status(db: Session):
-    tables = db.query(models.Table).filter(models.Table.is_active == True).all()
-    statuses = db.query(models.TableStatus).all()
-
-    result = []
-    for table in tables:
-        status_obj = next((s for s in statuses if s.table_id == table.id), None)
-        table_with_status = schemas.TableWithStatus(
-            id=table.id,
-            code=table.code,
-            seats=table.seats,
-            location=table.location,
-            is_active=table.is_active,
-            created_at=table.created_at,
-            status=status_obj.status if status_obj else "free",
-            status_id=status_obj.id if status_obj else None
-        )
-        result.append(table_with_status)
-    return result
+    # Una sola consulta: mesas activas con su estado (LEFT JOIN, table_status es único por mesa)
+    rows = (
+        db.query(models.Table, models.TableStatus)
+        .outerjoin(models.TableStatus, models.TableStatus.table_id == models.Table.id)
+        .filter(models.Table.is_active == True)
+        .order_by(models.Table.code)
+        .all()
+    )
+
+    return [table_with_status(table, status_obj) for table, status_obj in rows]
 
 # Actualizar solo el estado de una mesa
-def update_table_status(db: Session, table_id: uuid.UUID, new_status: str):
+def update_table_status(db: Session, table_id: uuid.UUID, new_status: str, expected_version: Optional[int] = None):
     # Buscar el estado actual de la mesa
     db_status = db.query(models.TableStatus).filter(models.TableStatus.table_id == table_id).first()
     if not db_status:
         return None
-    
+    check_version(db_status, expected_version)
+
     db_status.status = new_status
+    flush_versioned(db)
     db.commit()
     db.refresh(db_status)
+    invalidate_floor_plan()
+    publish("table", "updated", table_id, status=db_status.status)
 
     # También podemos devolver la mesa combinada con status
     db_table = db.query(models.Table).filter(models.Table.id == table_id).first()
     if not db_table:
         return None
 
-    from app.schemas import TableWithStatus
-    return TableWithStatus(
-        id=db_table.id,
-        code=db_table.code,
-        seats=db_table.seats,
-        location=db_table.location,
-        is_active=db_table.is_active,
-        created_at=db_table.created_at,
-        status=db_status.status,
-        status_id=db_status.id
-    )
+    return table_with_status(db_table, db_status)
 
 #-----------------------------
 # Eliminar mesa (lógico) y su estado
@@ -217,6 +384,8 @@ def delete_table(db: Session, table_id: uuid.UUID):
     # Eliminar mesa
     db.delete(table)
     db.commit()
+    invalidate_floor_plan()
+    publish("table", "deleted", table_id)
 
     # Devolver información para que el frontend pueda mostrar algo
     return {
@@ -234,15 +403,41 @@ def delete_table(db: Session, table_id: uuid.UUID):
 # ----------------------------
 # Reservations CRUD
 # ----------------------------
+# Reservas que ocupan la mesa en su ventana de tiempo
+RESERVATION_BLOCKING_STATUSES = ("confirmed", "seated")
+# Estados actuales de mesa que la dejan fuera para ventanas que empiezan pronto
+TABLE_BUSY_STATUSES = ("occupied", "cleaning")
+
+def _seating_end(values: dict):
+    if values.get("ends_at") is None and values.get("reserved_at") is not None:
+        values["ends_at"] = values["reserved_at"] + timedelta(minutes=settings.RESERVATION_DURATION_MINUTES)
+    return values
+
 def create_reservation(db: Session, reservation: schemas.ReservationCreate):
-    db_reservation = models.Reservation(**reservation.dict())
+    db_reservation = models.Reservation(**_seating_end(reservation.dict()))
     db.add(db_reservation)
     db.commit()
     db.refresh(db_reservation)
     return db_reservation
 
-def get_reservations(db: Session) -> List[models.Reservation]:
-    return db.query(models.Reservation).all()
+RESERVATION_SORTS = {"reserved_at": models.Reservation.reserved_at, "created_at": models.Reservation.created_at}
+
+def get_reservations(
+    db: Session,
+    page: PageParams,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    reserved: Optional[DateRange] = None,
+):
+    query = db.query(models.Reservation)
+    query = apply_filters(query, [
+        (models.Reservation.status, status),
+        (models.Reservation.table_id, table_id),
+        (models.Reservation.customer_id, customer_id),
+    ])
+    query = apply_date_range(query, models.Reservation.reserved_at, reserved)
+    return paginate(query, models.Reservation.id, RESERVATION_SORTS, page, default_sort="reserved_at")
 
 def get_reservation(db: Session, reservation_id: uuid.UUID):
     return db.query(models.Reservation).filter(models.Reservation.id == reservation_id).first()
@@ -250,7 +445,7 @@ def get_reservation(db: Session, reservation_id: uuid.UUID):
 def update_reservation(db: Session, reservation_id: uuid.UUID, reservation_data: schemas.ReservationCreate):
     db_reservation = get_reservation(db, reservation_id)
     if db_reservation:
-        for key, value in reservation_data.dict(exclude_unset=True).items():
+        for key, value in _seating_end(reservation_data.dict(exclude_unset=True)).items():
             setattr(db_reservation, key, value)
         db.commit()
         db.refresh(db_reservation)
@@ -263,6 +458,178 @@ def delete_reservation(db: Session, reservation_id: uuid.UUID):
         db.commit()
     return db_reservation
 
+def seating_overlaps(starts_at, ends_at):
+    """
+    Condición "la reserva se solapa con [starts_at, ends_at)". Usa la misma
+    expresión que idx_reservations_seating (GiST sobre tstzrange), así que
+    Postgres la resuelve con el índice aunque haya años de historial.
+    """
+    seating = func.tstzrange(models.Reservation.reserved_at, models.Reservation.ends_at)
+    return seating.op("&&")(func.tstzrange(starts_at, ends_at))
+
+def get_available_tables(
+    db: Session,
+    starts_at: datetime,
+    party_size: int,
+    duration_minutes: Optional[int] = None,
+    location: Optional[str] = None,
+) -> List[schemas.TableWithStatus]:
+    """
+    Mesas activas con capacidad para `party_size` y sin reservas vigentes
+    que se solapen con la ventana pedida, de la más chica a la más grande.
+
+    Si la ventana empieza antes de que termine una ocupación que empezara
+    ahora, también se descartan las mesas ocupadas o en limpieza.
+    """
+    duration = timedelta(minutes=duration_minutes or settings.RESERVATION_DURATION_MINUTES)
+    ends_at = starts_at + duration
+
+    busy = select(models.Reservation.table_id).where(
+        models.Reservation.table_id.isnot(None),
+        models.Reservation.status.in_(RESERVATION_BLOCKING_STATUSES),
+        seating_overlaps(starts_at, ends_at),
+    )
+    query = (
+        db.query(models.Table, models.TableStatus)
+        .outerjoin(models.TableStatus, models.TableStatus.table_id == models.Table.id)
+        .filter(
+            models.Table.is_active == True,
+            models.Table.seats >= party_size,
+            models.Table.id.notin_(busy),
+        )
+    )
+    if location is not None:
+        query = query.filter(models.Table.location == location)
+
+    now = datetime.now(starts_at.tzinfo)
+    if starts_at < now + duration:
+        query = query.filter(or_(
+            models.TableStatus.status.is_(None),
+            models.TableStatus.status.notin_(TABLE_BUSY_STATUSES),
+        ))
+
+    rows = query.order_by(models.Table.seats, models.Table.code).all()
+    return [table_with_status(table, status_obj) for table, status_obj in rows]
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Sin zona horaria se asume UTC: psycopg2 devuelve timestamptz con zona y
+    # comparar datetimes con y sin zona lanza TypeError
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def assign_tables(db: Session, request: schemas.TableAssignmentRequest) -> schemas.TableAssignmentResult:
+    """
+    Asigna mesas a las reservas de la ventana sin mesa (o a todas, con
+    reassign) y a los walk-ins, con seating.plan_assignment(). Las reservas
+    que ya ocupan mesa fuera de lo reasignable y las mesas ocupadas ahora
+    quedan como intervalos bloqueados.
+
+    Los cambios se escriben en una sola transacción: un UPDATE por lote para
+    las reservas y un INSERT por lote para los walk-ins ubicados, que quedan
+    como reservas. Los walk-ins sin lugar no se guardan y, con reassign, las
+    reservas que se quedan sin lugar pierden su mesa para revisión manual.
+    """
+    starts_at, ends_at = _as_utc(request.starts_at), _as_utc(request.ends_at)
+    if ends_at <= starts_at:
+        raise ValueError("ends_at must be after starts_at")
+    R = models.Reservation
+    default_duration = timedelta(minutes=settings.RESERVATION_DURATION_MINUTES)
+    now = datetime.now(timezone.utc)
+
+    tables = [
+        seating.TableSlot(*row)
+        for row in db.execute(
+            select(models.Table.id, models.Table.code, models.Table.seats, models.Table.location)
+            .where(models.Table.is_active == True)
+        )
+    ]
+    locations = {t.id: t.location for t in tables}
+
+    rows = db.execute(
+        select(R.id, R.reserved_at, R.ends_at, R.people_smallint, R.table_id, R.status)
+        .where(R.status.in_(RESERVATION_BLOCKING_STATUSES), seating_overlaps(starts_at, ends_at))
+    ).all()
+    parties, blocked, current = [], [], {}
+    for row in rows:
+        reserved_at, row_ends_at = _as_utc(row.reserved_at), _as_utc(row.ends_at)
+        movable = (
+            row.status == "confirmed"
+            and starts_at <= reserved_at < ends_at
+            and (row.table_id is None or request.reassign)
+        )
+        if movable:
+            current[row.id] = row.table_id
+            parties.append(seating.Party(row.id, reserved_at, row_ends_at, row.people_smallint, locations.get(row.table_id)))
+        elif row.table_id is not None:
+            blocked.append((row.table_id, reserved_at, row_ends_at))
+
+    # Mesas ocupadas o en limpieza ahora: no disponibles por una duración estándar
+    busy_now = db.scalars(
+        select(models.TableStatus.table_id).where(models.TableStatus.status.in_(TABLE_BUSY_STATUSES))
+    )
+    blocked.extend((table_id, now, now + default_duration) for table_id in busy_now)
+
+    for index, walk_in in enumerate(request.walk_ins):
+        if walk_in.people_smallint < 1:
+            raise ValueError("Walk-in party size must be at least 1")
+        start = _as_utc(walk_in.arrive_at) or now
+        duration = timedelta(minutes=walk_in.duration_minutes) if walk_in.duration_minutes else default_duration
+        parties.append(seating.Party(index, start, start + duration, walk_in.people_smallint, walk_in.location))
+
+    assigned, unassigned = seating.plan_assignment(tables, parties, blocked)
+
+    def _result(party, table=None, reservation_id=None):
+        is_walk_in = isinstance(party.key, int)
+        return schemas.TableAssignment(
+            reservation_id=reservation_id if is_walk_in else party.key,
+            walk_in=party.key if is_walk_in else None,
+            people_smallint=party.people,
+            reserved_at=party.start,
+            ends_at=party.end,
+            table_id=table.id if table else None,
+            table_code=table.code if table else None,
+            seats=table.seats if table else None,
+        )
+
+    walk_in_ids = {}
+    if not request.dry_run:
+        changes = [
+            {"id": party.key, "table_id": assigned[party.key].id if party.key in assigned else None}
+            for party in parties
+            if not isinstance(party.key, int)
+        ]
+        changes = [c for c in changes if c["table_id"] != current[c["id"]]]
+        if changes:
+            db.execute(update(R), changes)
+        seated = [p for p in parties if isinstance(p.key, int) and p.key in assigned]
+        if seated:
+            new_ids = db.scalars(
+                insert(R).returning(R.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "customer_id": request.walk_ins[p.key].customer_id,
+                        "reserved_at": p.start,
+                        "ends_at": p.end,
+                        "people_smallint": p.people,
+                        "table_id": assigned[p.key].id,
+                        "notes": request.walk_ins[p.key].notes,
+                    }
+                    for p in seated
+                ],
+            ).all()
+            walk_in_ids = {p.key: new_id for p, new_id in zip(seated, new_ids)}
+        db.commit()
+
+    return schemas.TableAssignmentResult(
+        assigned=[
+            _result(p, assigned[p.key], walk_in_ids.get(p.key))
+            for p in sorted(parties, key=lambda p: (p.start.timestamp(), str(p.key)))
+            if p.key in assigned
+        ],
+        unassigned=[_result(p) for p in unassigned],
+    )
 
 # ----------------------------
 # MenuCategories CRUD
@@ -272,21 +639,30 @@ def create_menu_category(db: Session, category: schemas.MenuCategoryCreate):
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_menu()
     return db_category
 
-def get_menu_categories(db: Session) -> List[models.MenuCategory]:
-    return db.query(models.MenuCategory).filter(models.MenuCategory.is_active == True).all()
+MENU_CATEGORY_SORTS = {
+    "sort_order": models.MenuCategory.sort_order,
+    "name": models.MenuCategory.name,
+    "created_at": models.MenuCategory.created_at,
+}
+
+def get_menu_categories(db: Session, page: PageParams):
+    query = db.query(models.MenuCategory)
+    return paginate(query, models.MenuCategory.id, MENU_CATEGORY_SORTS, page, default_sort="sort_order")
 
 def get_menu_category(db: Session, category_id: uuid.UUID):
     return db.query(models.MenuCategory).filter(models.MenuCategory.id == category_id).first()
 
 def update_menu_category(db: Session, category_id: uuid.UUID, category_data: schemas.MenuCategoryCreate):
-    db_category = get_menu_category(db, category_id)
+    db_category = _get_any(db, models.MenuCategory, category_id)
     if db_category:
         for key, value in category_data.dict(exclude_unset=True).items():
             setattr(db_category, key, value)
         db.commit()
         db.refresh(db_category)
+        invalidate_menu()
     return db_category
 
 def delete_menu_category(db: Session, category_id: uuid.UUID):
@@ -294,6 +670,13 @@ def delete_menu_category(db: Session, category_id: uuid.UUID):
     if db_category:
         db_category.is_active = False
         db.commit()
+        invalidate_menu()
+    return db_category
+
+def restore_menu_category(db: Session, category_id: uuid.UUID):
+    db_category = _restore(db, models.MenuCategory, category_id)
+    if db_category:
+        invalidate_menu()
     return db_category
 
 
@@ -305,21 +688,89 @@ def create_menu_item(db: Session, item: schemas.MenuItemCreate):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    invalidate_menu()
     return db_item
 
-def get_menu_items(db: Session) -> List[models.MenuItem]:
-    return db.query(models.MenuItem).filter(models.MenuItem.is_active == True).all()
+MENU_ITEM_SORTS = {
+    "name": models.MenuItem.name,
+    "price": models.MenuItem.price,
+    "created_at": models.MenuItem.created_at,
+}
+
+def get_menu_items(
+    db: Session,
+    page: PageParams,
+    category_id: Optional[uuid.UUID] = None,
+    is_available: Optional[bool] = None,
+):
+    query = db.query(models.MenuItem)
+    query = apply_filters(query, [
+        (models.MenuItem.category_id, category_id),
+        (models.MenuItem.is_available, is_available),
+    ])
+    return paginate(query, models.MenuItem.id, MENU_ITEM_SORTS, page, default_sort="name")
+
+# Debe coincidir con la configuración de menu_item_search_document (migración 011)
+MENU_SEARCH_CONFIG = "simple"
+
+def menu_search_tsquery(term: str):
+    """
+    Convierte el texto escrito en un tsquery de prefijos: "pollo asa" ->
+    'pollo:* & asa:*', para encontrar resultados mientras se escribe. Solo
+    se toman palabras (letras y dígitos), así que no se pueden inyectar operadores.
+    """
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    return func.to_tsquery(MENU_SEARCH_CONFIG, func.unaccent(" & ".join(f"{word}:*" for word in words)))
+
+def search_menu_items(
+    db: Session,
+    term: str,
+    page: PageParams,
+    category_id: Optional[uuid.UUID] = None,
+    is_available: Optional[bool] = None,
+):
+    """
+    Búsqueda de texto sobre nombre, código, categoría y descripción.
+
+    Filtra con search_vector @@ tsquery (índice GIN idx_menu_items_search) y
+    ordena por relevancia (ts_rank con los pesos del documento) o por las
+    claves de get_menu_items. La paginación es keyset sobre (orden, id); el
+    rank se compara como double precision para que el cursor sea exacto.
+    """
+    tsquery = menu_search_tsquery(term)
+    if tsquery is None:
+        return [], None
+    m = models.MenuItem
+    rank = cast(func.ts_rank(m.search_vector, tsquery), Float)
+    query = db.query(m, rank).filter(m.search_vector.bool_op("@@")(tsquery))
+    query = apply_filters(query, [
+        (m.category_id, category_id),
+        (m.is_available, is_available),
+    ])
+    query, sort, column = keyset(query, m.id, {"rank": rank, **MENU_ITEM_SORTS}, page, default_sort="-rank")
+    rows = query.all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last, last_rank = rows[-1]
+        value = last_rank if column is rank else getattr(last, column.key)
+        next_cursor = encode_cursor(sort, value, last.id)
+    return [item for item, _ in rows], next_cursor
 
 def get_menu_item(db: Session, item_id: uuid.UUID):
     return db.query(models.MenuItem).filter(models.MenuItem.id == item_id).first()
 
 def update_menu_item(db: Session, item_id: uuid.UUID, item_data: schemas.MenuItemCreate):
-    db_item = get_menu_item(db, item_id)
+    db_item = _get_any(db, models.MenuItem, item_id)
     if db_item:
         for key, value in item_data.dict(exclude_unset=True).items():
             setattr(db_item, key, value)
         db.commit()
         db.refresh(db_item)
+        invalidate_menu()
     return db_item
 
 def delete_menu_item(db: Session, item_id: uuid.UUID):
@@ -327,8 +778,31 @@ def delete_menu_item(db: Session, item_id: uuid.UUID):
     if db_item:
         db_item.is_active = False
         db.commit()
+        invalidate_menu()
+    return db_item
+
+def restore_menu_item(db: Session, item_id: uuid.UUID):
+    db_item = _restore(db, models.MenuItem, item_id)
+    if db_item:
+        invalidate_menu()
     return db_item
 
+# Las operaciones en lote invalidan una sola vez al final, no por fila
+def bulk_create_menu_items(db: Session, items: List[schemas.MenuItemCreate]):
+    result = _bulk_insert(db, models.MenuItem, schemas.MenuItem, items)
+    invalidate_menu()
+    return result
+
+def bulk_update_menu_items(db: Session, items: List[schemas.MenuItemBulkUpdate]):
+    result = _bulk_update(db, models.MenuItem, schemas.MenuItem, items)
+    invalidate_menu()
+    return result
+
+def bulk_delete_menu_items(db: Session, ids: List[uuid.UUID]):
+    result = _bulk_delete(db, models.MenuItem, ids, soft=True)
+    invalidate_menu()
+    return result
+
 
 # ----------------------------
 # Inventory CRUD
@@ -340,14 +814,18 @@ def create_inventory(db: Session, inventory: schemas.InventoryCreate):
     db.refresh(db_inventory)
     return db_inventory
 
-def get_inventory(db: Session) -> List[models.Inventory]:
-    return db.query(models.Inventory).filter(models.Inventory.is_active == True).all()
+INVENTORY_SORTS = {"item_name": models.Inventory.item_name, "last_updated": models.Inventory.last_updated}
+
+def get_inventory(db: Session, page: PageParams, updated: Optional[DateRange] = None):
+    query = db.query(models.Inventory)
+    query = apply_date_range(query, models.Inventory.last_updated, updated)
+    return paginate(query, models.Inventory.id, INVENTORY_SORTS, page, default_sort="item_name")
 
 def get_inventory_item(db: Session, inventory_id: uuid.UUID):
     return db.query(models.Inventory).filter(models.Inventory.id == inventory_id).first()
 
 def update_inventory(db: Session, inventory_id: uuid.UUID, inventory_data: schemas.InventoryCreate):
-    db_inventory = get_inventory_item(db, inventory_id)
+    db_inventory = _get_any(db, models.Inventory, inventory_id)
     if db_inventory:
         for key, value in inventory_data.dict(exclude_unset=True).items():
             setattr(db_inventory, key, value)
@@ -363,6 +841,32 @@ def delete_inventory(db: Session, inventory_id: uuid.UUID):
         db.refresh(db_inventory)
     return db_inventory
 
+def restore_inventory(db: Session, inventory_id: uuid.UUID):
+    return _restore(db, models.Inventory, inventory_id)
+
+def bulk_create_inventory(db: Session, items: List[schemas.InventoryCreate]):
+    return _bulk_insert(db, models.Inventory, schemas.Inventory, items)
+
+def bulk_update_inventory(db: Session, items: List[schemas.InventoryBulkUpdate]):
+    return _bulk_update(db, models.Inventory, schemas.Inventory, items)
+
+def bulk_delete_inventory(db: Session, ids: List[uuid.UUID]):
+    return _bulk_delete(db, models.Inventory, ids, soft=True)
+
+def receive_inventory(db: Session, receipts: List[schemas.InventoryReceipt]):
+    """
+    Suma cantidades recibidas a la existencia (quantity = quantity + recibido)
+    con un solo UPDATE ejecutado en lote, sin leer las filas antes.
+    """
+    table = models.Inventory.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(quantity=table.c.quantity + bindparam("b_quantity"), last_updated=func.now())
+    )
+    rows = [{"b_id": r.id, "b_quantity": r.quantity} for r in receipts]
+    return _bulk_apply(db, models.Inventory, schemas.Inventory, rows, "b_id", lambda batch: db.execute(stmt, batch))
+
 
 
 # ----------------------------
@@ -375,14 +879,27 @@ def create_recipe_item(db: Session, recipe_item: schemas.RecipeItemCreate):
     db.refresh(db_recipe)
     return db_recipe
 
-def get_recipe_items(db: Session) -> List[models.RecipeItem]:
-    return db.query(models.RecipeItem).filter(models.RecipeItem.is_active == True).all()
+# recipe_items no tiene created_at: se pagina solo por id
+RECIPE_ITEM_SORTS = {"id": models.RecipeItem.id}
+
+def get_recipe_items(
+    db: Session,
+    page: PageParams,
+    menu_item_id: Optional[uuid.UUID] = None,
+    inventory_id: Optional[uuid.UUID] = None,
+):
+    query = db.query(models.RecipeItem)
+    query = apply_filters(query, [
+        (models.RecipeItem.menu_item_id, menu_item_id),
+        (models.RecipeItem.inventory_id, inventory_id),
+    ])
+    return paginate(query, models.RecipeItem.id, RECIPE_ITEM_SORTS, page, default_sort="id")
 
 def get_recipe_item(db: Session, recipe_item_id: uuid.UUID):
     return db.query(models.RecipeItem).filter(models.RecipeItem.id == recipe_item_id).first()
 
 def update_recipe_item(db: Session, recipe_item_id: uuid.UUID, recipe_data: schemas.RecipeItemCreate):
-    db_recipe = get_recipe_item(db, recipe_item_id)
+    db_recipe = _get_any(db, models.RecipeItem, recipe_item_id)
     if db_recipe:
         for key, value in recipe_data.dict(exclude_unset=True).items():
             setattr(db_recipe, key, value)
@@ -397,36 +914,85 @@ def delete_recipe_item(db: Session, recipe_item_id: uuid.UUID):
         db.commit()
     return db_recipe
 
+def restore_recipe_item(db: Session, recipe_item_id: uuid.UUID):
+    return _restore(db, models.RecipeItem, recipe_item_id)
+
+def bulk_create_recipe_items(db: Session, items: List[schemas.RecipeItemCreate]):
+    return _bulk_insert(db, models.RecipeItem, schemas.RecipeItem, items)
+
+def bulk_update_recipe_items(db: Session, items: List[schemas.RecipeItemBulkUpdate]):
+    return _bulk_update(db, models.RecipeItem, schemas.RecipeItem, items)
+
+def bulk_delete_recipe_items(db: Session, ids: List[uuid.UUID]):
+    return _bulk_delete(db, models.RecipeItem, ids, soft=True)
+
 # ----------------------------
 # Orders CRUD
 # ----------------------------
 def create_order(db: Session, order: schemas.OrderCreate):
-    db_order = models.Order(**order.dict())
+    db_order = models.Order(**drop_empty_code(order.dict(), "order_code"))
     db.add(db_order)
     db.commit()
     db.refresh(db_order)
+    publish("order", "created", db_order.id, status=db_order.status, table_id=db_order.table_id)
     return db_order
 
-def get_orders(db: Session) -> List[models.Order]:
-    return db.query(models.Order).all()
+ORDER_SORTS = {"created_at": models.Order.created_at, "updated_at": models.Order.updated_at}
+
+def get_orders(
+    db: Session,
+    page: PageParams,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    query = db.query(models.Order)
+    query = apply_filters(query, [
+        (models.Order.status, status),
+        (models.Order.table_id, table_id),
+        (models.Order.customer_id, customer_id),
+        (models.Order.created_by, created_by),
+    ])
+    query = apply_date_range(query, models.Order.created_at, created)
+    return paginate(query, models.Order.id, ORDER_SORTS, page, default_sort="-created_at")
 
 def get_order(db: Session, order_id: uuid.UUID):
     return db.query(models.Order).filter(models.Order.id == order_id).first()
 
-def update_order(db: Session, order_id: uuid.UUID, order_data: schemas.OrderCreate):
+def update_order(
+    db: Session, order_id: uuid.UUID, order_data: schemas.OrderCreate, expected_version: Optional[int] = None
+):
+    """
+    Raises:
+        VersionConflict: Si la orden ya no está en expected_version o cambió durante la escritura.
+    """
     db_order = get_order(db, order_id)
     if db_order:
+        check_version(db_order, expected_version)
+        was_void = db_order.status in stock.VOID_STATUSES
         for key, value in order_data.dict(exclude_unset=True).items():
             setattr(db_order, key, value)
+        flush_versioned(db)
+        if db_order.status in stock.VOID_STATUSES:
+            # Orden anulada: se devuelve al inventario lo que ya se había descontado
+            stock.release_order_items_stock(db, order_id=order_id)
+        elif was_void:
+            # Orden reactivada: sus líneas en preparación o servidas vuelven a descontar
+            stock.sync_order_items_stock(db, order_id=order_id)
         db.commit()
         db.refresh(db_order)
+        publish("order", "updated", order_id, status=db_order.status, table_id=db_order.table_id)
     return db_order
 
 def delete_order(db: Session, order_id: uuid.UUID):
     db_order = get_order(db, order_id)
     if db_order:
+        stock.release_order_items_stock(db, order_id=order_id)
         db.delete(db_order)
         db.commit()
+        publish("order", "deleted", order_id)
     return db_order
 
 
@@ -437,32 +1003,99 @@ def delete_order(db: Session, order_id: uuid.UUID):
 def create_order_item(db: Session, item: schemas.OrderItemCreate):
     db_item = models.OrderItem(**item.dict())
     db.add(db_item)
+    db.flush()
+    stock.sync_order_items_stock(db, [db_item.id])
     db.commit()
     db.refresh(db_item)
+    publish("order_item", "created", db_item.id, order_id=db_item.order_id, status=db_item.status)
     return db_item
 
-def get_order_items(db: Session) -> List[models.OrderItem]:
-    return db.query(models.OrderItem).all()
+ORDER_ITEM_SORTS = {"created_at": models.OrderItem.created_at}
+
+def get_order_items(
+    db: Session,
+    page: PageParams,
+    order_ids: Optional[List[uuid.UUID]] = None,
+    status: Optional[str] = None,
+    menu_item_id: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    query = db.query(models.OrderItem)
+    # order_id usa idx_order_items_order; varias órdenes se cargan en una sola consulta (IN)
+    query = apply_in_filter(query, models.OrderItem.order_id, order_ids)
+    query = apply_filters(query, [
+        (models.OrderItem.status, status),
+        (models.OrderItem.menu_item_id, menu_item_id),
+    ])
+    query = apply_date_range(query, models.OrderItem.created_at, created)
+    return paginate(query, models.OrderItem.id, ORDER_ITEM_SORTS, page, default_sort="created_at")
 
 def get_order_item(db: Session, item_id: uuid.UUID):
     return db.query(models.OrderItem).filter(models.OrderItem.id == item_id).first()
 
-def update_order_item(db: Session, item_id: uuid.UUID, item_data: schemas.OrderItemCreate):
+def update_order_item(
+    db: Session, item_id: uuid.UUID, item_data: schemas.OrderItemCreate, expected_version: Optional[int] = None
+):
+    """
+    Raises:
+        VersionConflict: Si la línea ya no está en expected_version o cambió durante la escritura.
+    """
     db_item = get_order_item(db, item_id)
     if db_item:
+        check_version(db_item, expected_version)
         for key, value in item_data.dict(exclude_unset=True).items():
             setattr(db_item, key, value)
+        flush_versioned(db)
+        # Descuenta o devuelve la receta según el nuevo estado, en la misma transacción
+        stock.sync_order_items_stock(db, [item_id])
         db.commit()
         db.refresh(db_item)
+        publish("order_item", "updated", item_id, order_id=db_item.order_id, status=db_item.status)
     return db_item
 
 def delete_order_item(db: Session, item_id: uuid.UUID):
     db_item = get_order_item(db, item_id)
     if db_item:
+        stock.release_order_items_stock(db, [item_id])
         db.delete(db_item)
         db.commit()
+        publish("order_item", "deleted", item_id, order_id=db_item.order_id)
     return db_item
 
+def bulk_create_order_items(db: Session, items: List[schemas.OrderItemCreate]):
+    def deplete(created):
+        # Líneas creadas ya en preparación/servidas: una pasada de descuento por
+        # lote, confirmada junto con el INSERT
+        fired = [item.id for item in created if item.status in stock.DEPLETING_STATUSES]
+        if fired:
+            stock.sync_order_items_stock(db, fired)
+
+    result = _bulk_insert(db, models.OrderItem, schemas.OrderItem, items, after_insert=deplete)
+    _publish_order_items("created", result.items)
+    return result
+
+def bulk_update_order_items(db: Session, items: List[schemas.OrderItemBulkUpdate]):
+    def execute(batch):
+        db.execute(update(models.OrderItem), batch)
+        stock.sync_order_items_stock(db, [row["id"] for row in batch])
+
+    rows = [item.dict(exclude_unset=True) for item in items]
+    result = _bulk_apply(db, models.OrderItem, schemas.OrderItem, rows, "id", execute, versioned=True)
+    _publish_order_items("updated", result.items)
+    return result
+
+def bulk_delete_order_items(db: Session, ids: List[uuid.UUID]):
+    # La devolución queda en la misma transacción que el DELETE
+    stock.release_order_items_stock(db, ids)
+    result = _bulk_delete(db, models.OrderItem, ids, soft=False)
+    for item_id in result.deleted:
+        publish("order_item", "deleted", item_id)
+    return result
+
+def _publish_order_items(action: str, items: List[schemas.OrderItem]):
+    for item in items:
+        publish("order_item", action, item.id, order_id=item.order_id, status=item.status)
+
 
 # ----------------------------
 # KitchenTickets CRUD
@@ -472,10 +1105,25 @@ def create_kitchen_ticket(db: Session, ticket: schemas.KitchenTicketCreate):
     db.add(db_ticket)
     db.commit()
     db.refresh(db_ticket)
+    publish("kitchen_ticket", "created", db_ticket.id, order_id=db_ticket.order_id, priority=db_ticket.priority)
     return db_ticket
 
-def get_kitchen_tickets(db: Session) -> List[models.KitchenTicket]:
-    return db.query(models.KitchenTicket).all()
+KITCHEN_TICKET_SORTS = {"created_at": models.KitchenTicket.created_at, "priority": models.KitchenTicket.priority}
+
+def get_kitchen_tickets(
+    db: Session,
+    page: PageParams,
+    order_id: Optional[uuid.UUID] = None,
+    printed: Optional[bool] = None,
+    created: Optional[DateRange] = None,
+):
+    query = db.query(models.KitchenTicket)
+    query = apply_filters(query, [
+        (models.KitchenTicket.order_id, order_id),
+        (models.KitchenTicket.printed, printed),
+    ])
+    query = apply_date_range(query, models.KitchenTicket.created_at, created)
+    return paginate(query, models.KitchenTicket.id, KITCHEN_TICKET_SORTS, page, default_sort="created_at")
 
 def get_kitchen_ticket(db: Session, ticket_id: uuid.UUID):
     return db.query(models.KitchenTicket).filter(models.KitchenTicket.id == ticket_id).first()
@@ -487,6 +1135,7 @@ def update_kitchen_ticket(db: Session, ticket_id: uuid.UUID, ticket_data: schema
             setattr(db_ticket, key, value)
         db.commit()
         db.refresh(db_ticket)
+        publish("kitchen_ticket", "updated", ticket_id, order_id=db_ticket.order_id, priority=db_ticket.priority)
     return db_ticket
 
 def delete_kitchen_ticket(db: Session, ticket_id: uuid.UUID):
@@ -494,21 +1143,312 @@ def delete_kitchen_ticket(db: Session, ticket_id: uuid.UUID):
     if db_ticket:
         db.delete(db_ticket)
         db.commit()
+        publish("kitchen_ticket", "deleted", ticket_id, order_id=db_ticket.order_id)
     return db_ticket
 
 
+# ----------------------------
+# Cola de tickets de cocina
+# ----------------------------
+def _lease_until():
+    return func.now() + timedelta(seconds=settings.KITCHEN_LEASE_SECONDS)
+
+def claim_kitchen_tickets(db: Session, claimed_by: str, limit: int, station: Optional[str] = None):
+    """
+    Toma hasta `limit` tickets pendientes para `claimed_by`, por prioridad y antigüedad.
+
+    Los candidatos se eligen con SELECT ... FOR UPDATE SKIP LOCKED dentro del
+    mismo UPDATE: dos estaciones que piden a la vez reciben tickets distintos
+    sin esperar locks. Un ticket está disponible si no está terminado y no
+    tiene lease vigente (los leases vencidos vuelven a la cola).
+    Con `station` solo se toman tickets de esa estación o sin estación.
+    """
+    kt = models.KitchenTicket
+    candidates = select(kt.id).where(
+        kt.completed_at.is_(None),
+        or_(kt.claimed_until.is_(None), kt.claimed_until < func.now()),
+    )
+    if station is not None:
+        candidates = candidates.where(or_(kt.station == station, kt.station.is_(None)))
+    candidates = (
+        candidates.order_by(kt.priority.desc(), kt.created_at, kt.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(kt)
+        .where(kt.id.in_(candidates.scalar_subquery()))
+        .values(claimed_by=claimed_by, claimed_until=_lease_until())
+        .returning(kt)
+        .execution_options(synchronize_session=False)
+    )
+    tickets = [schemas.KitchenTicket.model_validate(t) for t in db.scalars(stmt)]
+    db.commit()
+
+    # RETURNING no garantiza orden
+    tickets.sort(key=lambda t: (-(t.priority or 0), t.created_at or datetime.min, str(t.id)))
+    for ticket in tickets:
+        publish("kitchen_ticket", "claimed", ticket.id, order_id=ticket.order_id, claimed_by=claimed_by)
+    return tickets
+
+def _update_claimed_ticket(db: Session, ticket_id: uuid.UUID, holder: str, action: str, **values):
+    """
+    Aplica `values` solo si el ticket sigue tomado por `holder` y no está terminado.
+    Devuelve None si no existe o si el lease pasó a otra estación.
+    """
+    kt = models.KitchenTicket
+    stmt = (
+        update(kt)
+        .where(kt.id == ticket_id, kt.claimed_by == holder, kt.completed_at.is_(None))
+        .values(**values)
+        .returning(kt)
+        .execution_options(synchronize_session=False)
+    )
+    db_ticket = db.scalars(stmt).first()
+    ticket = schemas.KitchenTicket.model_validate(db_ticket) if db_ticket else None
+    db.commit()
+    if ticket:
+        publish("kitchen_ticket", action, ticket_id, order_id=ticket.order_id, claimed_by=holder)
+    return ticket
+
+def ack_kitchen_ticket(db: Session, ticket_id: uuid.UUID, claimed_by: str):
+    # Ticket terminado: sale de la cola definitivamente
+    return _update_claimed_ticket(
+        db, ticket_id, claimed_by, "acked",
+        completed_at=func.now(), printed=True, claimed_until=None,
+    )
+
+def bump_kitchen_ticket(db: Session, ticket_id: uuid.UUID, claimed_by: str, priority_delta: int = 0):
+    # Devuelve el ticket a la cola (opcionalmente con más prioridad) para otra estación
+    return _update_claimed_ticket(
+        db, ticket_id, claimed_by, "bumped",
+        claimed_by=None, claimed_until=None, priority=models.KitchenTicket.priority + priority_delta,
+    )
+
+def extend_kitchen_ticket_lease(db: Session, ticket_id: uuid.UUID, claimed_by: str):
+    return _update_claimed_ticket(db, ticket_id, claimed_by, "extended", claimed_until=_lease_until())
+
+
+# ----------------------------
+# Pantalla de cocina
+# ----------------------------
+# Órdenes que ya no se muestran en cocina
+KITCHEN_CLOSED_STATUSES = ("served", "cancelled", "void", "closed", "paid")
+KITCHEN_STATUSES = ("pending", "fired", "preparing", "ready", "served", "cancelled")
+
+def get_kitchen_orders(db: Session, order_id: Optional[uuid.UUID] = None) -> List[schemas.KitchenOrder]:
+    """
+    Tickets abiertos (sin completed_at) con su orden, mesa y líneas de
+    cocina, en dos consultas fijas sin importar cuántas órdenes haya:
+
+    1. kitchen_tickets JOIN orders LEFT JOIN tables (joinedload).
+    2. order_items JOIN menu_items (requires_kitchen) de todas esas órdenes.
+
+    Orden: prioridad descendente y luego antigüedad del ticket.
+    Si una orden tiene varios tickets se usa el primero en ese orden.
+    """
+    query = (
+        db.query(models.KitchenTicket)
+        .join(models.KitchenTicket.order)
+        .options(joinedload(models.KitchenTicket.order).joinedload(models.Order.table))
+        .order_by(models.KitchenTicket.priority.desc(), models.KitchenTicket.created_at, models.KitchenTicket.id)
+    )
+    if order_id is not None:
+        query = query.filter(models.KitchenTicket.order_id == order_id)
+    else:
+        # Los tickets confirmados en la cola (ack) ya no están abiertos
+        query = query.filter(
+            models.Order.status.notin_(KITCHEN_CLOSED_STATUSES),
+            models.KitchenTicket.completed_at.is_(None),
+        )
+
+    tickets = {}
+    for ticket in query:
+        tickets.setdefault(ticket.order_id, ticket)
+    if not tickets:
+        return []
+
+    lines = {}
+    rows = (
+        db.query(models.OrderItem, models.MenuItem.name)
+        .join(models.MenuItem, models.MenuItem.id == models.OrderItem.menu_item_id)
+        .filter(models.OrderItem.order_id.in_(tickets.keys()), models.MenuItem.requires_kitchen == True)
+        .order_by(models.OrderItem.created_at, models.OrderItem.id)
+    )
+    for item, name in rows:
+        lines.setdefault(item.order_id, []).append(schemas.KitchenOrderLine(
+            id=item.id,
+            menu_item_id=item.menu_item_id,
+            name=name,
+            quantity=item.quantity,
+            notes=item.notes,
+            status=item.status,
+        ))
+
+    return [
+        schemas.KitchenOrder(
+            id=ticket.order.id,
+            order_code=ticket.order.order_code,
+            status=ticket.order.status,
+            is_takeaway=ticket.order.is_takeaway,
+            table_id=ticket.order.table_id,
+            table_code=ticket.order.table.code if ticket.order.table else None,
+            created_at=ticket.order.created_at,
+            ticket_id=ticket.id,
+            priority=ticket.priority,
+            printed=ticket.printed,
+            ticket_created_at=ticket.created_at,
+            items=lines.get(ticket.order_id, []),
+        )
+        for ticket in tickets.values()
+    ]
+
+def get_kitchen_order(db: Session, order_id: uuid.UUID) -> Optional[schemas.KitchenOrder]:
+    orders = get_kitchen_orders(db, order_id=order_id)
+    return orders[0] if orders else None
+
+def update_kitchen_order_status(db: Session, order_id: uuid.UUID, status: str) -> Optional[schemas.KitchenOrder]:
+    """
+    Cambia el estado de la orden y de sus líneas de cocina no anuladas con
+    dos UPDATE, y ajusta el inventario en la misma transacción.
+
+    Raises:
+        ValueError: Si el estado no es uno de KITCHEN_STATUSES.
+    """
+    if status not in KITCHEN_STATUSES:
+        raise ValueError(f"Estado inválido: {status}")
+
+    updated = db.execute(
+        update(models.Order)
+        .where(models.Order.id == order_id)
+        .values(status=status, updated_at=func.now(), version=models.Order.version + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.rollback()
+        return None
+
+    kitchen_items = select(models.MenuItem.id).where(models.MenuItem.requires_kitchen == True)
+    db.execute(
+        update(models.OrderItem)
+        .where(
+            models.OrderItem.order_id == order_id,
+            models.OrderItem.status.notin_(stock.VOID_STATUSES),
+            models.OrderItem.menu_item_id.in_(kitchen_items),
+        )
+        # Sin WHERE version (la cocina manda), pero invalida el If-Match de los meseros
+        .values(status=status, version=models.OrderItem.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    stock.sync_order_items_stock(db, order_id=order_id)
+    db.commit()
+    publish("order", "updated", order_id, status=status)
+    return get_kitchen_order(db, order_id)
+
+
+# ----------------------------
+# Place Order (una sola transacción)
+# ----------------------------
+def place_order(db: Session, data: schemas.OrderPlace):
+    """
+    Crea la orden, sus líneas y (si alguna lo requiere) el ticket de cocina
+    en una sola transacción.
+
+    Precio e impuesto se copian de MenuItem en el servidor. Las líneas se
+    insertan en lote con INSERT ... RETURNING.
+
+    Raises:
+        ValueError: Si no hay líneas o algún producto no existe o no está disponible.
+    """
+    if not data.items:
+        raise ValueError("La orden no tiene items")
+    if any(line.quantity <= 0 for line in data.items):
+        raise ValueError("La cantidad debe ser mayor que 0")
+
+    # Una consulta para todos los productos de la orden
+    item_ids = {line.menu_item_id for line in data.items}
+    menu_items = {
+        row.id: row
+        for row in db.query(
+            models.MenuItem.id,
+            models.MenuItem.price,
+            models.MenuItem.tax_rate,
+            models.MenuItem.requires_kitchen,
+        ).filter(
+            models.MenuItem.id.in_(item_ids),
+            models.MenuItem.is_available == True,
+        )
+    }
+    missing = item_ids - menu_items.keys()
+    if missing:
+        raise ValueError(f"Productos no disponibles: {', '.join(sorted(str(i) for i in missing))}")
+
+    try:
+        order_values = drop_empty_code(data.dict(exclude={"items", "priority"}), "order_code")
+        db_order = db.scalars(insert(models.Order).returning(models.Order), [order_values]).one()
+
+        lines = [
+            {
+                "order_id": db_order.id,
+                "menu_item_id": line.menu_item_id,
+                "quantity": line.quantity,
+                "unit_price": menu_items[line.menu_item_id].price,
+                "tax_rate": menu_items[line.menu_item_id].tax_rate,
+                "notes": line.notes,
+            }
+            for line in data.items
+        ]
+        db_items = db.scalars(insert(models.OrderItem).returning(models.OrderItem), lines).all()
+
+        db_ticket = None
+        if any(menu_items[line.menu_item_id].requires_kitchen for line in data.items):
+            db_ticket = db.scalars(
+                insert(models.KitchenTicket).returning(models.KitchenTicket),
+                [{"order_id": db_order.id, "priority": data.priority or 0}],
+            ).one()
+
+        # La respuesta se arma antes del commit: después los objetos quedan
+        # expirados y cada acceso haría un SELECT adicional
+        placed = schemas.OrderPlaced(order=db_order, items=db_items, kitchen_ticket=db_ticket)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Un solo evento por orden: las pantallas recargan la orden completa
+    publish("order", "created", placed.order.id, status=placed.order.status, table_id=placed.order.table_id,
+            kitchen_ticket_id=placed.kitchen_ticket.id if placed.kitchen_ticket else None)
+    return placed
+
+
 # ----------------------------
 # Invoices CRUD
 # ----------------------------
 def create_invoice(db: Session, invoice: schemas.InvoiceCreate):
-    db_invoice = models.Invoice(**invoice.dict())
+    db_invoice = models.Invoice(**drop_empty_code(invoice.dict(), "invoice_number"))
     db.add(db_invoice)
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
 
-def get_invoices(db: Session) -> List[models.Invoice]:
-    return db.query(models.Invoice).all()
+INVOICE_SORTS = {"created_at": models.Invoice.created_at}
+
+def get_invoices(
+    db: Session,
+    page: PageParams,
+    order_id: Optional[uuid.UUID] = None,
+    paid: Optional[bool] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    query = db.query(models.Invoice)
+    query = apply_filters(query, [
+        (models.Invoice.order_id, order_id),
+        (models.Invoice.paid, paid),
+        (models.Invoice.created_by, created_by),
+    ])
+    query = apply_date_range(query, models.Invoice.created_at, created)
+    return paginate(query, models.Invoice.id, INVOICE_SORTS, page, default_sort="-created_at")
 
 def get_invoice(db: Session, invoice_id: uuid.UUID):
     return db.query(models.Invoice).filter(models.Invoice.id == invoice_id).first()
@@ -540,8 +1480,22 @@ def create_payment(db: Session, payment: schemas.PaymentCreate):
     db.refresh(db_payment)
     return db_payment
 
-def get_payments(db: Session) -> List[models.Payment]:
-    return db.query(models.Payment).all()
+PAYMENT_SORTS = {"paid_at": models.Payment.paid_at}
+
+def get_payments(
+    db: Session,
+    page: PageParams,
+    invoice_id: Optional[uuid.UUID] = None,
+    method: Optional[str] = None,
+    paid: Optional[DateRange] = None,
+):
+    query = db.query(models.Payment)
+    query = apply_filters(query, [
+        (models.Payment.invoice_id, invoice_id),
+        (models.Payment.method, method),
+    ])
+    query = apply_date_range(query, models.Payment.paid_at, paid)
+    return paginate(query, models.Payment.id, PAYMENT_SORTS, page, default_sort="-paid_at")
 
 def get_payment(db: Session, payment_id: uuid.UUID):
     return db.query(models.Payment).filter(models.Payment.id == payment_id).first()
@@ -573,8 +1527,26 @@ def create_audit_log(db: Session, log: schemas.AuditLogCreate):
     db.refresh(db_log)
     return db_log
 
-def get_audit_logs(db: Session) -> List[models.AuditLog]:
-    return db.query(models.AuditLog).all()
+AUDIT_LOG_SORTS = {"created_at": models.AuditLog.created_at}
+
+def get_audit_logs(
+    db: Session,
+    page: PageParams,
+    entity: Optional[str] = None,
+    entity_id: Optional[uuid.UUID] = None,
+    action: Optional[str] = None,
+    performed_by: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    query = db.query(models.AuditLog)
+    query = apply_filters(query, [
+        (models.AuditLog.entity, entity),
+        (models.AuditLog.entity_id, entity_id),
+        (models.AuditLog.action, action),
+        (models.AuditLog.performed_by, performed_by),
+    ])
+    query = apply_date_range(query, models.AuditLog.created_at, created)
+    return paginate(query, models.AuditLog.id, AUDIT_LOG_SORTS, page, default_sort="-created_at")
 
 def get_audit_log(db: Session, log_id: uuid.UUID):
     return db.query(models.AuditLog).filter(models.AuditLog.id == log_id).first()
@@ -594,3 +1566,120 @@ def delete_audit_log(db: Session, log_id: uuid.UUID):
         db.delete(db_log)
         db.commit()
     return db_log
+
+
+# ----------------------------
+# Helpers de operaciones en lote
+# ----------------------------
+def _db_error(exc: Exception) -> str:
+    if isinstance(exc, StaleDataError):
+        return "Version conflict"
+    return str(exc.orig or exc).strip().splitlines()[0]
+
+def _run_in_batches(db: Session, indexed_rows, run):
+    """
+    Ejecuta `run(filas)` por lotes de BULK_BATCH_SIZE, un commit por lote.
+
+    Si un lote falla en la base de datos se reintenta fila por fila con
+    SAVEPOINT, para confirmar las filas válidas y reportar el error de cada
+    fila inválida con su índice en la petición.
+    """
+    results, errors = [], []
+    size = settings.BULK_BATCH_SIZE
+    for start in range(0, len(indexed_rows), size):
+        batch = indexed_rows[start:start + size]
+        try:
+            results.extend(run([row for _, row in batch]))
+            db.commit()
+        except (DBAPIError, StaleDataError):
+            db.rollback()
+            for index, row in batch:
+                try:
+                    with db.begin_nested():
+                        results.extend(run([row]))
+                except (DBAPIError, StaleDataError) as exc:
+                    errors.append(schemas.BulkError(index=index, id=row.get("id"), detail=_db_error(exc)))
+            db.commit()
+    return results, errors
+
+def _bulk_insert(db: Session, model, out_schema, items, after_insert=None):
+    """
+    INSERT ... VALUES (...), (...) RETURNING * por lote.
+
+    `after_insert(objetos)` corre en la misma transacción (o SAVEPOINT) que
+    el INSERT de cada lote, antes de su commit.
+    """
+    rows = list(enumerate(item.dict() for item in items))
+
+    def run(batch):
+        created = list(db.scalars(insert(model).returning(model), batch))
+        if after_insert is not None:
+            after_insert(created)
+        # Se serializa antes del commit, que expira los objetos devueltos
+        return [out_schema.model_validate(obj) for obj in created]
+
+    created, errors = _run_in_batches(db, rows, run)
+    return schemas.BulkResult(items=created, errors=errors)
+
+def _bulk_apply(db: Session, model, out_schema, rows, id_key: str, execute, versioned: bool = False):
+    """
+    Aplica `execute(lote)` a filas identificadas por `id_key` y devuelve las filas resultantes.
+    Los ids inexistentes se reportan como error sin tocar la base de datos.
+
+    Con `versioned` (modelos con version_id_col) cada fila lleva su versión:
+    la enviada por el cliente, que debe coincidir con la actual, o la actual.
+    """
+    ids = {row[id_key] for row in rows}
+    if versioned:
+        existing = dict(db.query(model.id, model.version).filter(model.id.in_(ids)).all())
+    else:
+        existing = {row_id: None for (row_id,) in db.query(model.id).filter(model.id.in_(ids))}
+    errors, valid = [], []
+    for index, row in enumerate(rows):
+        if row[id_key] not in existing:
+            errors.append(schemas.BulkError(index=index, id=row[id_key], detail="Not found"))
+            continue
+        if versioned:
+            if row.get("version") is None:
+                row["version"] = existing[row[id_key]]
+            elif row["version"] != existing[row[id_key]]:
+                errors.append(schemas.BulkError(index=index, id=row[id_key], detail="Version conflict"))
+                continue
+        valid.append((index, row))
+
+    def run(batch):
+        execute(batch)
+        return [row[id_key] for row in batch]
+
+    applied, batch_errors = _run_in_batches(db, valid, run)
+    for error in batch_errors:
+        error.id = rows[error.index][id_key]
+    items = db.query(model).filter(model.id.in_(set(applied))).all() if applied else []
+    return schemas.BulkResult(
+        items=[out_schema.model_validate(obj) for obj in items],
+        errors=sorted(errors + batch_errors, key=lambda e: e.index),
+    )
+
+def _bulk_update(db: Session, model, out_schema, items):
+    """
+    UPDATE por clave primaria ejecutado en lote (executemany), solo con los campos enviados.
+    """
+    rows = [item.dict(exclude_unset=True) for item in items]
+    return _bulk_apply(db, model, out_schema, rows, "id", lambda batch: db.execute(update(model), batch))
+
+def _bulk_delete(db: Session, model, ids: List[uuid.UUID], soft: bool):
+    """
+    Borrado (lógico o físico) de varios ids con una sola sentencia ... RETURNING id.
+    """
+    if soft:
+        stmt = update(model).where(model.id.in_(ids)).values(is_active=False)
+    else:
+        stmt = delete(model).where(model.id.in_(ids))
+    stmt = stmt.returning(model.id).execution_options(synchronize_session=False)
+    deleted = set(db.scalars(stmt).all()) if ids else set()
+    db.commit()
+    errors = [
+        schemas.BulkError(index=index, id=obj_id, detail="Not found")
+        for index, obj_id in enumerate(ids) if obj_id not in deleted
+    ]
+    return schemas.BulkDeleteResult(deleted=[obj_id for obj_id in ids if obj_id in deleted], errors=errors)
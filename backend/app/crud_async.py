@@ -0,0 +1,283 @@
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas, stock
+from app.codes import drop_empty_code
+from app.concurrency import aflush_versioned, check_version
+from app.crud import ORDER_SORTS, ORDER_ITEM_SORTS, KITCHEN_TICKET_SORTS, table_with_status
+from app.events import publish
+from app.floor_plan import invalidate_floor_plan
+from app.pagination import PageParams, DateRange, apply_filters, apply_in_filter, apply_date_range, keyset, page_result
+from typing import List, Optional
+import uuid
+
+# Versiones async (AsyncSession) de las operaciones de crud.py usadas por los
+# routers de alto tráfico cuando settings.DB_ASYNC está activo.
+
+
+# ----------------------------
+# Helpers genéricos
+# ----------------------------
+async def _get_by_id(db: AsyncSession, model, obj_id: uuid.UUID):
+    return await db.get(model, obj_id)
+
+async def _create(db: AsyncSession, model, data, code_field: Optional[str] = None):
+    values = data.dict()
+    if code_field:
+        drop_empty_code(values, code_field)
+    db_obj = model(**values)
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+async def _update(db: AsyncSession, model, obj_id: uuid.UUID, data, expected_version: Optional[int] = None):
+    db_obj = await _get_by_id(db, model, obj_id)
+    if db_obj:
+        check_version(db_obj, expected_version)
+        for key, value in data.dict(exclude_unset=True).items():
+            setattr(db_obj, key, value)
+        await aflush_versioned(db)
+        await db.commit()
+        await db.refresh(db_obj)
+    return db_obj
+
+async def _delete(db: AsyncSession, model, obj_id: uuid.UUID):
+    db_obj = await _get_by_id(db, model, obj_id)
+    if db_obj:
+        await db.delete(db_obj)
+        await db.commit()
+    return db_obj
+
+async def _paginate(db: AsyncSession, stmt, id_column, sort_columns, page: PageParams, default_sort: str):
+    stmt, sort, column = keyset(stmt, id_column, sort_columns, page, default_sort)
+    rows = (await db.execute(stmt)).scalars().all()
+    return page_result(list(rows), sort, column, page)
+
+
+# ----------------------------
+# Tables
+# ----------------------------
+async def get_tables_with_status(db: AsyncSession):
+    stmt = (
+        select(models.Table, models.TableStatus)
+        .outerjoin(models.TableStatus, models.TableStatus.table_id == models.Table.id)
+        .where(models.Table.is_active == True)
+        .order_by(models.Table.code)
+    )
+    rows = (await db.execute(stmt)).all()
+    return [table_with_status(table, status_obj) for table, status_obj in rows]
+
+async def create_table(db: AsyncSession, table_data: schemas.TableCreate):
+    db_table = models.Table(**table_data.dict())
+    db.add(db_table)
+    await db.flush()
+    db_status = models.TableStatus(table_id=db_table.id, status="free")
+    db.add(db_status)
+    await db.commit()
+    await db.refresh(db_table)
+    await db.refresh(db_status)
+    invalidate_floor_plan()
+    publish("table", "created", db_table.id, status=db_status.status)
+    return table_with_status(db_table, db_status)
+
+async def update_table_status(
+    db: AsyncSession, table_id: uuid.UUID, new_status: str, expected_version: Optional[int] = None
+):
+    stmt = (
+        select(models.TableStatus, models.Table)
+        .join(models.Table, models.Table.id == models.TableStatus.table_id)
+        .where(models.TableStatus.table_id == table_id)
+    )
+    row = (await db.execute(stmt)).first()
+    if not row:
+        return None
+    db_status, db_table = row
+    check_version(db_status, expected_version)
+
+    db_status.status = new_status
+    await aflush_versioned(db)
+    await db.commit()
+    await db.refresh(db_status)
+    invalidate_floor_plan()
+    publish("table", "updated", table_id, status=db_status.status)
+    return table_with_status(db_table, db_status)
+
+async def delete_table(db: AsyncSession, table_id: uuid.UUID):
+    table = await _get_by_id(db, models.Table, table_id)
+    if not table:
+        return None
+
+    await db.execute(delete(models.TableStatus).where(models.TableStatus.table_id == table_id))
+    await db.delete(table)
+    await db.commit()
+    invalidate_floor_plan()
+    publish("table", "deleted", table_id)
+    return {
+        "id": table.id,
+        "code": table.code,
+        "seats": table.seats,
+        "location": table.location,
+        "is_active": table.is_active,
+        "created_at": table.created_at,
+        "status": "deleted",
+        "status_id": None
+    }
+
+
+# ----------------------------
+# Orders
+# ----------------------------
+async def create_order(db: AsyncSession, order: schemas.OrderCreate):
+    db_order = await _create(db, models.Order, order, code_field="order_code")
+    publish("order", "created", db_order.id, status=db_order.status, table_id=db_order.table_id)
+    return db_order
+
+async def get_orders(
+    db: AsyncSession,
+    page: PageParams,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    stmt = select(models.Order)
+    stmt = apply_filters(stmt, [
+        (models.Order.status, status),
+        (models.Order.table_id, table_id),
+        (models.Order.customer_id, customer_id),
+        (models.Order.created_by, created_by),
+    ])
+    stmt = apply_date_range(stmt, models.Order.created_at, created)
+    return await _paginate(db, stmt, models.Order.id, ORDER_SORTS, page, default_sort="-created_at")
+
+async def get_order(db: AsyncSession, order_id: uuid.UUID):
+    return await _get_by_id(db, models.Order, order_id)
+
+async def update_order(
+    db: AsyncSession, order_id: uuid.UUID, order_data: schemas.OrderCreate, expected_version: Optional[int] = None
+):
+    """
+    Raises:
+        VersionConflict: Si la orden ya no está en expected_version o cambió durante la escritura.
+    """
+    db_order = await _get_by_id(db, models.Order, order_id)
+    if db_order:
+        check_version(db_order, expected_version)
+        was_void = db_order.status in stock.VOID_STATUSES
+        for key, value in order_data.dict(exclude_unset=True).items():
+            setattr(db_order, key, value)
+        await aflush_versioned(db)
+        if db_order.status in stock.VOID_STATUSES:
+            # Orden anulada: se devuelve al inventario lo que ya se había descontado
+            await db.run_sync(stock.release_order_items_stock, order_id=order_id)
+        elif was_void:
+            # Orden reactivada: sus líneas en preparación o servidas vuelven a descontar
+            await db.run_sync(stock.sync_order_items_stock, order_id=order_id)
+        await db.commit()
+        await db.refresh(db_order)
+        publish("order", "updated", order_id, status=db_order.status, table_id=db_order.table_id)
+    return db_order
+
+async def delete_order(db: AsyncSession, order_id: uuid.UUID):
+    await db.run_sync(stock.release_order_items_stock, order_id=order_id)
+    db_order = await _delete(db, models.Order, order_id)
+    if db_order:
+        publish("order", "deleted", order_id)
+    return db_order
+
+
+# ----------------------------
+# OrderItems
+# ----------------------------
+async def create_order_item(db: AsyncSession, item: schemas.OrderItemCreate):
+    db_item = models.OrderItem(**item.dict())
+    db.add(db_item)
+    await db.flush()
+    await db.run_sync(stock.sync_order_items_stock, [db_item.id])
+    await db.commit()
+    await db.refresh(db_item)
+    publish("order_item", "created", db_item.id, order_id=db_item.order_id, status=db_item.status)
+    return db_item
+
+async def get_order_items(
+    db: AsyncSession,
+    page: PageParams,
+    order_ids: Optional[List[uuid.UUID]] = None,
+    status: Optional[str] = None,
+    menu_item_id: Optional[uuid.UUID] = None,
+    created: Optional[DateRange] = None,
+):
+    stmt = select(models.OrderItem)
+    stmt = apply_in_filter(stmt, models.OrderItem.order_id, order_ids)
+    stmt = apply_filters(stmt, [
+        (models.OrderItem.status, status),
+        (models.OrderItem.menu_item_id, menu_item_id),
+    ])
+    stmt = apply_date_range(stmt, models.OrderItem.created_at, created)
+    return await _paginate(db, stmt, models.OrderItem.id, ORDER_ITEM_SORTS, page, default_sort="created_at")
+
+async def get_order_item(db: AsyncSession, item_id: uuid.UUID):
+    return await _get_by_id(db, models.OrderItem, item_id)
+
+async def update_order_item(
+    db: AsyncSession, item_id: uuid.UUID, item_data: schemas.OrderItemCreate, expected_version: Optional[int] = None
+):
+    db_item = await _get_by_id(db, models.OrderItem, item_id)
+    if db_item:
+        check_version(db_item, expected_version)
+        for key, value in item_data.dict(exclude_unset=True).items():
+            setattr(db_item, key, value)
+        await aflush_versioned(db)
+        # El motor de stock es sync: corre sobre la misma conexión vía run_sync
+        await db.run_sync(stock.sync_order_items_stock, [item_id])
+        await db.commit()
+        await db.refresh(db_item)
+        publish("order_item", "updated", item_id, order_id=db_item.order_id, status=db_item.status)
+    return db_item
+
+async def delete_order_item(db: AsyncSession, item_id: uuid.UUID):
+    await db.run_sync(stock.release_order_items_stock, [item_id])
+    db_item = await _delete(db, models.OrderItem, item_id)
+    if db_item:
+        publish("order_item", "deleted", item_id, order_id=db_item.order_id)
+    return db_item
+
+
+# ----------------------------
+# KitchenTickets
+# ----------------------------
+async def create_kitchen_ticket(db: AsyncSession, ticket: schemas.KitchenTicketCreate):
+    db_ticket = await _create(db, models.KitchenTicket, ticket)
+    publish("kitchen_ticket", "created", db_ticket.id, order_id=db_ticket.order_id, priority=db_ticket.priority)
+    return db_ticket
+
+async def get_kitchen_tickets(
+    db: AsyncSession,
+    page: PageParams,
+    order_id: Optional[uuid.UUID] = None,
+    printed: Optional[bool] = None,
+    created: Optional[DateRange] = None,
+):
+    stmt = select(models.KitchenTicket)
+    stmt = apply_filters(stmt, [
+        (models.KitchenTicket.order_id, order_id),
+        (models.KitchenTicket.printed, printed),
+    ])
+    stmt = apply_date_range(stmt, models.KitchenTicket.created_at, created)
+    return await _paginate(db, stmt, models.KitchenTicket.id, KITCHEN_TICKET_SORTS, page, default_sort="created_at")
+
+async def get_kitchen_ticket(db: AsyncSession, ticket_id: uuid.UUID):
+    return await _get_by_id(db, models.KitchenTicket, ticket_id)
+
+async def update_kitchen_ticket(db: AsyncSession, ticket_id: uuid.UUID, ticket_data: schemas.KitchenTicketCreate):
+    db_ticket = await _update(db, models.KitchenTicket, ticket_id, ticket_data)
+    if db_ticket:
+        publish("kitchen_ticket", "updated", ticket_id, order_id=db_ticket.order_id, priority=db_ticket.priority)
+    return db_ticket
+
+async def delete_kitchen_ticket(db: AsyncSession, ticket_id: uuid.UUID):
+    db_ticket = await _delete(db, models.KitchenTicket, ticket_id)
+    if db_ticket:
+        publish("kitchen_ticket", "deleted", ticket_id, order_id=db_ticket.order_id)
+    return db_ticket
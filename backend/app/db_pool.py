@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Estadísticas del pool
+# ----------------------------
+class PoolWaitStats:
+    """
+    Acumula el tiempo que las peticiones esperan por una conexión del pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    # Mide la espera real por una conexión (incluye la cola cuando el pool está lleno)
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+
+# ----------------------------
+# Configuración del engine
+# ----------------------------
+def engine_options(is_async: bool = False) -> Dict[str, Any]:
+    """
+    Argumentos de create_engine/create_async_engine según la configuración.
+
+    En modo PgBouncer (transaction pooling) el pool lo maneja PgBouncer:
+    se usa NullPool y se desactivan los prepared statements de asyncpg.
+    """
+    if settings.DB_PGBOUNCER:
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """
+    Estado actual del pool de un engine (sync o async).
+    """
+    if engine is None:
+        return {}
+    pool = getattr(engine, "sync_engine", engine).pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool.overflow() es negativo mientras el pool no está lleno
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool.wait_stats.snapshot(),
+    }
+
+
+# ----------------------------
+# Precalentamiento
+# ----------------------------
+def _warmup_count() -> int:
+    if settings.DB_PGBOUNCER:
+        return 0
+    return min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)
+
+
+def warmup_pool(engine):
+    """
+    Abre DB_POOL_WARMUP conexiones al arrancar y las devuelve al pool,
+    para que las primeras peticiones no paguen el costo de conexión.
+    """
+    connections = []
+    try:
+        for _ in range(_warmup_count()):
+            connections.append(engine.connect())
+    except Exception as exc:
+        # La API arranca igual; las conexiones se abrirán bajo demanda
+        logger.warning("No se pudo precalentar el pool: %s", exc)
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def warmup_async_pool(engine):
+    connections = []
+    try:
+        for _ in range(_warmup_count()):
+            connections.append(await engine.connect())
+    except Exception as exc:
+        logger.warning("No se pudo precalentar el pool async: %s", exc)
+    finally:
+        for conn in connections:
+            await conn.close()
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+from app.notify_bus import bus
+
+logger = logging.getLogger(__name__)
+
+# Evento que reemplaza a los descartados cuando la cola de un cliente se llena
+RESYNC_MESSAGE = json.dumps({"entity": "*", "action": "resync"}, separators=(",", ":"))
+
+
+# ----------------------------
+# Suscripción
+# ----------------------------
+class Subscription:
+    """
+    Cola acotada de un cliente (pantalla de cocina, tablet, etc.).
+
+    Si el cliente no consume a tiempo y la cola se llena, se descartan los
+    eventos pendientes y se deja un único evento "resync": el cliente debe
+    recargar la lista completa en vez de recibir cambios incompletos.
+    """
+
+    def __init__(self, entities: Optional[Set[str]] = None):
+        self.entities = entities
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        # "*" (resync) llega también a los clientes filtrados: deben recargar
+        return self.entities is None or event["entity"] in self.entities or event["entity"] == "*"
+
+    def offer(self, message: str):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_MESSAGE)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# ----------------------------
+# Broadcaster en proceso
+# ----------------------------
+class Broadcaster:
+    """
+    Reparte cada evento publicado a todas las suscripciones del proceso.
+
+    publish() se llama desde crud, que corre en el threadpool de FastAPI:
+    el evento se serializa una sola vez y se entrega al event loop con
+    call_soon_threadsafe, sin importar cuántos clientes estén conectados.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, entities: Optional[Iterable[str]] = None) -> Subscription:
+        sub = Subscription(set(entities) if entities else None)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, event: Dict[str, Any]):
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subscribers:
+            return
+        message = json.dumps(event, default=str, separators=(",", ":"))
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(event, message)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, event, message)
+
+    def _fan_out(self, event: Dict[str, Any], message: str):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.wants(event):
+                sub.offer(message)
+
+
+broadcaster = Broadcaster()
+
+
+def publish(entity: str, action: str, entity_id: Any = None, **fields):
+    """
+    Publica un evento compacto de cambio, ej.:
+    {"entity": "order", "action": "updated", "id": "...", "status": "ready"}
+
+    Se llama después del commit, igual que invalidate_floor_plan(). El
+    evento se entrega a los clientes de este worker y, vía bus, a los demás.
+    """
+    event = {"entity": entity, "action": action, "id": entity_id, **fields}
+    try:
+        broadcaster.publish(event)
+        bus.notify(event)
+    except Exception:
+        # Un fallo del canal push nunca debe romper la escritura ya confirmada
+        logger.exception("No se pudo publicar el evento %s.%s", entity, action)
+
+
+@bus.on_remote
+def _forward_remote(event: Dict[str, Any]):
+    # Cambios hechos en otros workers: se reenvían a los clientes de este
+    broadcaster.publish(event)
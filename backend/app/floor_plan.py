@@ -0,0 +1,20 @@
+from app.cache import VersionedCache
+from app.notify_bus import affects, bus
+
+# ----------------------------
+# Plano de mesas en memoria
+# ----------------------------
+# Snapshot de mesas activas con su estado. Se invalida desde crud en
+# create_table, delete_table y update_table_status. En los demás workers
+# se invalida al recibir por el bus el evento "table" que publica crud.
+floor_plan_cache = VersionedCache("tables")
+
+
+def invalidate_floor_plan():
+    floor_plan_cache.invalidate()
+
+
+@bus.on_remote
+def _on_remote_change(event):
+    if affects(event, "table"):
+        floor_plan_cache.invalidate()
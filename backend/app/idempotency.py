@@ -0,0 +1,158 @@
+import hashlib
+import itertools
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_claims = itertools.count(1)
+
+
+# ----------------------------
+# Idempotency-Key
+# ----------------------------
+class IdempotentRequest:
+    """
+    POST con cabecera Idempotency-Key (ver la dependencia idempotency_key).
+
+    La primera petición reclama la clave con un INSERT ... ON CONFLICT y la
+    confirma antes de ejecutar la escritura, así que un duplicado concurrente
+    (en cualquier worker) ve la clave tomada y recibe 409. Al terminar se
+    guarda la respuesta y los reintentos la reciben tal cual, sin escribir.
+
+    Si la escritura falla, la clave se libera: los errores no se guardan y el
+    cliente puede reintentar. Una clave en curso cuyo worker murió se puede
+    reclamar de nuevo después de IDEMPOTENCY_LOCK_SECONDS.
+    """
+
+    def __init__(self, scope: str, key: Optional[str], fingerprint: str):
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+
+    def _where(self):
+        ik = models.IdempotencyKey
+        return (ik.scope == self.scope, ik.key == self.key)
+
+    def _claim_stmt(self):
+        ik = models.IdempotencyKey
+        values = {
+            "fingerprint": self.fingerprint,
+            "status_code": None,
+            "response": None,
+            "expires_at": func.now() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+        }
+        stmt = pg_insert(ik).values(scope=self.scope, key=self.key, **values)
+        # Una clave vencida (respuesta expirada o petición abandonada) se reutiliza
+        return stmt.on_conflict_do_update(
+            index_elements=[ik.scope, ik.key],
+            set_=values,
+            where=ik.expires_at < func.now(),
+        ).returning(ik.key)
+
+    def _lookup_stmt(self):
+        ik = models.IdempotencyKey
+        return select(ik.fingerprint, ik.status_code, ik.response).where(*self._where())
+
+    def _store_stmt(self, status_code: int, body: Any):
+        return (
+            update(models.IdempotencyKey)
+            .where(*self._where())
+            .values(
+                status_code=status_code,
+                response=body,
+                expires_at=func.now() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+
+    def _release_stmt(self):
+        return delete(models.IdempotencyKey).where(*self._where())
+
+    def _replay(self, row) -> JSONResponse:
+        if row is not None and row.fingerprint != self.fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if row is None or row.status_code is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return JSONResponse(row.response, status_code=row.status_code, headers={REPLAYED_HEADER: "true"})
+
+    # ----------------------------
+    # Sync (Session)
+    # ----------------------------
+    def run(self, db: Session, create: Callable[[], Any], out_schema, status_code: int = 200):
+        """
+        Ejecuta create() una sola vez por clave; en los reintentos devuelve la
+        respuesta guardada. out_schema es el response_model de la ruta.
+        """
+        if self.key is None:
+            return create()
+        if next(_claims) % settings.IDEMPOTENCY_PURGE_EVERY == 0:
+            db.execute(purge_expired_stmt())
+        claimed = db.execute(self._claim_stmt()).first()
+        db.commit()
+        if claimed is None:
+            return self._replay(db.execute(self._lookup_stmt()).first())
+        try:
+            result = create()
+        except BaseException:
+            db.rollback()
+            db.execute(self._release_stmt())
+            db.commit()
+            raise
+        body = jsonable_encoder(out_schema.model_validate(result))
+        db.execute(self._store_stmt(status_code, body))
+        db.commit()
+        return result
+
+    # ----------------------------
+    # Async (AsyncSession)
+    # ----------------------------
+    async def run_async(self, db: AsyncSession, create: Callable[[], Awaitable[Any]], out_schema, status_code: int = 200):
+        if self.key is None:
+            return await create()
+        if next(_claims) % settings.IDEMPOTENCY_PURGE_EVERY == 0:
+            await db.execute(purge_expired_stmt())
+        claimed = (await db.execute(self._claim_stmt())).first()
+        await db.commit()
+        if claimed is None:
+            return self._replay((await db.execute(self._lookup_stmt())).first())
+        try:
+            result = await create()
+        except BaseException:
+            await db.rollback()
+            await db.execute(self._release_stmt())
+            await db.commit()
+            raise
+        body = jsonable_encoder(out_schema.model_validate(result))
+        await db.execute(self._store_stmt(status_code, body))
+        await db.commit()
+        return result
+
+
+def purge_expired_stmt():
+    # Desalojo por TTL; se ejecuta cada IDEMPOTENCY_PURGE_EVERY reclamos por worker
+    return delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at < func.now())
+
+
+async def idempotency_key(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+) -> IdempotentRequest:
+    """
+    Dependencia para los POST de creación. Sin cabecera, run() solo ejecuta
+    la escritura. La huella del cuerpo detecta una clave reutilizada con
+    otra petición.
+    """
+    body = await request.body() if idempotency_key else b""
+    fingerprint = hashlib.sha256(request.method.encode() + b" " + request.url.path.encode() + b"\n" + body).hexdigest()
+    return IdempotentRequest(request.url.path, idempotency_key, fingerprint)
@@ -1,15 +1,58 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from app.routers import (
     auth, users, roles,
     customers, tables, table_status,
     reservations, menu_categories, menu_items,
     inventory, recipe_items, orders, order_items,
-    kitchen_tickets, invoices, payments, audit_logs
+    kitchen_tickets, kitchen, invoices, payments, audit_logs,
+    health, events
 )
+from app.auth.hashing import HashingBusy, hash_pool
+from app.auth.last_login import last_login_buffer
+from app.auth.permissions import Permission, authorize, load_token_versions
+from app.core.config import settings
+from app.database import engine, async_engine
+from app.db_pool import warmup_pool, warmup_async_pool
+from app.events import broadcaster
+from app.notify_bus import bus
+from app.pagination import NEXT_CURSOR_HEADER
 
-app = FastAPI(title="Restaurant API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Los eventos publicados desde el threadpool se entregan en este loop
+    broadcaster.bind(asyncio.get_running_loop())
+    # Bus LISTEN/NOTIFY: mantiene cachés y clientes push coherentes entre workers
+    if settings.NOTIFY_ENABLED:
+        await bus.start()
+    # Arranque: precalentar el pool de conexiones
+    await run_in_threadpool(warmup_pool, engine)
+    if async_engine is not None:
+        await warmup_async_pool(async_engine)
+    # Versiones de permisos de roles y usuarios, para rechazar tokens desactualizados
+    await run_in_threadpool(load_token_versions)
+    # Procesos de hashing (Argon2) listos antes del primer login
+    await run_in_threadpool(hash_pool.warmup)
+    # Escritura en lote de last_login
+    await last_login_buffer.start()
+    yield
+    # Apagado: escribir los last_login pendientes, detener el bus y el pool
+    # de hashing y cerrar conexiones del pool
+    await last_login_buffer.stop()
+    await bus.stop()
+    hash_pool.shutdown()
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(title="Restaurant API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,38 +60,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request: Request, exc: HashingBusy):
+    # Límite de carga de autenticación (login, cambio de contraseña, altas de usuario)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def requires(write: Permission, read: Optional[Permission] = None):
+    # Permisos por router (solo se exigen con RBAC_ENFORCE, ver app/auth/permissions.py)
+    return [Depends(authorize(write, read))]
+
+
+# Modo async: las rutas CRUD de los recursos de alto tráfico usan AsyncSession.
+# Se registran antes que los routers sync, así que toman precedencia sobre las
+# rutas equivalentes; las rutas que solo existen en modo sync siguen disponibles.
+if settings.DB_ASYNC:
+    from app.routers_async import (
+        tables as tables_async, orders as orders_async,
+        order_items as order_items_async, kitchen_tickets as kitchen_tickets_async
+    )
+    app.include_router(tables_async.router, dependencies=requires(Permission.TABLES))
+    app.include_router(orders_async.router, dependencies=requires(Permission.ORDERS))
+    app.include_router(order_items_async.router, dependencies=requires(Permission.ORDERS))
+    app.include_router(kitchen_tickets_async.router, dependencies=requires(Permission.KITCHEN))
+
 # Routers de autenticación y usuarios/roles
 app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(roles.router)
+app.include_router(users.router, dependencies=requires(Permission.USERS))
+app.include_router(roles.router, dependencies=requires(Permission.USERS))
 
 # Routers de clientes y mesas
-app.include_router(customers.router)
-app.include_router(tables.router)
-app.include_router(table_status.router)
+app.include_router(customers.router, dependencies=requires(Permission.CUSTOMERS))
+app.include_router(tables.router, dependencies=requires(Permission.TABLES))
+app.include_router(table_status.router, dependencies=requires(Permission.TABLES))
 
 # Routers de reservas y menú
-app.include_router(reservations.router)
-app.include_router(menu_categories.router)
-app.include_router(menu_items.router)
+app.include_router(reservations.router, dependencies=requires(Permission.RESERVATIONS))
+app.include_router(menu_categories.router, dependencies=requires(Permission.MENU, read=Permission.NONE))
+app.include_router(menu_items.router, dependencies=requires(Permission.MENU, read=Permission.NONE))
 
 # Routers de inventario y recetas
-app.include_router(inventory.router)
-app.include_router(recipe_items.router)
+app.include_router(inventory.router, dependencies=requires(Permission.INVENTORY))
+app.include_router(recipe_items.router, dependencies=requires(Permission.INVENTORY))
 
 # Routers de pedidos y items de pedido
-app.include_router(orders.router)
-app.include_router(order_items.router)
+app.include_router(orders.router, dependencies=requires(Permission.ORDERS))
+app.include_router(order_items.router, dependencies=requires(Permission.ORDERS))
 
 # Routers de cocina, facturas y pagos
-app.include_router(kitchen_tickets.router)
-app.include_router(invoices.router)
-app.include_router(payments.router)
+app.include_router(kitchen_tickets.router, dependencies=requires(Permission.KITCHEN))
+app.include_router(kitchen.router, dependencies=requires(Permission.KITCHEN))
+app.include_router(invoices.router, dependencies=requires(Permission.BILLING))
+app.include_router(payments.router, dependencies=requires(Permission.BILLING))
 
 # Router de auditoría
-app.include_router(audit_logs.router)
+app.include_router(audit_logs.router, dependencies=requires(Permission.AUDIT))
+
+# Router de salud (estado del pool)
+app.include_router(health.router)
+
+# Canal push de cambios (SSE / WebSocket)
+app.include_router(events.router)
 
 @app.get("/")
 def root():
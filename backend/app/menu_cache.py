@@ -0,0 +1,21 @@
+from app.cache import VersionedCache
+from app.notify_bus import affects, bus
+
+# ----------------------------
+# Menú en memoria
+# ----------------------------
+# Categorías y productos del menú, con una sola versión para ambos. Se
+# invalida desde crud en create/update/delete de menu_items y menu_categories
+# (incluidas las operaciones en lote) y, vía bus, desde los demás workers.
+menu_cache = VersionedCache("menu")
+
+
+def invalidate_menu():
+    menu_cache.invalidate()
+    bus.notify({"entity": "menu", "action": "invalidated"})
+
+
+@bus.on_remote
+def _on_remote_change(event):
+    if affects(event, "menu"):
+        menu_cache.invalidate()
@@ -1,22 +1,61 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, TIMESTAMP, SmallInteger, Integer, Numeric, JSON
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, ForeignKey, Text, TIMESTAMP, SmallInteger, Integer, Numeric, JSON, Sequence, event
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import Session, deferred, relationship, with_loader_criteria
 from sqlalchemy.sql import func
+from app.codes import generated_code
+from app.core.config import settings
 from app.database import Base
 import uuid
 
+# Secuencias de order_code / invoice_number (ver app/codes.py)
+ORDER_CODE_SEQ = Sequence("order_code_seq", schema="restaurant", cache=20, metadata=Base.metadata)
+INVOICE_NUMBER_SEQ = Sequence("invoice_number_seq", schema="restaurant", metadata=Base.metadata)
+
+# ----------------------------
+# Borrado lógico (is_active)
+# ----------------------------
+class SoftDelete:
+    """
+    Marca los modelos con borrado lógico. Los SELECT del ORM cuya entidad
+    principal es uno de ellos solo devuelven filas activas (_scope_active_rows),
+    lo que además coincide con los índices parciales WHERE is_active.
+
+    Para incluir las inactivas: .execution_options(include_inactive=True).
+    """
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_active_rows(state):
+    if (
+        not state.is_select
+        or state.is_column_load
+        or state.is_relationship_load
+        or state.execution_options.get("include_inactive", False)
+    ):
+        return
+    descriptions = state.statement.column_descriptions
+    entity = descriptions[0].get("entity") if descriptions else None
+    if isinstance(entity, type) and issubclass(entity, SoftDelete):
+        # "= true" literal: el planner puede usar los índices parciales WHERE is_active
+        state.statement = state.statement.options(with_loader_criteria(entity, entity.is_active == True))
+
+
 # ----------------------------
 # Roles
 # ----------------------------
-class Role(Base):
+class Role(SoftDelete, Base):
     __tablename__ = "roles"
     __table_args__ = {"schema": "restaurant"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(32), unique=True, nullable=False)
     description = Column(Text)
+    # Bitset de app.auth.permissions.Permission; viaja en el access token
+    permissions = Column(Integer, nullable=False, default=0)
+    # Se incrementa al cambiar permissions: invalida los tokens emitidos antes
+    perm_version = Column(Integer, nullable=False, default=1)
     is_active = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     users = relationship("User", back_populates="role")
 
@@ -24,7 +63,7 @@ class Role(Base):
 # ----------------------------
 # Users
 # ----------------------------
-class User(Base):
+class User(SoftDelete, Base):
     __tablename__ = "users"
     __table_args__ = {"schema": "restaurant"}
 
@@ -35,8 +74,10 @@ class User(Base):
     full_name = Column(String(255))
     role_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.roles.id", ondelete="RESTRICT"))
     is_active = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
     last_login = Column(TIMESTAMP)
+    # Se incrementa al cambiar el rol o dar de baja al usuario: invalida sus tokens
+    token_version = Column(Integer, nullable=False, default=1)
 
     role = relationship("Role", back_populates="users")
     reservations_created = relationship("Reservation", back_populates="created_by_user", foreign_keys='Reservation.created_by')
@@ -50,7 +91,7 @@ class User(Base):
 # ----------------------------
 # Customers
 # ----------------------------
-class Customer(Base):
+class Customer(SoftDelete, Base):
     __tablename__ = "customers"
     __table_args__ = {"schema": "restaurant"}
 
@@ -60,7 +101,7 @@ class Customer(Base):
     email = Column(String(255))
     notes = Column(Text)
     is_active = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     reservations = relationship("Reservation", back_populates="customer")
     orders = relationship("Order", back_populates="customer")
@@ -97,10 +138,14 @@ class TableStatus(Base):
     status = Column(String(32), nullable=False)
     updated_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
     updated_at = Column(TIMESTAMP, default=func.now())
+    # Concurrencia optimista: cada UPDATE del ORM lleva WHERE version = :v y la incrementa
+    version = Column(Integer, nullable=False, default=1)
 
     table = relationship("Table", back_populates="status")
     user = relationship("User", back_populates="table_status_updated")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 # ----------------------------
 # Reservations
@@ -112,12 +157,14 @@ class Reservation(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     customer_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.customers.id", ondelete="SET NULL"))
     reserved_at = Column(TIMESTAMP, nullable=False)
+    # Fin de la ocupación de la mesa; tstzrange(reserved_at, ends_at) tiene índice GiST
+    ends_at = Column(TIMESTAMP, nullable=False)
     people_smallint = Column(SmallInteger, nullable=False)
     table_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.tables.id", ondelete="SET NULL"))
     status = Column(String(32), default="confirmed")
     notes = Column(Text)
     created_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     customer = relationship("Customer", back_populates="reservations")
     table = relationship("Table", back_populates="reservations")
@@ -127,16 +174,16 @@ class Reservation(Base):
 # ----------------------------
 # Menu Categories
 # ----------------------------
-class MenuCategory(Base):
+class MenuCategory(SoftDelete, Base):
     __tablename__ = "menu_categories"
     __table_args__ = {"schema": "restaurant"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False, unique=True)
     description = Column(Text)
-    sort_order = Column(Integer, default=0)
+    sort_order = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     menu_items = relationship("MenuItem", back_populates="category")
 
@@ -144,7 +191,7 @@ class MenuCategory(Base):
 # ----------------------------
 # Menu Items
 # ----------------------------
-class MenuItem(Base):
+class MenuItem(SoftDelete, Base):
     __tablename__ = "menu_items"
     __table_args__ = {"schema": "restaurant"}
 
@@ -158,7 +205,10 @@ class MenuItem(Base):
     is_available = Column(Boolean, default=True)
     requires_kitchen = Column(Boolean, default=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
+    # Documento de búsqueda (nombre, código, categoría, descripción); lo mantiene
+    # un trigger en la base de datos (migración 011) y no se carga por defecto
+    search_vector = deferred(Column(TSVECTOR))
     category = relationship("MenuCategory", back_populates="menu_items")
     recipe_items = relationship("RecipeItem", back_populates="menu_item")
     order_items = relationship("OrderItem", back_populates="menu_item")
@@ -167,7 +217,7 @@ class MenuItem(Base):
 # ----------------------------
 # Inventory
 # ----------------------------
-class Inventory(Base):
+class Inventory(SoftDelete, Base):
     __tablename__ = "inventory"
     __table_args__ = {"schema": "restaurant"}
 
@@ -178,14 +228,14 @@ class Inventory(Base):
     quantity = Column(Numeric(12,3), default=0)
     minimum_stock = Column(Numeric(12,3), default=0)
     is_active = Column(Boolean, default=True)  # Delete lógico
-    last_updated = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
+    last_updated = Column(TIMESTAMP, nullable=False, default=func.now(), onupdate=func.now())
     recipe_items = relationship("RecipeItem", back_populates="inventory")
 
 
 # ----------------------------
 # Recipe Items
 # ----------------------------
-class RecipeItem(Base):
+class RecipeItem(SoftDelete, Base):
     __tablename__ = "recipe_items"
     __table_args__ = {"schema": "restaurant"}
 
@@ -207,14 +257,16 @@ class Order(Base):
     __table_args__ = {"schema": "restaurant"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_code = Column(String(50), unique=True)
+    order_code = Column(String(50), unique=True, default=generated_code(settings.ORDER_CODE_PREFIX, ORDER_CODE_SEQ))
     table_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.tables.id", ondelete="SET NULL"))
     customer_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.customers.id", ondelete="SET NULL"))
     created_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
     status = Column(String(32), default="pending")
     is_takeaway = Column(Boolean, default=False)
-    created_at = Column(TIMESTAMP, default=func.now())
-    updated_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
+    updated_at = Column(TIMESTAMP, nullable=False, default=func.now())
+    # version_id_col, igual que TableStatus.version
+    version = Column(Integer, nullable=False, default=1)
 
     table = relationship("Table", back_populates="orders")
     customer = relationship("Customer", back_populates="orders")
@@ -223,6 +275,8 @@ class Order(Base):
     kitchen_tickets = relationship("KitchenTicket", back_populates="order")
     invoices = relationship("Invoice", back_populates="order")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 # ----------------------------
 # Order Items
@@ -239,11 +293,17 @@ class OrderItem(Base):
     tax_rate = Column(Numeric(4,2), default=0.00)
     notes = Column(Text)
     status = Column(String(32), default="pending")
-    created_at = Column(TIMESTAMP, default=func.now())
+    # True mientras la receta de la línea está descontada del inventario
+    stock_deducted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
+    # version_id_col, igual que TableStatus.version
+    version = Column(Integer, nullable=False, default=1)
 
     order = relationship("Order", back_populates="order_items")
     menu_item = relationship("MenuItem", back_populates="order_items")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 # ----------------------------
 # Kitchen Tickets
@@ -255,8 +315,13 @@ class KitchenTicket(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     order_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.orders.id", ondelete="CASCADE"))
     printed = Column(Boolean, default=False)
-    priority = Column(Integer, default=0)
-    created_at = Column(TIMESTAMP, default=func.now())
+    priority = Column(Integer, nullable=False, default=0)
+    station = Column(String(50))  # NULL = cualquier estación
+    # Cola de trabajo: quién tomó el ticket, hasta cuándo y cuándo se terminó
+    claimed_by = Column(String(100))
+    claimed_until = Column(TIMESTAMP(timezone=True))
+    completed_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     order = relationship("Order", back_populates="kitchen_tickets")
 
@@ -269,7 +334,7 @@ class Invoice(Base):
     __table_args__ = {"schema": "restaurant"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    invoice_number = Column(String(50), unique=True)
+    invoice_number = Column(String(50), unique=True, default=generated_code(settings.INVOICE_NUMBER_PREFIX, INVOICE_NUMBER_SEQ))
     order_id = Column(UUID(as_uuid=True), ForeignKey("restaurant.orders.id", ondelete="SET NULL"))
     subtotal = Column(Numeric(12,2), nullable=False)
     tax_total = Column(Numeric(12,2), default=0)
@@ -277,7 +342,7 @@ class Invoice(Base):
     discount_amount = Column(Numeric(12,2), default=0)
     total = Column(Numeric(12,2), nullable=False)
     created_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
     paid = Column(Boolean, default=False)
 
     order = relationship("Order", back_populates="invoices")
@@ -297,7 +362,7 @@ class Payment(Base):
     method = Column(String(50), nullable=False)
     amount = Column(Numeric(12,2), nullable=False)
     transaction_ref = Column(String(255))
-    paid_at = Column(TIMESTAMP, default=func.now())
+    paid_at = Column(TIMESTAMP, nullable=False, default=func.now())
     created_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
 
     invoice = relationship("Invoice", back_populates="payments")
@@ -319,6 +384,24 @@ class AuditLog(Base):
     new_data = Column(JSON)
     performed_by = Column(UUID(as_uuid=True), ForeignKey("restaurant.users.id", ondelete="SET NULL"))
     reason = Column(Text)
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
 
     performed_by_user = relationship("User", back_populates="audit_logs")
+
+
+# ----------------------------
+# Idempotency Keys
+# ----------------------------
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = {"schema": "restaurant"}
+
+    # scope = ruta del POST; la misma clave puede usarse en rutas distintas
+    scope = Column(String(100), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL mientras la petición original está en curso
+    status_code = Column(SmallInteger)
+    response = Column(JSON)
+    created_at = Column(TIMESTAMP, default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
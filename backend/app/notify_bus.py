@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Límite de Postgres para el payload de NOTIFY (8000 bytes)
+MAX_PAYLOAD_BYTES = 7900
+RESYNC_EVENT = {"entity": "*", "action": "resync"}
+
+
+# ----------------------------
+# Bus entre workers (LISTEN/NOTIFY)
+# ----------------------------
+class NotifyBus:
+    """
+    Propaga eventos de cambio entre los workers de uvicorn con LISTEN/NOTIFY.
+
+    Cada worker abre una conexión asyncpg dedicada (fuera del pool) que
+    escucha el canal y también envía los NOTIFY de este proceso, en lotes.
+    Los mensajes llevan el id del worker de origen: cada worker ignora los
+    suyos, porque ya los aplicó localmente al hacer la escritura.
+
+    Al reconectar se asume que hubo mensajes perdidos: se invalidan las
+    cachés locales y se avisa a los demás workers con un evento "resync".
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def on_remote(self, handler: Callable[[Dict[str, Any]], None]):
+        """
+        Registra un handler para los eventos de otros workers. Corre en el event loop.
+        """
+        self._handlers.append(handler)
+        return handler
+
+    def notify(self, event: Dict[str, Any]):
+        """
+        Encola un evento para los demás workers. No bloquea y puede llamarse
+        desde el threadpool (crud sync) o desde el event loop (crud async).
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        payload = json.dumps({"o": self.worker_id, "e": event}, default=str, separators=(",", ":"))
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            payload = json.dumps({"o": self.worker_id, "e": {**RESYNC_EVENT, "entity": event.get("entity", "*")}})
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._enqueue(payload)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, payload)
+
+    def _enqueue(self, payload: str):
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Sin conexión por mucho tiempo: los demás workers harán resync al reconectar
+            logger.warning("Bus de notificaciones: cola llena, se descarta un evento")
+
+    # ----------------------------
+    # Ciclo de vida
+    # ----------------------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=settings.NOTIFY_OUTBOX_SIZE)
+        self._task = asyncio.create_task(self._run(_listen_dsn()))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._loop = None
+
+    async def _run(self, dsn: str):
+        connected_before = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notification)
+                if connected_before:
+                    self._dispatch(RESYNC_EVENT)
+                    self._enqueue(json.dumps({"o": self.worker_id, "e": RESYNC_EVENT}))
+                connected_before = True
+                logger.info("Bus de notificaciones escuchando en '%s'", self.channel)
+                await self._send_loop(conn, lost)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Bus de notificaciones desconectado: %s", exc)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close(timeout=2)
+                    except Exception:
+                        conn.terminate()
+            await asyncio.sleep(settings.NOTIFY_RECONNECT_SECONDS)
+
+    async def _send_loop(self, conn, lost: asyncio.Event):
+        lost_wait = asyncio.ensure_future(lost.wait())
+        try:
+            while True:
+                get = asyncio.ensure_future(self._outbox.get())
+                await asyncio.wait({get, lost_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    raise ConnectionError("conexión de LISTEN cerrada")
+                # Todo lo acumulado sale en un solo round-trip
+                batch = [get.result()]
+                while not self._outbox.empty() and len(batch) < 100:
+                    batch.append(self._outbox.get_nowait())
+                await conn.executemany("SELECT pg_notify($1, $2)", [(self.channel, p) for p in batch])
+        finally:
+            lost_wait.cancel()
+
+    def _on_notification(self, _conn, _pid, _channel, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("o") == self.worker_id:
+            return
+        self._dispatch(message.get("e") or RESYNC_EVENT)
+
+    def _dispatch(self, event: Dict[str, Any]):
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Error en handler del bus de notificaciones")
+
+
+def _listen_dsn() -> str:
+    # LISTEN necesita una sesión propia: con PgBouncer en modo transaction
+    # se debe apuntar NOTIFY_DATABASE_URL directo a Postgres
+    url = make_url(settings.NOTIFY_DATABASE_URL or settings.DATABASE_URL)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def affects(event: Dict[str, Any], entity: str) -> bool:
+    # "*" (resync) afecta a todas las entidades
+    return event.get("entity") in (entity, "*")
+
+
+bus = NotifyBus(settings.NOTIFY_CHANNEL)
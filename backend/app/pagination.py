@@ -0,0 +1,239 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query as SAQuery
+
+from app.core.config import settings
+
+# Header con el cursor de la siguiente página (vacío si no hay más filas)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ----------------------------
+# Parámetros de paginación
+# ----------------------------
+class PageParams:
+    """
+    Dependencia común para los endpoints de listado.
+
+    Args:
+        limit (int): Cantidad máxima de filas a devolver.
+        cursor (str, optional): Cursor opaco devuelto por la página anterior.
+        sort (str, optional): Clave de orden; prefijo '-' para descendente (ej. '-created_at').
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(None),
+        sort: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+
+    @property
+    def cache_key(self):
+        return (self.limit, self.cursor, self.sort)
+
+
+class DateRange:
+    """
+    Dependencia común para filtrar por rango de fechas (inclusive).
+    """
+
+    def __init__(
+        self,
+        date_from: Optional[datetime] = Query(None),
+        date_to: Optional[datetime] = Query(None),
+    ):
+        self.date_from = date_from
+        self.date_to = date_to
+
+
+# ----------------------------
+# Filtros
+# ----------------------------
+def apply_filters(query: SAQuery, filters: Iterable[Tuple[Any, Any]]) -> SAQuery:
+    """
+    Aplica filtros de igualdad (columna == valor), ignorando los valores None.
+    """
+    for column, value in filters:
+        if value is not None:
+            query = query.filter(column == value)
+    return query
+
+
+def apply_in_filter(query: SAQuery, column, values: Optional[List[Any]]) -> SAQuery:
+    """
+    Aplica un filtro de pertenencia (columna IN valores); con un solo valor usa igualdad.
+    """
+    if not values:
+        return query
+    if len(values) == 1:
+        return query.filter(column == values[0])
+    return query.filter(column.in_(values))
+
+
+def parse_uuid_list(raw: Optional[str], param: str) -> Optional[List[uuid.UUID]]:
+    """
+    Convierte un parámetro 'a,b,c' en una lista de UUID (sin duplicados).
+    """
+    if not raw:
+        return None
+    try:
+        values = [uuid.UUID(part.strip()) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid UUID in '{param}'")
+    if len(values) > settings.PAGE_SIZE_MAX:
+        raise HTTPException(status_code=400, detail=f"Too many values in '{param}'")
+    return list(dict.fromkeys(values))
+
+
+def apply_date_range(query: SAQuery, column, date_range: Optional[DateRange]) -> SAQuery:
+    """
+    Aplica un rango de fechas sobre la columna indicada.
+    """
+    if date_range is None:
+        return query
+    if date_range.date_from is not None:
+        query = query.filter(column >= date_range.date_from)
+    if date_range.date_to is not None:
+        query = query.filter(column <= date_range.date_to)
+    return query
+
+
+# ----------------------------
+# Cursor
+# ----------------------------
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _decode_value(column, raw):
+    if raw is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(sort_key: str, value, row_id) -> str:
+    payload = json.dumps([sort_key, _encode_value(value), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_key, value, row_id
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ----------------------------
+# Paginación keyset
+# ----------------------------
+def keyset(query, id_column, sort_columns: Dict[str, Any], page: PageParams, default_sort: str):
+    """
+    Aplica orden, límite y condición keyset a una consulta.
+
+    Funciona tanto con Query (sesión sync) como con select() (sesión async).
+    Las columnas de orden deben ser NOT NULL: la comparación de tuplas con un
+    NULL no es verdadera y esa fila quedaría fuera de todas las páginas.
+
+    Returns:
+        tuple: (consulta, clave de orden, columna de orden)
+    """
+    sort = page.sort or default_sort
+    descending = sort.startswith("-")
+    sort_key = sort.lstrip("-")
+    if sort_key not in sort_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort key '{sort_key}'. Allowed: {', '.join(sorted(sort_columns))}",
+        )
+    column = sort_columns[sort_key]
+
+    if page.cursor:
+        cursor_key, raw_value, raw_id = decode_cursor(page.cursor)
+        if cursor_key != sort:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort")
+        try:
+            last = tuple_(column, id_column)
+            # Los valores se enlazan con el tipo de la columna (timestamp, uuid, ...)
+            bound = tuple_(
+                literal(_decode_value(column, raw_value), column.type),
+                literal(uuid.UUID(raw_id), id_column.type),
+            )
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(last < bound if descending else last > bound)
+
+    if descending:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+
+    # Se pide una fila extra para saber si existe una página siguiente
+    return query.limit(page.limit + 1), sort, column
+
+
+def page_result(rows: List[Any], sort: str, column, page: PageParams) -> Tuple[List[Any], Optional[str]]:
+    """
+    Recorta la fila extra y calcula el cursor de la siguiente página.
+    """
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last_row, column.key), last_row.id)
+    return rows, next_cursor
+
+
+def paginate(
+    query: SAQuery,
+    id_column,
+    sort_columns: Dict[str, Any],
+    page: PageParams,
+    default_sort: str,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Pagina una consulta por keyset (columna de orden, id).
+
+    El costo de cada página es constante: se filtra con una comparación de
+    tuplas contra la última fila de la página anterior en lugar de usar OFFSET.
+
+    Args:
+        query: Consulta base ya filtrada.
+        id_column: Columna id del modelo, usada para desempatar.
+        sort_columns (dict): Claves de orden permitidas -> columna.
+        page (PageParams): Parámetros de la petición.
+        default_sort (str): Orden por defecto (ej. '-created_at').
+
+    Returns:
+        tuple: (filas, cursor de la siguiente página o None)
+    """
+    query, sort, column = keyset(query, id_column, sort_columns, page, default_sort)
+    return page_result(query.all(), sort, column, page)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """
+    Expone el cursor de la siguiente página en el header de la respuesta.
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
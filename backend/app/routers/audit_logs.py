@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
 from app.database import get_db
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/audit_logs", tags=["AuditLogs"])
@@ -12,8 +13,23 @@ def create_audit_log(log: schemas.AuditLogCreate, db: Session = Depends(get_db))
     return crud.create_audit_log(db, log)
 
 @router.get("/", response_model=List[schemas.AuditLog])
-def read_audit_logs(db: Session = Depends(get_db)):
-    return crud.get_audit_logs(db)
+def read_audit_logs(
+    response: Response,
+    entity: Optional[str] = None,
+    entity_id: Optional[uuid.UUID] = None,
+    action: Optional[str] = None,
+    performed_by: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    logs, next_cursor = crud.get_audit_logs(
+        db, page,
+        entity=entity, entity_id=entity_id, action=action,
+        performed_by=performed_by, created=created,
+    )
+    set_next_cursor(response, next_cursor)
+    return logs
 
 @router.get("/{log_id}", response_model=schemas.AuditLog)
 def read_audit_log(log_id: uuid.UUID, db: Session = Depends(get_db)):
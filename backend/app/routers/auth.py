@@ -9,6 +9,9 @@ from app import schemas, crud
 from app.database import get_db
 from app.auth.hashing import Hasher
 from app.auth.jwt_handler import create_access_token, create_refresh_token, decode_token
+from app.auth.last_login import last_login_buffer
+from app.auth.permissions import role_versions, user_versions
+from app.auth.principals import Principal, invalidate_principal, principal_cache
 from app.core.config import settings
 
 router = APIRouter(
@@ -44,12 +47,12 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     username_or_email = form_data.username
     password = form_data.password
 
-    # Buscar usuario
-    user = crud.get_user_by_username(db, username_or_email)
-    if not user:
-        user = crud.get_user_by_email(db, username_or_email)
+    # Buscar usuario (username o email) con su rol, en una sola consulta
+    user = crud.get_user_for_login(db, username_or_email)
 
-    if not user or not Hasher.verify_password(password, user.password_hash):
+    # Argon2 corre en el pool de procesos de hashing (ver app/auth/hashing.py)
+    verified, new_hash = Hasher.verify_and_update(password, user.password_hash) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos"
@@ -61,17 +64,18 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Usuario inactivo"
         )
 
-    # Actualizar last_login
-    user.last_login = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
-
-    # Crear tokens
+    # Tokens y respuesta se arman antes del commit: el commit expira el
+    # usuario y su rol, y leerlos después volvería a consultar la base de datos
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username},
-        expires_delta=access_token_expires
+        expires_delta=access_token_expires,
+        role=user.role,
+        user=user
     )
+    if user.role is not None:
+        role_versions.observe(user.role.id, user.role.perm_version)
+    user_versions.observe(user.id, user.token_version)
 
     refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     refresh_token = create_refresh_token(
@@ -79,7 +83,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         expires_delta=refresh_token_expires
     )
 
-    return TokenResponse(
+    response = TokenResponse(
         access_token=access_token,
         refresh_token=refresh_token,
         user={
@@ -90,6 +94,21 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         }
     )
 
+    # last_login se escribe en lote en segundo plano; sin el buffer activo
+    # se guarda aquí mismo
+    now = datetime.utcnow()
+    if not last_login_buffer.record(user.id, now):
+        user.last_login = now
+
+    # Hash con parámetros de Argon2 anteriores: se reemplaza por uno con los actuales
+    if new_hash:
+        user.password_hash = new_hash
+
+    if db.dirty:
+        db.commit()
+
+    return response
+
 
 # =======================
 # GET CURRENT USER
@@ -103,15 +122,23 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except Exception:
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    user = crud.get_user_by_username(db, username)
-    if not user:
+    # Con la entrada en caché no se consulta la base de datos (la sesión no
+    # llega a tomar una conexión del pool)
+    principal = principal_cache.get_or_load(username, lambda: crud.get_principal(db, username))
+    if not principal:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail="Usuario inactivo")
+    return principal
 
 
 @router.get("/me", response_model=schemas.User)
-def read_current_user(current_user: schemas.User = Depends(get_current_user)):
-    return current_user
+def read_current_user(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    # El perfil completo (email, last_login, ...) sí se lee de la base de datos
+    user = crud.get_user(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Usuario no encontrado")
+    return user
 
 
 # =======================
@@ -125,7 +152,7 @@ class PasswordChange(BaseModel):
 @router.post("/change-password")
 def change_password(
     password_data: PasswordChange,
-    current_user: schemas.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     user = crud.get_user(db, current_user.id)
@@ -135,6 +162,7 @@ def change_password(
     user.password_hash = Hasher.get_password_hash(password_data.new_password)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
     return {"msg": "Contraseña actualizada correctamente"}
 
 
@@ -161,13 +189,20 @@ def refresh_access_token(
     user = crud.get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Usuario inactivo")
 
     # Crear nuevo access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username},
-        expires_delta=access_token_expires
+        expires_delta=access_token_expires,
+        role=user.role,
+        user=user
     )
+    if user.role is not None:
+        role_versions.observe(user.role.id, user.role.perm_version)
+    user_versions.observe(user.id, user.token_version)
 
     return TokenResponse(
         access_token=access_token,
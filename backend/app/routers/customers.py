@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app import crud, schemas
 from app.database import get_db
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
@@ -12,8 +13,24 @@ def create_customer(customer: schemas.CustomerCreate, db: Session = Depends(get_
     return crud.create_customer(db, customer)
 
 @router.get("/", response_model=List[schemas.Customer])
-def read_customers(db: Session = Depends(get_db)):
-    return crud.get_customers(db)
+def read_customers(
+    response: Response,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    customers, next_cursor = crud.get_customers(db, page, created=created)
+    set_next_cursor(response, next_cursor)
+    return customers
+
+# Autocompletado (ej. pantalla de órdenes); debe declararse antes de /{customer_id}
+@router.get("/search", response_model=List[schemas.Customer])
+def search_customers(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    return crud.search_customers(db, q, limit=limit)
 
 @router.get("/{customer_id}", response_model=schemas.Customer)
 def read_customer(customer_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -35,3 +52,10 @@ def delete_customer(customer_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     return db_customer
+
+@router.post("/{customer_id}/restore", response_model=schemas.Customer)
+def restore_customer(customer_id: uuid.UUID, db: Session = Depends(get_db)):
+    db_customer = crud.restore_customer(db, customer_id)
+    if not db_customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return db_customer
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.core.config import settings
+from app.events import broadcaster
+import json
+
+router = APIRouter(tags=["Events"])
+
+ENTITIES_DESCRIPTION = "Entidades separadas por coma: order, order_item, kitchen_ticket, table (todas si se omite)"
+PING_MESSAGE = json.dumps({"entity": "*", "action": "ping"}, separators=(",", ":"))
+
+
+def _parse_entities(raw: Optional[str]):
+    return [e.strip() for e in raw.split(",") if e.strip()] if raw else None
+
+
+# ----------------------------
+# Server-Sent Events
+# ----------------------------
+@router.get("/events")
+async def stream_events(request: Request, entities: Optional[str] = Query(None, description=ENTITIES_DESCRIPTION)):
+    """
+    Flujo SSE de eventos de cambio. Cada mensaje `data:` es un JSON compacto
+    ({"entity", "action", "id", ...}); ante "resync" el cliente recarga la lista.
+    """
+    sub = broadcaster.subscribe(_parse_entities(entities))
+
+    async def _stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                message = await sub.get(settings.EVENTS_HEARTBEAT_SECONDS)
+                # Comentario SSE como keep-alive para proxies
+                yield f"data: {message}\n\n" if message else ": ping\n\n"
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_stream(), media_type="text/event-stream", headers=headers)
+
+
+# ----------------------------
+# WebSocket
+# ----------------------------
+@router.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket, entities: Optional[str] = None):
+    await websocket.accept()
+    sub = broadcaster.subscribe(_parse_entities(entities))
+    try:
+        while True:
+            message = await sub.get(settings.EVENTS_HEARTBEAT_SECONDS)
+            await websocket.send_text(message or PING_MESSAGE)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        broadcaster.unsubscribe(sub)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from app.database import engine, async_engine
+from app.db_pool import pool_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/db-pool")
+def read_db_pool():
+    # Estado del pool de este worker; multiplicar por el número de workers
+    # para compararlo con max_connections de Postgres
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine)}
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app import crud, schemas
+from app.core.config import settings
 from app.database import get_db
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
@@ -12,8 +14,15 @@ def create_inventory(item: schemas.InventoryCreate, db: Session = Depends(get_db
     return crud.create_inventory(db, item)
 
 @router.get("/", response_model=List[schemas.Inventory])
-def read_inventory(db: Session = Depends(get_db)):
-    return crud.get_inventory(db)
+def read_inventory(
+    response: Response,
+    updated: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = crud.get_inventory(db, page, updated=updated)
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/{item_id}", response_model=schemas.Inventory)
 def read_inventory_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -35,3 +44,42 @@ def delete_inventory(item_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
     return db_item
+
+@router.post("/{item_id}/restore", response_model=schemas.Inventory)
+def restore_inventory(item_id: uuid.UUID, db: Session = Depends(get_db)):
+    db_item = crud.restore_inventory(db, item_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    return db_item
+
+
+# ----------------------------
+# Operaciones en lote
+# ----------------------------
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.Inventory])
+def bulk_create_inventory(
+    items: List[schemas.InventoryCreate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_create_inventory(db, items)
+
+@router.patch("/bulk", response_model=schemas.BulkResult[schemas.Inventory])
+def bulk_update_inventory(
+    items: List[schemas.InventoryBulkUpdate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_update_inventory(db, items)
+
+@router.post("/bulk/receive", response_model=schemas.BulkResult[schemas.Inventory])
+def receive_inventory(
+    items: List[schemas.InventoryReceipt] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.receive_inventory(db, items)
+
+@router.post("/bulk/delete", response_model=schemas.BulkDeleteResult)
+def bulk_delete_inventory(
+    ids: List[uuid.UUID] = Body(..., embed=True, max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_delete_inventory(db, ids)
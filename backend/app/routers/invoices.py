@@ -1,19 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
 from app.database import get_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
 @router.post("/", response_model=schemas.Invoice)
-def create_invoice(invoice: schemas.InvoiceCreate, db: Session = Depends(get_db)):
-    return crud.create_invoice(db, invoice)
+def create_invoice(
+    invoice: schemas.InvoiceCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    return idem.run(db, lambda: crud.create_invoice(db, invoice), schemas.Invoice)
 
 @router.get("/", response_model=List[schemas.Invoice])
-def read_invoices(db: Session = Depends(get_db)):
-    return crud.get_invoices(db)
+def read_invoices(
+    response: Response,
+    order_id: Optional[uuid.UUID] = None,
+    paid: Optional[bool] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    invoices, next_cursor = crud.get_invoices(
+        db, page, order_id=order_id, paid=paid, created_by=created_by, created=created
+    )
+    set_next_cursor(response, next_cursor)
+    return invoices
 
 @router.get("/{invoice_id}", response_model=schemas.Invoice)
 def read_invoice(invoice_id: uuid.UUID, db: Session = Depends(get_db)):
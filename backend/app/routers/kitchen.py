@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app import crud, schemas
+from app.database import get_db
+import uuid
+
+router = APIRouter(prefix="/kitchen", tags=["Kitchen"])
+
+# ----------------------------
+# Pantalla de cocina
+# ----------------------------
+@router.get("/orders", response_model=List[schemas.KitchenOrder])
+def read_kitchen_orders(db: Session = Depends(get_db)):
+    return crud.get_kitchen_orders(db)
+
+@router.get("/orders/{order_id}", response_model=schemas.KitchenOrder)
+def read_kitchen_order(order_id: uuid.UUID, db: Session = Depends(get_db)):
+    kitchen_order = crud.get_kitchen_order(db, order_id)
+    if not kitchen_order:
+        raise HTTPException(status_code=404, detail="Kitchen order not found")
+    return kitchen_order
+
+@router.put("/orders/{order_id}/status", response_model=schemas.KitchenOrder)
+def update_kitchen_order_status(
+    order_id: uuid.UUID,
+    status: str = Query(..., description="pending, fired, preparing, ready, served o cancelled"),
+    db: Session = Depends(get_db),
+):
+    try:
+        kitchen_order = crud.update_kitchen_order_status(db, order_id, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not kitchen_order:
+        raise HTTPException(status_code=404, detail="Kitchen order not found")
+    return kitchen_order
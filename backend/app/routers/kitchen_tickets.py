@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.core.config import settings
 from app.database import get_db
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/kitchen_tickets", tags=["KitchenTickets"])
@@ -12,8 +14,19 @@ def create_ticket(ticket: schemas.KitchenTicketCreate, db: Session = Depends(get
     return crud.create_kitchen_ticket(db, ticket)
 
 @router.get("/", response_model=List[schemas.KitchenTicket])
-def read_tickets(db: Session = Depends(get_db)):
-    return crud.get_kitchen_tickets(db)
+def read_tickets(
+    response: Response,
+    order_id: Optional[uuid.UUID] = None,
+    printed: Optional[bool] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    tickets, next_cursor = crud.get_kitchen_tickets(
+        db, page, order_id=order_id, printed=printed, created=created
+    )
+    set_next_cursor(response, next_cursor)
+    return tickets
 
 @router.get("/{ticket_id}", response_model=schemas.KitchenTicket)
 def read_ticket(ticket_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -35,3 +48,35 @@ def delete_ticket(ticket_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_ticket:
         raise HTTPException(status_code=404, detail="Kitchen ticket not found")
     return db_ticket
+
+
+# ----------------------------
+# Cola de trabajo por estación
+# ----------------------------
+@router.post("/claim", response_model=List[schemas.KitchenTicket])
+def claim_tickets(
+    claimed_by: str = Query(..., description="Identificador de la estación o cocinero"),
+    station: Optional[str] = None,
+    limit: int = Query(1, ge=1, le=settings.KITCHEN_CLAIM_MAX),
+    db: Session = Depends(get_db),
+):
+    return crud.claim_kitchen_tickets(db, claimed_by, limit, station=station)
+
+def _claimed_or_error(db: Session, ticket_id: uuid.UUID, ticket):
+    if ticket:
+        return ticket
+    if not crud.get_kitchen_ticket(db, ticket_id):
+        raise HTTPException(status_code=404, detail="Kitchen ticket not found")
+    raise HTTPException(status_code=409, detail="Kitchen ticket is not claimed by this station")
+
+@router.post("/{ticket_id}/ack", response_model=schemas.KitchenTicket)
+def ack_ticket(ticket_id: uuid.UUID, claimed_by: str, db: Session = Depends(get_db)):
+    return _claimed_or_error(db, ticket_id, crud.ack_kitchen_ticket(db, ticket_id, claimed_by))
+
+@router.post("/{ticket_id}/bump", response_model=schemas.KitchenTicket)
+def bump_ticket(ticket_id: uuid.UUID, claimed_by: str, priority_delta: int = 0, db: Session = Depends(get_db)):
+    return _claimed_or_error(db, ticket_id, crud.bump_kitchen_ticket(db, ticket_id, claimed_by, priority_delta))
+
+@router.post("/{ticket_id}/extend", response_model=schemas.KitchenTicket)
+def extend_ticket_lease(ticket_id: uuid.UUID, claimed_by: str, db: Session = Depends(get_db)):
+    return _claimed_or_error(db, ticket_id, crud.extend_kitchen_ticket_lease(db, ticket_id, claimed_by))
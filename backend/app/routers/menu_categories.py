@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from app import crud, schemas
+from app.cache import cached_response
 from app.database import get_db
+from app.menu_cache import menu_cache
+from app.pagination import PageParams
 import uuid
 
 router = APIRouter(prefix="/menu_categories", tags=["MenuCategories"])
@@ -11,16 +14,26 @@ router = APIRouter(prefix="/menu_categories", tags=["MenuCategories"])
 def create_category(category: schemas.MenuCategoryCreate, db: Session = Depends(get_db)):
     return crud.create_menu_category(db, category)
 
+# Lecturas desde menu_cache (ETag/304), igual que /menu_items
 @router.get("/", response_model=List[schemas.MenuCategory])
-def read_categories(db: Session = Depends(get_db)):
-    return crud.get_menu_categories(db)
+def read_categories(request: Request, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    def _load_categories():
+        categories, next_cursor = crud.get_menu_categories(db, page)
+        return [schemas.MenuCategory.model_validate(c) for c in categories], next_cursor
+
+    entry = menu_cache.get_or_load_page(("categories", *page.cache_key), _load_categories)
+    return cached_response(request, entry)
 
 @router.get("/{category_id}", response_model=schemas.MenuCategory)
-def read_category(category_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_category = crud.get_menu_category(db, category_id)
-    if not db_category:
+def read_category(category_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    def _load_category():
+        db_category = crud.get_menu_category(db, category_id)
+        return schemas.MenuCategory.model_validate(db_category) if db_category else None
+
+    entry = menu_cache.get_or_load(("category", category_id), _load_category)
+    if entry.data is None:
         raise HTTPException(status_code=404, detail="Menu category not found")
-    return db_category
+    return cached_response(request, entry)
 
 @router.put("/{category_id}", response_model=schemas.MenuCategory)
 def update_category(category_id: uuid.UUID, category: schemas.MenuCategoryCreate, db: Session = Depends(get_db)):
@@ -35,3 +48,10 @@ def delete_category(category_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_category:
         raise HTTPException(status_code=404, detail="Menu category not found")
     return db_category
+
+@router.post("/{category_id}/restore", response_model=schemas.MenuCategory)
+def restore_menu_category(category_id: uuid.UUID, db: Session = Depends(get_db)):
+    db_category = crud.restore_menu_category(db, category_id)
+    if not db_category:
+        raise HTTPException(status_code=404, detail="Menu category not found")
+    return db_category
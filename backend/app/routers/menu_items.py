@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.cache import cached_response
+from app.core.config import settings
 from app.database import get_db
+from app.menu_cache import menu_cache
+from app.pagination import PageParams, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/menu_items", tags=["MenuItems"])
@@ -11,16 +15,50 @@ router = APIRouter(prefix="/menu_items", tags=["MenuItems"])
 def create_menu_item(item: schemas.MenuItemCreate, db: Session = Depends(get_db)):
     return crud.create_menu_item(db, item)
 
+# Las lecturas se sirven desde menu_cache: con el ETag vigente se responde
+# 304 sin consultar la base de datos ni serializar con pydantic.
 @router.get("/", response_model=List[schemas.MenuItem])
-def read_menu_items(db: Session = Depends(get_db)):
-    return crud.get_menu_items(db)
+def read_menu_items(
+    request: Request,
+    category_id: Optional[uuid.UUID] = None,
+    is_available: Optional[bool] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    def _load_items():
+        items, next_cursor = crud.get_menu_items(db, page, category_id=category_id, is_available=is_available)
+        return [schemas.MenuItem.model_validate(item) for item in items], next_cursor
+
+    key = ("items", category_id, is_available, *page.cache_key)
+    return cached_response(request, menu_cache.get_or_load_page(key, _load_items))
+
+# Búsqueda de texto para el buscador del menú; no pasa por menu_cache porque
+# cada término sería una entrada distinta.
+@router.get("/search", response_model=List[schemas.MenuItem])
+def search_menu_items(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    category_id: Optional[uuid.UUID] = None,
+    is_available: Optional[bool] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = crud.search_menu_items(
+        db, q, page, category_id=category_id, is_available=is_available
+    )
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/{item_id}", response_model=schemas.MenuItem)
-def read_menu_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_item = crud.get_menu_item(db, item_id)
-    if not db_item:
+def read_menu_item(item_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    def _load_item():
+        db_item = crud.get_menu_item(db, item_id)
+        return schemas.MenuItem.model_validate(db_item) if db_item else None
+
+    entry = menu_cache.get_or_load(("item", item_id), _load_item)
+    if entry.data is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
-    return db_item
+    return cached_response(request, entry)
 
 @router.put("/{item_id}", response_model=schemas.MenuItem)
 def update_menu_item(item_id: uuid.UUID, item: schemas.MenuItemCreate, db: Session = Depends(get_db)):
@@ -35,3 +73,35 @@ def delete_menu_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     return db_item
+
+@router.post("/{item_id}/restore", response_model=schemas.MenuItem)
+def restore_menu_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
+    db_item = crud.restore_menu_item(db, item_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    return db_item
+
+
+# ----------------------------
+# Operaciones en lote
+# ----------------------------
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.MenuItem])
+def bulk_create_menu_items(
+    items: List[schemas.MenuItemCreate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_create_menu_items(db, items)
+
+@router.patch("/bulk", response_model=schemas.BulkResult[schemas.MenuItem])
+def bulk_update_menu_items(
+    items: List[schemas.MenuItemBulkUpdate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_update_menu_items(db, items)
+
+@router.post("/bulk/delete", response_model=schemas.BulkDeleteResult)
+def bulk_delete_menu_items(
+    ids: List[uuid.UUID] = Body(..., embed=True, max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_delete_menu_items(db, ids)
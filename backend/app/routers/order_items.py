@@ -1,32 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
+from app.core.config import settings
 from app.database import get_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, parse_uuid_list, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/order_items", tags=["OrderItems"])
 
 @router.post("/", response_model=schemas.OrderItem)
-def create_order_item(item: schemas.OrderItemCreate, db: Session = Depends(get_db)):
-    return crud.create_order_item(db, item)
+def create_order_item(
+    item: schemas.OrderItemCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    return idem.run(db, lambda: crud.create_order_item(db, item), schemas.OrderItem)
 
 @router.get("/", response_model=List[schemas.OrderItem])
-def read_order_items(db: Session = Depends(get_db)):
-    return crud.get_order_items(db)
+def read_order_items(
+    response: Response,
+    order_id: Optional[str] = Query(None, description="Uno o varios ids de orden separados por coma"),
+    status: Optional[str] = None,
+    menu_item_id: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = crud.get_order_items(
+        db, page,
+        order_ids=parse_uuid_list(order_id, "order_id"),
+        status=status, menu_item_id=menu_item_id, created=created,
+    )
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/{item_id}", response_model=schemas.OrderItem)
-def read_order_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
+def read_order_item(item_id: uuid.UUID, response: Response, db: Session = Depends(get_db)):
     db_item = crud.get_order_item(db, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Order item not found")
+    set_etag(response, db_item.version)
     return db_item
 
 @router.put("/{item_id}", response_model=schemas.OrderItem)
-def update_order_item(item_id: uuid.UUID, item: schemas.OrderItemCreate, db: Session = Depends(get_db)):
-    db_item = crud.update_order_item(db, item_id, item)
+def update_order_item(
+    item_id: uuid.UUID,
+    item: schemas.OrderItemCreate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    try:
+        db_item = crud.update_order_item(db, item_id, item, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
     if not db_item:
         raise HTTPException(status_code=404, detail="Order item not found")
+    set_etag(response, db_item.version)
     return db_item
 
 @router.delete("/{item_id}", response_model=schemas.OrderItem)
@@ -35,3 +68,28 @@ def delete_order_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_item:
         raise HTTPException(status_code=404, detail="Order item not found")
     return db_item
+
+
+# ----------------------------
+# Operaciones en lote
+# ----------------------------
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.OrderItem])
+def bulk_create_order_items(
+    items: List[schemas.OrderItemCreate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_create_order_items(db, items)
+
+@router.patch("/bulk", response_model=schemas.BulkResult[schemas.OrderItem])
+def bulk_update_order_items(
+    items: List[schemas.OrderItemBulkUpdate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_update_order_items(db, items)
+
+@router.post("/bulk/delete", response_model=schemas.BulkDeleteResult)
+def bulk_delete_order_items(
+    ids: List[uuid.UUID] = Body(..., embed=True, max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_delete_order_items(db, ids)
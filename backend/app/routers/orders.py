@@ -1,32 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
 from app.database import get_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
 @router.post("/", response_model=schemas.Order)
-def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
-    return crud.create_order(db, order)
+def create_order(
+    order: schemas.OrderCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    return idem.run(db, lambda: crud.create_order(db, order), schemas.Order)
+
+@router.post("/place", response_model=schemas.OrderPlaced)
+def place_order(
+    order: schemas.OrderPlace,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    # Orden, líneas y ticket de cocina en una sola petición y transacción
+    try:
+        return idem.run(db, lambda: crud.place_order(db, order), schemas.OrderPlaced)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 @router.get("/", response_model=List[schemas.Order])
-def read_orders(db: Session = Depends(get_db)):
-    return crud.get_orders(db)
+def read_orders(
+    response: Response,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    orders, next_cursor = crud.get_orders(
+        db, page,
+        status=status, table_id=table_id, customer_id=customer_id,
+        created_by=created_by, created=created,
+    )
+    set_next_cursor(response, next_cursor)
+    return orders
 
 @router.get("/{order_id}", response_model=schemas.Order)
-def read_order(order_id: uuid.UUID, db: Session = Depends(get_db)):
+def read_order(order_id: uuid.UUID, response: Response, db: Session = Depends(get_db)):
     db_order = crud.get_order(db, order_id)
     if not db_order:
         raise HTTPException(status_code=404, detail="Order not found")
+    set_etag(response, db_order.version)
     return db_order
 
 @router.put("/{order_id}", response_model=schemas.Order)
-def update_order(order_id: uuid.UUID, order: schemas.OrderCreate, db: Session = Depends(get_db)):
-    db_order = crud.update_order(db, order_id, order)
+def update_order(
+    order_id: uuid.UUID,
+    order: schemas.OrderCreate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    try:
+        db_order = crud.update_order(db, order_id, order, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
     if not db_order:
         raise HTTPException(status_code=404, detail="Order not found")
+    set_etag(response, db_order.version)
     return db_order
 
 @router.delete("/{order_id}", response_model=schemas.Order)
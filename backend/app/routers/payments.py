@@ -1,19 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
 from app.database import get_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
 @router.post("/", response_model=schemas.Payment)
-def create_payment(payment: schemas.PaymentCreate, db: Session = Depends(get_db)):
-    return crud.create_payment(db, payment)
+def create_payment(
+    payment: schemas.PaymentCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    return idem.run(db, lambda: crud.create_payment(db, payment), schemas.Payment)
 
 @router.get("/", response_model=List[schemas.Payment])
-def read_payments(db: Session = Depends(get_db)):
-    return crud.get_payments(db)
+def read_payments(
+    response: Response,
+    invoice_id: Optional[uuid.UUID] = None,
+    method: Optional[str] = None,
+    paid: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    payments, next_cursor = crud.get_payments(db, page, invoice_id=invoice_id, method=method, paid=paid)
+    set_next_cursor(response, next_cursor)
+    return payments
 
 @router.get("/{payment_id}", response_model=schemas.Payment)
 def read_payment(payment_id: uuid.UUID, db: Session = Depends(get_db)):
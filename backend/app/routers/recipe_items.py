@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.core.config import settings
 from app.database import get_db
+from app.pagination import PageParams, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/recipe_items", tags=["RecipeItems"])
@@ -12,8 +14,16 @@ def create_recipe_item(item: schemas.RecipeItemCreate, db: Session = Depends(get
     return crud.create_recipe_item(db, item)
 
 @router.get("/", response_model=List[schemas.RecipeItem])
-def read_recipe_items(db: Session = Depends(get_db)):
-    return crud.get_recipe_items(db)
+def read_recipe_items(
+    response: Response,
+    menu_item_id: Optional[uuid.UUID] = None,
+    inventory_id: Optional[uuid.UUID] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = crud.get_recipe_items(db, page, menu_item_id=menu_item_id, inventory_id=inventory_id)
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/{item_id}", response_model=schemas.RecipeItem)
 def read_recipe_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -35,3 +45,35 @@ def delete_recipe_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
     if not db_item:
         raise HTTPException(status_code=404, detail="Recipe item not found")
     return db_item
+
+@router.post("/{item_id}/restore", response_model=schemas.RecipeItem)
+def restore_recipe_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
+    db_item = crud.restore_recipe_item(db, item_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Recipe item not found")
+    return db_item
+
+
+# ----------------------------
+# Operaciones en lote
+# ----------------------------
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.RecipeItem])
+def bulk_create_recipe_items(
+    items: List[schemas.RecipeItemCreate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_create_recipe_items(db, items)
+
+@router.patch("/bulk", response_model=schemas.BulkResult[schemas.RecipeItem])
+def bulk_update_recipe_items(
+    items: List[schemas.RecipeItemBulkUpdate] = Body(..., max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_update_recipe_items(db, items)
+
+@router.post("/bulk/delete", response_model=schemas.BulkDeleteResult)
+def bulk_delete_recipe_items(
+    ids: List[uuid.UUID] = Body(..., embed=True, max_length=settings.BULK_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    return crud.bulk_delete_recipe_items(db, ids)
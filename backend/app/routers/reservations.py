@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app import crud, schemas
 from app.database import get_db
+from app.pagination import PageParams, DateRange, set_next_cursor
 import uuid
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
@@ -12,8 +14,40 @@ def create_reservation(reservation: schemas.ReservationCreate, db: Session = Dep
     return crud.create_reservation(db, reservation)
 
 @router.get("/", response_model=List[schemas.Reservation])
-def read_reservations(db: Session = Depends(get_db)):
-    return crud.get_reservations(db)
+def read_reservations(
+    response: Response,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    reserved: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    reservations, next_cursor = crud.get_reservations(
+        db, page, status=status, table_id=table_id, customer_id=customer_id, reserved=reserved
+    )
+    set_next_cursor(response, next_cursor)
+    return reservations
+
+@router.post("/assign", response_model=schemas.TableAssignmentResult)
+def assign_tables(request: schemas.TableAssignmentRequest, db: Session = Depends(get_db)):
+    try:
+        return crud.assign_tables(db, request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+# Debe declararse antes de /{reservation_id}
+@router.get("/availability", response_model=List[schemas.TableWithStatus])
+def read_availability(
+    starts_at: datetime,
+    party_size: int = Query(..., ge=1),
+    duration_minutes: Optional[int] = Query(None, ge=15, le=720),
+    location: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return crud.get_available_tables(
+        db, starts_at, party_size, duration_minutes=duration_minutes, location=location
+    )
 
 @router.get("/{reservation_id}", response_model=schemas.Reservation)
 def read_reservation(reservation_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app import schemas, crud
 from app.database import get_db
+from app.pagination import PageParams, set_next_cursor
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
@@ -11,8 +12,10 @@ def create_role(role: schemas.RoleCreate, db: Session = Depends(get_db)):
     return crud.create_role(db, role)
 
 @router.get("/", response_model=List[schemas.Role])
-def read_roles(db: Session = Depends(get_db)):
-    return crud.get_roles(db)
+def read_roles(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    roles, next_cursor = crud.get_roles(db, page)
+    set_next_cursor(response, next_cursor)
+    return roles
 
 @router.get("/{role_id}", response_model=schemas.Role)
 def read_role(role_id: str, db: Session = Depends(get_db)):
@@ -34,3 +37,10 @@ def delete_role(role_id: str, db: Session = Depends(get_db)):
     if not db_role:
         raise HTTPException(status_code=404, detail="Role not found")
     return db_role
+
+@router.post("/{role_id}/restore", response_model=schemas.Role)
+def restore_role(role_id: str, db: Session = Depends(get_db)):
+    db_role = crud.restore_role(db, role_id)
+    if not db_role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return db_role
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import crud, schemas
+from app.cache import cached_response
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
 from app.database import get_db
+from app.floor_plan import floor_plan_cache
 import uuid
 
 router = APIRouter(prefix="/tables", tags=["Tables"])
@@ -14,16 +17,24 @@ router = APIRouter(prefix="/tables", tags=["Tables"])
 def create_table(table: schemas.TableCreate, db: Session = Depends(get_db)):
     return crud.create_table(db, table)
 
+# Las lecturas se sirven desde el snapshot en memoria (floor_plan_cache).
+# La sesión no abre conexión hasta la primera consulta, así que un acierto
+# de caché no toca Postgres.
 @router.get("/", response_model=List[schemas.TableWithStatus])
-def read_tables(db: Session = Depends(get_db)):
-    return crud.get_tables_with_status(db)
+def read_tables(request: Request, db: Session = Depends(get_db)):
+    entry = floor_plan_cache.get_or_load("", lambda: crud.get_tables_with_status(db))
+    return cached_response(request, entry)
 
 @router.get("/{table_id}", response_model=schemas.TableWithStatus)
-def read_table(table_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_table = crud.get_table(db, table_id)
-    if not db_table:
+def read_table(table_id: uuid.UUID, request: Request, db: Session = Depends(get_db)):
+    def _load_table():
+        tables = floor_plan_cache.get_or_load("", lambda: crud.get_tables_with_status(db)).data
+        return next((t for t in tables if t.id == table_id), None)
+
+    entry = floor_plan_cache.get_or_load(table_id, _load_table)
+    if entry.data is None:
         raise HTTPException(status_code=404, detail="Table not found")
-    return db_table
+    return cached_response(request, entry)
 
 @router.put("/{table_id}", response_model=schemas.TableWithStatus)
 def update_table(table_id: uuid.UUID, table: schemas.TableCreate, db: Session = Depends(get_db)):
@@ -46,10 +57,20 @@ class TableStatusUpdate(schemas.BaseModel):
     status: str
 
 @router.patch("/{table_id}/status", response_model=schemas.TableWithStatus)
-def update_table_status(table_id: uuid.UUID, status_update: TableStatusUpdate = Body(...), db: Session = Depends(get_db)):
-    table = crud.update_table_status(db, table_id, status_update.status)
+def update_table_status(
+    table_id: uuid.UUID,
+    response: Response,
+    status_update: TableStatusUpdate = Body(...),
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    try:
+        table = crud.update_table_status(db, table_id, status_update.status, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
     if not table:
         raise HTTPException(status_code=404, detail="Mesa no encontrada")
+    set_etag(response, table.status_version)
     return table
 
 # ----------------------------
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import schemas, crud
 from app.database import get_db
+from app.pagination import PageParams, set_next_cursor
+import uuid
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,8 +16,15 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return crud.create_user(db, user)
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(db: Session = Depends(get_db)):
-    return crud.get_users(db)
+def read_users(
+    response: Response,
+    role_id: Optional[uuid.UUID] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    users, next_cursor = crud.get_users(db, page, role_id=role_id)
+    set_next_cursor(response, next_cursor)
+    return users
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user(user_id: str, db: Session = Depends(get_db)):
@@ -38,6 +47,9 @@ def delete_user(user_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
-@router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return crud.get_users_paginated(db, skip=skip, limit=limit)
+@router.post("/{user_id}/restore", response_model=schemas.User)
+def restore_user(user_id: str, db: Session = Depends(get_db)):
+    db_user = crud.restore_user(db, user_id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
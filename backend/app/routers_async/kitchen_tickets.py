@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import crud_async, schemas
+from app.database import get_async_db
+from app.pagination import PageParams, DateRange, set_next_cursor
+import uuid
+
+router = APIRouter(prefix="/kitchen_tickets", tags=["KitchenTickets"])
+
+@router.post("/", response_model=schemas.KitchenTicket)
+async def create_ticket(ticket: schemas.KitchenTicketCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_kitchen_ticket(db, ticket)
+
+@router.get("/", response_model=List[schemas.KitchenTicket])
+async def read_tickets(
+    response: Response,
+    order_id: Optional[uuid.UUID] = None,
+    printed: Optional[bool] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    tickets, next_cursor = await crud_async.get_kitchen_tickets(
+        db, page, order_id=order_id, printed=printed, created=created
+    )
+    set_next_cursor(response, next_cursor)
+    return tickets
+
+@router.get("/{ticket_id}", response_model=schemas.KitchenTicket)
+async def read_ticket(ticket_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_ticket = await crud_async.get_kitchen_ticket(db, ticket_id)
+    if not db_ticket:
+        raise HTTPException(status_code=404, detail="Kitchen ticket not found")
+    return db_ticket
+
+@router.put("/{ticket_id}", response_model=schemas.KitchenTicket)
+async def update_ticket(ticket_id: uuid.UUID, ticket: schemas.KitchenTicketCreate, db: AsyncSession = Depends(get_async_db)):
+    db_ticket = await crud_async.update_kitchen_ticket(db, ticket_id, ticket)
+    if not db_ticket:
+        raise HTTPException(status_code=404, detail="Kitchen ticket not found")
+    return db_ticket
+
+@router.delete("/{ticket_id}", response_model=schemas.KitchenTicket)
+async def delete_ticket(ticket_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_ticket = await crud_async.delete_kitchen_ticket(db, ticket_id)
+    if not db_ticket:
+        raise HTTPException(status_code=404, detail="Kitchen ticket not found")
+    return db_ticket
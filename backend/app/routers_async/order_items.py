@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import crud_async, schemas
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
+from app.database import get_async_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, parse_uuid_list, set_next_cursor
+import uuid
+
+router = APIRouter(prefix="/order_items", tags=["OrderItems"])
+
+@router.post("/", response_model=schemas.OrderItem)
+async def create_order_item(
+    item: schemas.OrderItemCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await idem.run_async(db, lambda: crud_async.create_order_item(db, item), schemas.OrderItem)
+
+@router.get("/", response_model=List[schemas.OrderItem])
+async def read_order_items(
+    response: Response,
+    order_id: Optional[str] = Query(None, description="Uno o varios ids de orden separados por coma"),
+    status: Optional[str] = None,
+    menu_item_id: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    items, next_cursor = await crud_async.get_order_items(
+        db, page,
+        order_ids=parse_uuid_list(order_id, "order_id"),
+        status=status, menu_item_id=menu_item_id, created=created,
+    )
+    set_next_cursor(response, next_cursor)
+    return items
+
+@router.get("/{item_id}", response_model=schemas.OrderItem)
+async def read_order_item(item_id: uuid.UUID, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_item = await crud_async.get_order_item(db, item_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    set_etag(response, db_item.version)
+    return db_item
+
+@router.put("/{item_id}", response_model=schemas.OrderItem)
+async def update_order_item(
+    item_id: uuid.UUID,
+    item: schemas.OrderItemCreate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        db_item = await crud_async.update_order_item(db, item_id, item, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    set_etag(response, db_item.version)
+    return db_item
+
+@router.delete("/{item_id}", response_model=schemas.OrderItem)
+async def delete_order_item(item_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_item = await crud_async.delete_order_item(db, item_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    return db_item
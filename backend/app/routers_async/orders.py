@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import crud_async, schemas
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
+from app.database import get_async_db
+from app.idempotency import IdempotentRequest, idempotency_key
+from app.pagination import PageParams, DateRange, set_next_cursor
+import uuid
+
+router = APIRouter(prefix="/orders", tags=["Orders"])
+
+@router.post("/", response_model=schemas.Order)
+async def create_order(
+    order: schemas.OrderCreate,
+    idem: IdempotentRequest = Depends(idempotency_key),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await idem.run_async(db, lambda: crud_async.create_order(db, order), schemas.Order)
+
+@router.get("/", response_model=List[schemas.Order])
+async def read_orders(
+    response: Response,
+    status: Optional[str] = None,
+    table_id: Optional[uuid.UUID] = None,
+    customer_id: Optional[uuid.UUID] = None,
+    created_by: Optional[uuid.UUID] = None,
+    created: DateRange = Depends(),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    orders, next_cursor = await crud_async.get_orders(
+        db, page,
+        status=status, table_id=table_id, customer_id=customer_id,
+        created_by=created_by, created=created,
+    )
+    set_next_cursor(response, next_cursor)
+    return orders
+
+@router.get("/{order_id}", response_model=schemas.Order)
+async def read_order(order_id: uuid.UUID, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_order = await crud_async.get_order(db, order_id)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    set_etag(response, db_order.version)
+    return db_order
+
+@router.put("/{order_id}", response_model=schemas.Order)
+async def update_order(
+    order_id: uuid.UUID,
+    order: schemas.OrderCreate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        db_order = await crud_async.update_order(db, order_id, order, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    set_etag(response, db_order.version)
+    return db_order
+
+@router.delete("/{order_id}", response_model=schemas.Order)
+async def delete_order(order_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_order = await crud_async.delete_order(db, order_id)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return db_order
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import crud_async, schemas
+from app.cache import cached_response
+from app.concurrency import CONFLICT_DETAIL, VersionConflict, if_match_version, set_etag
+from app.database import get_async_db
+from app.floor_plan import floor_plan_cache
+import uuid
+
+router = APIRouter(prefix="/tables", tags=["Tables"])
+
+# ----------------------------
+# CRUD Mesas
+# ----------------------------
+@router.post("/", response_model=schemas.TableWithStatus)
+async def create_table(table: schemas.TableCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_table(db, table)
+
+@router.get("/", response_model=List[schemas.TableWithStatus])
+async def read_tables(request: Request, db: AsyncSession = Depends(get_async_db)):
+    entry = await floor_plan_cache.aget_or_load("", lambda: crud_async.get_tables_with_status(db))
+    return cached_response(request, entry)
+
+@router.get("/{table_id}", response_model=schemas.TableWithStatus)
+async def read_table(table_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def _load_table():
+        entry = await floor_plan_cache.aget_or_load("", lambda: crud_async.get_tables_with_status(db))
+        return next((t for t in entry.data if t.id == table_id), None)
+
+    entry = await floor_plan_cache.aget_or_load(table_id, _load_table)
+    if entry.data is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return cached_response(request, entry)
+
+@router.delete("/{table_id}", response_model=schemas.TableWithStatus)
+async def delete_table(table_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    db_table = await crud_async.delete_table(db, table_id)
+    if not db_table:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return db_table
+
+# ----------------------------
+# PATCH para actualizar solo el estado
+# ----------------------------
+@router.patch("/{table_id}/status", response_model=schemas.TableWithStatus)
+async def update_table_status(
+    table_id: uuid.UUID,
+    response: Response,
+    status_update: schemas.TableStatusUpdate = Body(...),
+    expected_version: Optional[int] = Depends(if_match_version),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        table = await crud_async.update_table_status(db, table_id, status_update.status, expected_version=expected_version)
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+    if not table:
+        raise HTTPException(status_code=404, detail="Mesa no encontrada")
+    set_etag(response, table.status_version)
+    return table
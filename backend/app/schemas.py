@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Generic, Optional, List, TypeVar
 from datetime import datetime
+from app.auth.permissions import Permission
 import uuid
 
 # ----------------------------
@@ -11,10 +12,13 @@ class RoleBase(BaseModel):
     description: Optional[str] = None
 
 class RoleCreate(RoleBase):
-    pass
+    # Bitset de Permission; None en un update deja los permisos como están
+    permissions: Optional[int] = Field(None, ge=0, le=int(Permission.ALL))
 
 class Role(RoleBase):
     id: uuid.UUID
+    permissions: int
+    perm_version: int
     is_active: bool
     created_at: Optional[datetime]
 
@@ -80,6 +84,8 @@ class TableWithStatus(TableBase):
     created_at: datetime
     status: str
     status_id: Optional[uuid.UUID]
+    # Versión de table_status, para If-Match en PATCH /tables/{id}/status
+    status_version: Optional[int] = None
 
     class Config:
         from_attributes = True  # Pydantic V2
@@ -114,6 +120,8 @@ class TableStatusUpdate(BaseModel):
 class ReservationBase(BaseModel):
     customer_id: Optional[uuid.UUID] = None
     reserved_at: datetime
+    # Si se omite: reserved_at + RESERVATION_DURATION_MINUTES
+    ends_at: Optional[datetime] = None
     people_smallint: int
     table_id: Optional[uuid.UUID] = None
     status: Optional[str] = "confirmed"
@@ -130,13 +138,47 @@ class Reservation(ReservationBase):
     class Config:
         from_attributes = True
 
+class WalkIn(BaseModel):
+    people_smallint: int
+    # Si se omite: ahora
+    arrive_at: Optional[datetime] = None
+    duration_minutes: Optional[int] = None
+    location: Optional[str] = None
+    customer_id: Optional[uuid.UUID] = None
+    notes: Optional[str] = None
+
+class TableAssignmentRequest(BaseModel):
+    # Ventana de la noche: se asignan las reservas que empiezan dentro de ella
+    starts_at: datetime
+    ends_at: datetime
+    walk_ins: List[WalkIn] = []
+    # Reubicar también las reservas que ya tienen mesa (salvo las "seated")
+    reassign: bool = False
+    # Solo calcular, sin escribir
+    dry_run: bool = False
+
+class TableAssignment(BaseModel):
+    reservation_id: Optional[uuid.UUID] = None
+    # Posición en walk_ins, si el grupo es un walk-in
+    walk_in: Optional[int] = None
+    people_smallint: int
+    reserved_at: datetime
+    ends_at: datetime
+    table_id: Optional[uuid.UUID] = None
+    table_code: Optional[str] = None
+    seats: Optional[int] = None
+
+class TableAssignmentResult(BaseModel):
+    assigned: List[TableAssignment]
+    unassigned: List[TableAssignment]
+
 # ----------------------------
 # Menu Categories
 # ----------------------------
 class MenuCategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
-    sort_order: Optional[int] = 0
+    sort_order: int = 0
 
 class MenuCategoryCreate(MenuCategoryBase):
     pass
@@ -165,6 +207,17 @@ class MenuItemBase(BaseModel):
 class MenuItemCreate(MenuItemBase):
     pass
 
+class MenuItemBulkUpdate(BaseModel):
+    id: uuid.UUID
+    code: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category_id: Optional[uuid.UUID] = None
+    price: Optional[float] = None
+    tax_rate: Optional[float] = None
+    is_available: Optional[bool] = None
+    requires_kitchen: Optional[bool] = None
+
 class MenuItem(MenuItemBase):
     id: uuid.UUID
     is_active: bool
@@ -186,6 +239,19 @@ class InventoryBase(BaseModel):
 class InventoryCreate(InventoryBase):
     pass
 
+class InventoryBulkUpdate(BaseModel):
+    id: uuid.UUID
+    item_name: Optional[str] = None
+    sku: Optional[str] = None
+    unit: Optional[str] = None
+    quantity: Optional[float] = None
+    minimum_stock: Optional[float] = None
+
+class InventoryReceipt(BaseModel):
+    # Entrada de stock: quantity se suma a la existencia actual
+    id: uuid.UUID
+    quantity: float
+
 class Inventory(InventoryBase):
     id: uuid.UUID
     is_active: bool
@@ -206,6 +272,13 @@ class RecipeItemBase(BaseModel):
 class RecipeItemCreate(RecipeItemBase):
     pass
 
+class RecipeItemBulkUpdate(BaseModel):
+    id: uuid.UUID
+    menu_item_id: Optional[uuid.UUID] = None
+    inventory_id: Optional[uuid.UUID] = None
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+
 class RecipeItem(RecipeItemBase):
     id: uuid.UUID
     is_active: bool
@@ -228,6 +301,9 @@ class OrderCreate(OrderBase):
 
 class Order(OrderBase):
     id: uuid.UUID
+    order_code: Optional[str] = None
+    # Para If-Match en PUT
+    version: Optional[int] = None
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
@@ -250,31 +326,89 @@ class OrderItemBase(BaseModel):
 class OrderItemCreate(OrderItemBase):
     pass
 
+class OrderItemBulkUpdate(BaseModel):
+    id: uuid.UUID
+    quantity: Optional[int] = None
+    unit_price: Optional[float] = None
+    tax_rate: Optional[float] = None
+    notes: Optional[str] = None
+    status: Optional[str] = None
+    # Si se envía, la fila solo se actualiza si sigue en esa versión
+    version: Optional[int] = None
+
 class OrderItem(OrderItemBase):
     id: uuid.UUID
+    version: Optional[int] = None
     created_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
+# ----------------------------
+# Place Order (orden + líneas + ticket en una transacción)
+# ----------------------------
+class OrderLineCreate(BaseModel):
+    menu_item_id: uuid.UUID
+    quantity: int
+    notes: Optional[str] = None
+
+class OrderPlace(OrderCreate):
+    items: List[OrderLineCreate]
+    priority: Optional[int] = 0
+
 # ----------------------------
 # Kitchen Tickets
 # ----------------------------
 class KitchenTicketBase(BaseModel):
     order_id: Optional[uuid.UUID] = None
     printed: Optional[bool] = False
-    priority: Optional[int] = 0
+    priority: int = 0
+    station: Optional[str] = None
 
 class KitchenTicketCreate(KitchenTicketBase):
     pass
 
 class KitchenTicket(KitchenTicketBase):
     id: uuid.UUID
+    claimed_by: Optional[str] = None
+    claimed_until: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
     created_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
+class OrderPlaced(BaseModel):
+    order: Order
+    items: List[OrderItem]
+    kitchen_ticket: Optional[KitchenTicket] = None
+
+# ----------------------------
+# Pantalla de cocina
+# ----------------------------
+class KitchenOrderLine(BaseModel):
+    id: uuid.UUID
+    menu_item_id: uuid.UUID
+    name: str
+    quantity: int
+    notes: Optional[str] = None
+    status: Optional[str] = None
+
+class KitchenOrder(BaseModel):
+    # id es el de la orden: el frontend consulta /kitchen/orders/{order_id}
+    id: uuid.UUID
+    order_code: Optional[str] = None
+    status: Optional[str] = None
+    is_takeaway: Optional[bool] = False
+    table_id: Optional[uuid.UUID] = None
+    table_code: Optional[str] = None
+    created_at: Optional[datetime] = None
+    ticket_id: uuid.UUID
+    priority: Optional[int] = 0
+    printed: Optional[bool] = False
+    ticket_created_at: Optional[datetime] = None
+    items: List[KitchenOrderLine] = []
+
 # ----------------------------
 # Invoices
 # ----------------------------
@@ -293,6 +427,7 @@ class InvoiceCreate(InvoiceBase):
 
 class Invoice(InvoiceBase):
     id: uuid.UUID
+    invoice_number: Optional[str] = None
     created_at: Optional[datetime]
 
     class Config:
@@ -340,6 +475,24 @@ class AuditLog(AuditLogBase):
     class Config:
         from_attributes = True
 
+# ----------------------------
+# Operaciones en lote
+# ----------------------------
+T = TypeVar("T")
+
+class BulkError(BaseModel):
+    index: int
+    id: Optional[uuid.UUID] = None
+    detail: str
+
+class BulkResult(BaseModel, Generic[T]):
+    items: List[T]
+    errors: List[BulkError] = []
+
+class BulkDeleteResult(BaseModel):
+    deleted: List[uuid.UUID]
+    errors: List[BulkError] = []
+
 # ----------------------------
 # Auth Tokens
 # ----------------------------
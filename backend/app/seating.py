@@ -0,0 +1,110 @@
+import bisect
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+# ----------------------------
+# Asignación de mesas en lote
+# ----------------------------
+class Party(NamedTuple):
+    """
+    Grupo a sentar: una reserva existente (key = id) o un walk-in (key = índice).
+    """
+    key: Any
+    start: datetime
+    end: datetime
+    people: int
+    location: Optional[str] = None
+
+
+class TableSlot(NamedTuple):
+    id: Any
+    code: str
+    seats: int
+    location: Optional[str]
+
+
+def _ts(value: datetime) -> float:
+    # Epoch para comparar sin mezclar datetimes con y sin zona horaria
+    return value.timestamp()
+
+
+class _Timeline:
+    """
+    Intervalos ocupados de una mesa, ordenados por inicio y sin solapes
+    (starts y ends quedan ordenados a la vez).
+    """
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def is_free(self, start: float, end: float) -> bool:
+        i = bisect.bisect_left(self.starts, end)
+        # Solo el intervalo anterior a `end` puede solaparse (no hay solapes entre sí)
+        return i == 0 or self.ends[i - 1] <= start
+
+    def gap_before(self, start: float) -> float:
+        # Tiempo libre entre el último intervalo anterior y `start`
+        i = bisect.bisect_right(self.starts, start)
+        return start - self.ends[i - 1] if i else float("inf")
+
+    def add(self, start: float, end: float):
+        # Se fusiona con los intervalos que toca: is_free y gap_before suponen
+        # que no se solapan (una reserva "seated" y la mesa ocupada ahora sí pueden)
+        i = bisect.bisect_left(self.ends, start)
+        j = bisect.bisect_right(self.starts, end)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+
+def plan_assignment(
+    tables: List[TableSlot],
+    parties: List[Party],
+    blocked: Optional[List[Tuple[Any, datetime, datetime]]] = None,
+) -> Tuple[Dict[Any, TableSlot], List[Party]]:
+    """
+    Asigna mesa a cada grupo sin solapar intervalos en una misma mesa.
+
+    Heurística de interval scheduling + best-fit: los grupos se recorren por
+    hora de inicio (los más grandes primero ante empate) y cada uno toma la
+    mesa más chica que lo acomoda y está libre en su ventana, prefiriendo su
+    ubicación y, entre mesas iguales, la que deja menos hueco antes de él.
+    Así una pareja no ocupa un 6-tops mientras haya mesas de 2 libres.
+
+    `blocked` son intervalos ya ocupados (reservas fijas, mesas ocupadas ahora).
+    Devuelve ({key: mesa}, grupos sin lugar).
+    """
+    tables = sorted(tables, key=lambda t: (t.seats, t.code))
+    seat_sizes = [t.seats for t in tables]
+    timelines = {t.id: _Timeline() for t in tables}
+    for table_id, start, end in blocked or ():
+        if table_id in timelines:
+            timelines[table_id].add(_ts(start), _ts(end))
+
+    assigned: Dict[Any, TableSlot] = {}
+    unassigned: List[Party] = []
+    for party in sorted(parties, key=lambda p: (_ts(p.start), -p.people)):
+        start, end = _ts(party.start), _ts(party.end)
+        best = None
+        best_rank = None
+        # Mesas con capacidad suficiente, de menor a mayor
+        for table in tables[bisect.bisect_left(seat_sizes, party.people):]:
+            if best is not None and table.seats > best.seats and best_rank[0] == 0:
+                break
+            timeline = timelines[table.id]
+            if not timeline.is_free(start, end):
+                continue
+            off_location = 0 if party.location in (None, table.location) else 1
+            rank = (off_location, table.seats, timeline.gap_before(start))
+            if best_rank is None or rank < best_rank:
+                best, best_rank = table, rank
+        if best is None:
+            unassigned.append(party)
+            continue
+        timelines[best.id].add(start, end)
+        assigned[party.key] = best
+    return assigned, unassigned
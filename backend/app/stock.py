@@ -0,0 +1,165 @@
+import logging
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import case, event, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# Estados de línea que consumen inventario (la cocina ya la preparó o la está preparando)
+DEPLETING_STATUSES = ("fired", "preparing", "ready", "served")
+# Estados que devuelven al inventario lo ya descontado
+VOID_STATUSES = ("void", "cancelled")
+
+
+# ----------------------------
+# Eventos de stock bajo
+# ----------------------------
+# Callbacks que reciben cada evento de stock bajo, después del commit
+_low_stock_listeners: List[Callable[[Dict], None]] = []
+
+
+def on_low_stock(callback: Callable[[Dict], None]):
+    _low_stock_listeners.append(callback)
+    return callback
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_low_stock(session):
+    for payload in session.info.pop("low_stock_events", []):
+        logger.warning("Stock bajo: %s (%s <= %s)", payload["item_name"], payload["quantity"], payload["minimum_stock"])
+        for callback in _low_stock_listeners:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Error en listener de stock bajo")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_low_stock(session):
+    session.info.pop("low_stock_events", None)
+
+
+# ----------------------------
+# Descuento y devolución de inventario
+# ----------------------------
+def _scope(item_ids: Optional[List], order_id):
+    oi = models.OrderItem
+    if order_id is not None:
+        return oi.order_id == order_id
+    return oi.id.in_(list(item_ids))
+
+
+def _flip(db: Session, scope, deducted: bool, statuses=None) -> List:
+    """
+    Cambia stock_deducted en las líneas del alcance y devuelve los ids cambiados.
+    El cambio de bandera es lo que hace la operación idempotente ante reintentos.
+    """
+    oi, o = models.OrderItem, models.Order
+    conditions = [scope, oi.stock_deducted == (not deducted)]
+    if statuses is not None:
+        conditions.append(oi.status.in_(statuses))
+    if deducted:
+        # Las líneas de una orden anulada no vuelven a descontar aunque sigan
+        # en un estado de consumo (la anulación no cambia el estado de las líneas)
+        conditions.append(~select(o.id).where(o.id == oi.order_id, o.status.in_(VOID_STATUSES)).exists())
+    stmt = (
+        update(oi)
+        .where(*conditions)
+        .values(stock_deducted=deducted)
+        .returning(oi.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(db.scalars(stmt))
+
+
+def _apply_usage(db: Session, consumed_ids: List, restored_ids: List):
+    """
+    Un solo UPDATE inventory ... FROM (recetas agregadas) para todas las líneas:
+    resta lo consumido y suma lo devuelto por ingrediente.
+    """
+    if not consumed_ids and not restored_ids:
+        return
+    oi, ri, inv = models.OrderItem, models.RecipeItem, models.Inventory
+    sign = case((oi.id.in_(consumed_ids), literal(1)), else_=literal(-1))
+    usage = (
+        select(ri.inventory_id.label("inventory_id"), func.sum(ri.quantity * oi.quantity * sign).label("used"))
+        .join(oi, oi.menu_item_id == ri.menu_item_id)
+        .where(oi.id.in_(consumed_ids + restored_ids), ri.is_active == True)
+        .group_by(ri.inventory_id)
+        .subquery()
+    )
+    stmt = (
+        update(inv)
+        .where(inv.id == usage.c.inventory_id)
+        # quantity puede ser NULL (columna sin NOT NULL): se toma como 0
+        .values(quantity=func.coalesce(inv.quantity, 0) - usage.c.used, last_updated=func.now())
+        .returning(inv.id, inv.item_name, inv.quantity, inv.minimum_stock, usage.c.used)
+        .execution_options(synchronize_session=False)
+    )
+    crossed = [row for row in db.execute(stmt) if _crossed_minimum(row.quantity, row.minimum_stock, row.used)]
+    if crossed:
+        _record_low_stock(db, crossed)
+
+
+def _crossed_minimum(quantity, minimum_stock, used) -> bool:
+    """
+    Antes del descuento estaba sobre el mínimo y ahora quedó en o bajo él.
+    Sin minimum_stock (NULL) no hay umbral que cruzar; una devolución
+    (used negativo) nunca lo cruza.
+    """
+    if not used or used <= 0 or minimum_stock is None:
+        return False
+    return quantity <= minimum_stock < quantity + used
+
+
+def _record_low_stock(db: Session, rows):
+    events = [
+        {
+            "inventory_id": row.id,
+            "item_name": row.item_name,
+            "quantity": float(row.quantity),
+            "minimum_stock": float(row.minimum_stock),
+        }
+        for row in rows
+    ]
+    db.execute(insert(models.AuditLog), [
+        {
+            "entity": "inventory",
+            "entity_id": e["inventory_id"],
+            "action": "low_stock",
+            "old_data": {"quantity": float(row.quantity + row.used)},
+            "new_data": {"quantity": e["quantity"], "minimum_stock": e["minimum_stock"]},
+        }
+        for row, e in zip(rows, events)
+    ])
+    db.info.setdefault("low_stock_events", []).extend(events)
+
+
+def sync_order_items_stock(db: Session, item_ids: Optional[List] = None, order_id=None):
+    """
+    Ajusta el inventario al estado actual de las líneas (por ids o de una orden completa).
+
+    Las líneas en DEPLETING_STATUSES aún no descontadas se descuentan y las
+    descontadas que pasaron a VOID_STATUSES se devuelven. No hace commit:
+    se ejecuta dentro de la transacción del cambio de estado.
+    """
+    if order_id is None and not item_ids:
+        return
+    scope = _scope(item_ids, order_id)
+    consumed = _flip(db, scope, True, DEPLETING_STATUSES)
+    restored = _flip(db, scope, False, VOID_STATUSES)
+    _apply_usage(db, consumed, restored)
+
+
+def release_order_items_stock(db: Session, item_ids: Optional[List] = None, order_id=None):
+    """
+    Devuelve al inventario todo lo descontado por las líneas, sin importar su estado.
+    Se usa antes de borrar líneas u órdenes y al anular una orden.
+    """
+    if order_id is None and not item_ids:
+        return
+    restored = _flip(db, _scope(item_ids, order_id), False)
+    _apply_usage(db, [], restored)
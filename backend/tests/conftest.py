@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+# app.database crea el engine al importarse; los tests no abren conexiones a Postgres
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import models  # noqa: E402
+
+
+@pytest.fixture
+def make_session():
+    """
+    Sesión sobre SQLite en memoria con solo las tablas indicadas (el esquema
+    "restaurant" se adjunta como otra base). Para lógica que no depende de
+    Postgres.
+    """
+    sessions = []
+
+    def _make(*model_classes):
+        engine = create_engine("sqlite://")
+
+        @event.listens_for(engine, "connect")
+        def _attach(dbapi_conn, _record):
+            dbapi_conn.execute("ATTACH DATABASE ':memory:' AS restaurant")
+
+        models.Base.metadata.create_all(engine, tables=[m.__table__ for m in model_classes])
+        session = Session(engine)
+        sessions.append(session)
+        return session
+
+    yield _make
+    for session in sessions:
+        session.close()
@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, update
+
+from app import crud, models, schemas
+from app.concurrency import VersionConflict, flush_versioned, if_match_version
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("*", None),
+    ("3", 3),
+    ('"3"', 3),
+    ('W/"3"', 3),
+])
+def test_if_match_version(header, expected):
+    assert if_match_version(header) == expected
+
+
+def test_if_match_version_rejects_garbage():
+    with pytest.raises(HTTPException) as exc:
+        if_match_version('"abc"')
+    assert exc.value.status_code == 400
+
+
+@pytest.fixture
+def db(make_session):
+    return make_session(models.Order, models.OrderItem)
+
+
+def add_order(db):
+    order_id = uuid.uuid4()
+    db.execute(insert(models.Order), [{"id": order_id, "order_code": order_id.hex[:8], "status": "pending"}])
+    db.commit()
+    return order_id
+
+
+def test_update_order_bumps_version(db):
+    order_id = add_order(db)
+    order = crud.update_order(db, order_id, schemas.OrderCreate(status="fired"), expected_version=1)
+    assert (order.status, order.version) == ("fired", 2)
+
+
+def test_update_order_with_stale_if_match(db):
+    order_id = add_order(db)
+    crud.update_order(db, order_id, schemas.OrderCreate(status="fired"))
+    with pytest.raises(VersionConflict):
+        crud.update_order(db, order_id, schemas.OrderCreate(status="ready"), expected_version=1)
+    db.expire_all()
+    assert crud.get_order(db, order_id).status == "fired"
+
+
+def test_concurrent_write_between_read_and_update(db):
+    order_id = add_order(db)
+    order = crud.get_order(db, order_id)
+    # Otro request confirma un cambio después de la lectura
+    with db.bind.begin() as conn:
+        conn.execute(update(models.Order).where(models.Order.id == order_id).values(status="served", version=2))
+    order.status = "ready"
+    with pytest.raises(VersionConflict):
+        flush_versioned(db)
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+from app.events import broadcaster
+from app.notify_bus import RESYNC_EVENT, bus
+
+
+def drain(sub):
+    messages = []
+    while not sub.queue.empty():
+        messages.append(json.loads(sub.queue.get_nowait()))
+    return messages
+
+
+def test_remote_events_respect_entity_filter_but_resync_reaches_everyone():
+    async def scenario():
+        broadcaster.bind(asyncio.get_running_loop())
+        kitchen = broadcaster.subscribe(["kitchen_ticket"])
+        everything = broadcaster.subscribe()
+        try:
+            bus._dispatch({"entity": "order", "action": "updated", "id": "1"})
+            bus._dispatch(RESYNC_EVENT)
+            return drain(kitchen), drain(everything)
+        finally:
+            broadcaster.unsubscribe(kitchen)
+            broadcaster.unsubscribe(everything)
+
+    kitchen, everything = asyncio.run(scenario())
+    assert kitchen == [RESYNC_EVENT]
+    assert [e["entity"] for e in everything] == ["order", "*"]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from app.idempotency import REPLAYED_HEADER, IdempotentRequest, idempotency_key
+
+
+class Out(BaseModel):
+    id: int
+
+
+class RecordingSession:
+    """
+    Registra las sentencias y responde al reclamo de la clave con `claimed`.
+    """
+
+    def __init__(self, claimed=True, stored=None):
+        self.claimed = claimed
+        self.stored = stored
+        self.statements = []
+        self.commits = self.rollbacks = 0
+
+    def execute(self, stmt):
+        kind = stmt.__visit_name__
+        self.statements.append(kind)
+        if kind == "insert":
+            return SimpleNamespace(first=lambda: ("k",) if self.claimed else None)
+        return SimpleNamespace(first=lambda: self.stored)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_without_key_only_runs_the_write():
+    db = RecordingSession()
+    assert IdempotentRequest("/orders/", None, "fp").run(db, lambda: Out(id=1), Out) == Out(id=1)
+    assert db.statements == []
+
+
+def test_first_request_claims_then_stores_response():
+    db = RecordingSession()
+    result = IdempotentRequest("/orders/", "k", "fp").run(db, lambda: Out(id=1), Out, status_code=201)
+    assert result == Out(id=1)
+    # Reclamo confirmado antes de escribir, respuesta guardada después
+    assert db.statements[-2:] == ["insert", "update"] and db.commits == 2
+
+
+def test_failed_write_releases_the_key():
+    db = RecordingSession()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        IdempotentRequest("/orders/", "k", "fp").run(db, fail, Out)
+    assert db.statements[-1] == "delete" and db.rollbacks == 1
+
+
+def test_retry_replays_stored_response():
+    stored = SimpleNamespace(fingerprint="fp", status_code=201, response={"id": 1})
+    db = RecordingSession(claimed=False, stored=stored)
+    response = IdempotentRequest("/orders/", "k", "fp").run(db, lambda: pytest.fail("escribió dos veces"), Out)
+    assert response.status_code == 201
+    assert json.loads(response.body) == {"id": 1}
+    assert response.headers[REPLAYED_HEADER] == "true"
+
+
+@pytest.mark.parametrize("stored, status", [
+    (SimpleNamespace(fingerprint="otro", status_code=201, response={}), 422),  # otra petición
+    (SimpleNamespace(fingerprint="fp", status_code=None, response=None), 409),  # aún en curso
+])
+def test_conflicting_retries(stored, status):
+    db = RecordingSession(claimed=False, stored=stored)
+    with pytest.raises(HTTPException) as exc:
+        IdempotentRequest("/orders/", "k", "fp").run(db, lambda: pytest.fail("escribió dos veces"), Out)
+    assert exc.value.status_code == status
+
+
+def request(body: bytes, path="/orders/"):
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": path, "headers": [], "query_string": b""}, receive)
+
+
+def test_fingerprint_depends_on_path_and_body():
+    def fingerprint(body, path="/orders/"):
+        return asyncio.run(idempotency_key(request(body, path), "k")).fingerprint
+
+    assert fingerprint(b'{"a":1}') == fingerprint(b'{"a":1}')
+    assert fingerprint(b'{"a":1}') != fingerprint(b'{"a":2}')
+    assert fingerprint(b'{"a":1}') != fingerprint(b'{"a":1}', "/invoices/")
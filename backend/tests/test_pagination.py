@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud, crud_async, models
+from app.pagination import PageParams, _decode_value, decode_cursor, encode_cursor, paginate
+
+
+SORTS = [
+    (module.__name__, name, key, column)
+    for module in (crud, crud_async)
+    for name in dir(module)
+    if name.endswith("_SORTS")
+    for key, column in getattr(module, name).items()
+]
+
+
+@pytest.mark.parametrize("module, name, key, column", SORTS, ids=lambda v: v if isinstance(v, str) else "")
+def test_sort_columns_are_not_null(module, name, key, column):
+    # keyset compara (columna, id) por tuplas: un NULL deja filas fuera de todas las páginas
+    assert not column.expression.nullable, f"{module}.{name}[{key!r}] es nullable"
+
+
+# ----------------------------
+# Cursor keyset
+# ----------------------------
+def page_params(limit, sort=None, cursor=None):
+    return PageParams(limit=limit, cursor=cursor, sort=sort)
+
+
+@pytest.fixture
+def roles(make_session):
+    db = make_session(models.Role)
+    base = datetime(2026, 1, 1, 12, 0)
+    # Fechas repetidas: el id desempata dentro de cada valor
+    db.add_all([
+        models.Role(id=uuid.uuid4(), name=f"rol-{i:02d}", created_at=base + timedelta(minutes=i // 3))
+        for i in range(10)
+    ])
+    db.commit()
+    return db
+
+
+def walk(db, sort, limit):
+    rows, cursor = [], None
+    while True:
+        page, cursor = paginate(db.query(models.Role), models.Role.id, crud.ROLE_SORTS, page_params(limit, sort, cursor), "name")
+        assert len(page) <= limit
+        rows.extend(page)
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("sort", ["name", "-name", "created_at", "-created_at"])
+@pytest.mark.parametrize("limit", [1, 3, 10, 50])
+def test_cursor_walk_returns_every_row_once_in_order(roles, sort, limit):
+    key = sort.lstrip("-")
+    expected = sorted(
+        roles.query(models.Role).all(),
+        key=lambda r: (getattr(r, key), str(r.id)),
+        reverse=sort.startswith("-"),
+    )
+    assert [r.id for r in walk(roles, sort, limit)] == [r.id for r in expected]
+
+
+def test_cursor_round_trip():
+    row_id = uuid.uuid4()
+    at = datetime(2026, 10, 18, 20, 30, 15)
+    cursor = encode_cursor("-created_at", at, row_id)
+    sort_key, raw_value, raw_id = decode_cursor(cursor)
+    assert (sort_key, raw_id) == ("-created_at", str(row_id))
+    assert _decode_value(models.Order.created_at, raw_value) == at
+
+
+def test_cursor_errors(roles):
+    cursor = encode_cursor("name", "rol-01", uuid.uuid4())
+    with pytest.raises(HTTPException) as exc:
+        paginate(roles.query(models.Role), models.Role.id, crud.ROLE_SORTS, page_params(3, "-name", cursor), "name")
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(HTTPException):
+        paginate(roles.query(models.Role), models.Role.id, crud.ROLE_SORTS, page_params(3, "password"), "name")
@@ -0,0 +1,47 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.auth.jwt_handler import create_access_token
+from app.auth.permissions import Permission, role_versions, token_permissions, user_versions
+from app.core.config import settings
+
+
+def claims(role=None, user=None):
+    token = create_access_token({"sub": "ana"}, role=role, user=user)
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def make_role(is_active=True, version=1):
+    return SimpleNamespace(id=uuid.uuid4(), permissions=int(Permission.ORDERS), perm_version=version, is_active=is_active)
+
+
+def test_inactive_role_issues_no_permissions():
+    assert claims(role=make_role())["perm"] == Permission.ORDERS
+    assert claims(role=make_role(is_active=False))["perm"] == 0
+
+
+def test_user_version_bump_rejects_older_tokens():
+    user = SimpleNamespace(id=uuid.uuid4(), token_version=1)
+    payload = claims(role=make_role(), user=user)
+    assert token_permissions(payload) == Permission.ORDERS
+
+    # Cambio de rol o baja del usuario (crud.update_user / delete_user)
+    user_versions.observe(user.id, 2)
+    with pytest.raises(HTTPException) as exc:
+        token_permissions(payload)
+    assert exc.value.status_code == 401
+
+    user.token_version = 2
+    assert token_permissions(claims(role=make_role(), user=user)) == Permission.ORDERS
+
+
+def test_role_version_bump_rejects_older_tokens():
+    role = make_role()
+    payload = claims(role=role)
+    role_versions.observe(role.id, 2)
+    with pytest.raises(HTTPException):
+        token_permissions(payload)
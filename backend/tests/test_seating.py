@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.seating import Party, TableSlot, plan_assignment
+
+BASE = datetime(2026, 10, 18, 18, 0)
+
+
+def at(hours: float) -> datetime:
+    return BASE + timedelta(hours=hours)
+
+
+def test_overlapping_blocks_keep_table_busy():
+    # Reserva "seated" 19:00-23:00 y mesa ocupada ahora 20:00-22:00 en la misma mesa
+    t1 = TableSlot("T1", "T1", 4, None)
+    blocked = [("T1", at(1), at(5)), ("T1", at(2), at(4))]
+    assigned, unassigned = plan_assignment([t1], [Party("p", at(1.5), at(2.5), 2)], blocked)
+    assert assigned == {}
+    assert [p.key for p in unassigned] == ["p"]
+
+
+def test_inner_block_does_not_hide_outer_block():
+    # El bloque que empieza último termina antes: la mesa sigue ocupada hasta las 23:00
+    t1 = TableSlot("T1", "T1", 4, None)
+    blocked = [("T1", at(1), at(5)), ("T1", at(2), at(4))]
+    assigned, _ = plan_assignment([t1], [Party("p", at(4.5), at(4.8), 2)], blocked)
+    assert assigned == {}
+
+
+def test_free_after_merged_blocks():
+    t1 = TableSlot("T1", "T1", 4, None)
+    blocked = [("T1", at(2), at(4)), ("T1", at(1), at(3))]
+    assigned, _ = plan_assignment([t1], [Party("p", at(4), at(5), 2)], blocked)
+    assert assigned["p"] == t1
+
+
+def test_best_fit_and_no_double_booking():
+    small = TableSlot("S", "S1", 2, None)
+    large = TableSlot("L", "L1", 6, None)
+    parties = [Party("a", at(1), at(3), 2), Party("b", at(2), at(4), 2), Party("c", at(3), at(5), 2)]
+    assigned, unassigned = plan_assignment([large, small], parties)
+    assert assigned["a"] == small
+    assert assigned["b"] == large
+    assert assigned["c"] == small
+    assert unassigned == []
+
+
+def test_location_preference():
+    inside = TableSlot("I", "I1", 4, "salon")
+    terrace = TableSlot("T", "T1", 4, "terraza")
+    assigned, _ = plan_assignment([inside, terrace], [Party("p", at(1), at(2), 3, "terraza")])
+    assert assigned["p"] == terrace
+
+
+def test_plans_a_busy_night_under_one_second():
+    rng = random.Random(7)
+    tables = [TableSlot(i, f"M{i:03d}", rng.choice((2, 4, 6, 8)), rng.choice(("salon", "terraza"))) for i in range(200)]
+    parties = []
+    for key in range(600):
+        start = at(rng.uniform(0, 5))
+        parties.append(Party(key, start, start + timedelta(minutes=rng.choice((60, 90, 120))), rng.randint(1, 8)))
+    blocked = [(rng.randrange(200), at(h), at(h + 2)) for h in (rng.uniform(0, 5) for _ in range(100))]
+
+    began = time.perf_counter()
+    assigned, unassigned = plan_assignment(tables, parties, blocked)
+    assert time.perf_counter() - began < 1.0
+
+    assert len(assigned) + len(unassigned) == len(parties)
+    by_table = {}
+    for party in parties:
+        table = assigned.get(party.key)
+        if table is not None:
+            assert table.seats >= party.people
+            by_table.setdefault(table.id, []).append((party.start, party.end))
+    for intervals in by_table.values():
+        intervals.sort()
+        for (_, prev_end), (start, _) in zip(intervals, intervals[1:]):
+            assert prev_end <= start
@@ -0,0 +1,114 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from app import models, stock
+
+
+@pytest.fixture
+def db(make_session, monkeypatch):
+    # La selección de líneas (stock_deducted) no depende de Postgres; el
+    # UPDATE de inventario se reemplaza por un registro
+    session = make_session(models.Order, models.OrderItem)
+    calls = session.info["usage_calls"] = []
+    monkeypatch.setattr(stock, "_apply_usage", lambda _db, consumed, restored: calls.append((set(consumed), set(restored))))
+    return session
+
+
+def usage(db):
+    calls = db.info["usage_calls"]
+    consumed = set().union(*(c for c, _ in calls)) if calls else set()
+    restored = set().union(*(r for _, r in calls)) if calls else set()
+    calls.clear()
+    return consumed, restored
+
+
+def add_order(db, status="pending"):
+    order_id = uuid.uuid4()
+    db.execute(insert(models.Order), [{"id": order_id, "order_code": order_id.hex[:8], "status": status}])
+    return order_id
+
+
+def add_item(db, order_id, status, deducted=False):
+    item_id = uuid.uuid4()
+    db.execute(insert(models.OrderItem), [{
+        "id": item_id, "order_id": order_id, "menu_item_id": uuid.uuid4(), "quantity": 1,
+        "unit_price": Decimal("1.00"), "status": status, "stock_deducted": deducted,
+    }])
+    return item_id
+
+
+def deducted(db, item_id):
+    return db.scalar(select(models.OrderItem.stock_deducted).where(models.OrderItem.id == item_id))
+
+
+def set_status(db, model, row_id, status):
+    db.execute(update(model).where(model.id == row_id).values(status=status))
+
+
+def test_sync_deducts_fired_lines_once(db):
+    order_id = add_order(db)
+    pending, fired = add_item(db, order_id, "pending"), add_item(db, order_id, "fired")
+
+    stock.sync_order_items_stock(db, [pending, fired])
+    assert usage(db) == ({fired}, set())
+    assert deducted(db, fired) and not deducted(db, pending)
+
+    # Reintento (ej. cambio de notas de la línea): no vuelve a descontar
+    stock.sync_order_items_stock(db, [pending, fired])
+    assert usage(db) == (set(), set())
+
+
+def test_sync_restores_lines_moved_to_void(db):
+    order_id = add_order(db)
+    item = add_item(db, order_id, "served", deducted=True)
+    set_status(db, models.OrderItem, item, "void")
+
+    stock.sync_order_items_stock(db, [item])
+    assert usage(db) == (set(), {item})
+    assert not deducted(db, item)
+
+
+def test_release_restores_deducted_lines_in_any_status(db):
+    order_id = add_order(db)
+    served = add_item(db, order_id, "served", deducted=True)
+    pending = add_item(db, order_id, "pending")
+
+    stock.release_order_items_stock(db, order_id=order_id)
+    assert usage(db) == (set(), {served})
+    assert not deducted(db, served) and not deducted(db, pending)
+
+
+def test_voided_order_lines_are_not_deducted_again(db):
+    order_id = add_order(db)
+    fired = add_item(db, order_id, "fired", deducted=True)
+
+    # crud.update_order: anular la orden devuelve el stock pero deja las líneas en "fired"
+    set_status(db, models.Order, order_id, "cancelled")
+    stock.release_order_items_stock(db, order_id=order_id)
+    assert usage(db) == (set(), {fired})
+
+    stock.sync_order_items_stock(db, [fired])
+    stock.sync_order_items_stock(db, order_id=order_id)
+    assert usage(db) == (set(), set())
+    assert not deducted(db, fired)
+
+    # Orden reactivada: vuelve a descontar
+    set_status(db, models.Order, order_id, "pending")
+    stock.sync_order_items_stock(db, order_id=order_id)
+    assert usage(db) == ({fired}, set())
+
+
+@pytest.mark.parametrize("quantity, minimum_stock, used, expected", [
+    (Decimal("4"), Decimal("5"), Decimal("2"), True),    # 6 -> 4 con mínimo 5
+    (Decimal("5"), Decimal("5"), Decimal("1"), True),    # llega justo al mínimo
+    (Decimal("6"), Decimal("5"), Decimal("1"), False),   # sigue sobre el mínimo
+    (Decimal("3"), Decimal("5"), Decimal("1"), False),   # ya estaba bajo el mínimo
+    (Decimal("4"), None, Decimal("2"), False),           # sin mínimo
+    (Decimal("6"), Decimal("5"), Decimal("-2"), False),  # devolución
+    (Decimal("4"), Decimal("5"), None, False),
+])
+def test_low_stock_crossing(quantity, minimum_stock, used, expected):
+    assert stock._crossed_minimum(quantity, minimum_stock, used) is expected
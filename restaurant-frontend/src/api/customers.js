@@ -1,11 +1,17 @@
 // customers.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app"; // Cambia si tu backend está en otra URL
 
 // Obtener todos los clientes
 export const getCustomers = async () => {
-  const response = await axios.get(`${API_URL}/customers/`);
+  return getAllPages(`${API_URL}/customers/`);
+};
+
+// Buscar clientes por nombre, teléfono o email (autocompletado, máx. `limit`)
+export const searchCustomers = async (q, limit = 10) => {
+  const response = await axios.get(`${API_URL}/customers/search`, { params: { q, limit } });
   return response.data;
 };
 
@@ -1,11 +1,11 @@
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app";
 
 // Obtener todos los inventarios
 export const getInventory = async () => {
-  const response = await axios.get(`${API_URL}/inventory`);
-  return response.data;
+  return getAllPages(`${API_URL}/inventory`);
 };
 
 // Crear inventario
@@ -1,12 +1,12 @@
 // menuCategories.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app"; // Cambia si tu backend está en otra URL
 
 // Obtener todas las categorías de menú
 export const getMenuCategories = async () => {
-  const response = await axios.get(`${API_URL}/menu_categories/`);
-  return response.data;
+  return getAllPages(`${API_URL}/menu_categories/`);
 };
 
 // Crear categoría de menú
@@ -1,12 +1,21 @@
 // menuItems.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app";
 
 // Obtener todos los menu items
 export const getMenuItems = async () => {
-  const response = await axios.get(`${API_URL}/menu_items`);
-  return response.data;
+  return getAllPages(`${API_URL}/menu_items`);
+};
+
+// Buscar productos por nombre, código, categoría o descripción (más relevantes primero).
+// Devuelve { items, nextCursor }; nextCursor se pasa como `cursor` para la página siguiente.
+export const searchMenuItems = async (q, { categoryId, isAvailable, limit = 20, cursor } = {}) => {
+  const response = await axios.get(`${API_URL}/menu_items/search`, {
+    params: { q, category_id: categoryId, is_available: isAvailable, limit, cursor },
+  });
+  return { items: response.data, nextCursor: response.headers["x-next-cursor"] || null };
 };
 
 // Crear menu item
@@ -29,6 +38,6 @@ export const deleteMenuItem = async (id) => {
 
 // Obtener categorías activas para combo box
 export const getCategories = async () => {
-  const response = await axios.get(`${API_URL}/menu_categories`);
-  return response.data.filter(c => c.is_active);
+  const rows = await getAllPages(`${API_URL}/menu_categories`);
+  return rows.filter(c => c.is_active);
 };
@@ -1,12 +1,12 @@
 // orders.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app"; // Cambiar según tu backend
 
 // Orders
 export const getOrders = async () => {
-  const res = await axios.get(`${API_URL}/orders`);
-  return res.data;
+  return getAllPages(`${API_URL}/orders`);
 };
 
 export const createOrder = async (orderData) => {
@@ -26,8 +26,7 @@ export const deleteOrder = async (id) => {
 
 // Order Items
 export const getOrderItems = async (orderId) => {
-  const res = await axios.get(`${API_URL}/order_items?order_id=${orderId}`);
-  return res.data;
+  return getAllPages(`${API_URL}/order_items`, { order_id: orderId });
 };
 
 export const createOrderItem = async (itemData) => {
@@ -0,0 +1,19 @@
+// pagination.js
+import axios from "axios";
+
+// Máximo de filas por página que acepta el backend (PAGE_SIZE_MAX)
+const PAGE_SIZE = 500;
+
+// Los listados del backend están paginados: devuelven hasta `limit` filas y,
+// si hay más, el cursor de la página siguiente en el header X-Next-Cursor.
+// Trae todas las páginas siguiendo el cursor.
+export const getAllPages = async (url, params = {}) => {
+  const rows = [];
+  let cursor;
+  do {
+    const response = await axios.get(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+    rows.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return rows;
+};
@@ -1,11 +1,11 @@
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app";
 
 // Obtener todos los recipe items
 export const getRecipeItems = async () => {
-  const response = await axios.get(`${API_URL}/recipe_items`);
-  return response.data;
+  return getAllPages(`${API_URL}/recipe_items`);
 };
 
 // Crear recipe item
@@ -28,11 +28,11 @@ export const deleteRecipeItem = async (id) => {
 
 // Obtener menú y inventory para selects
 export const getMenuItems = async () => {
-  const response = await axios.get(`${API_URL}/menu_items`);
-  return response.data.filter(item => item.is_active);
+  const rows = await getAllPages(`${API_URL}/menu_items`);
+  return rows.filter(item => item.is_active);
 };
 
 export const getInventory = async () => {
-  const response = await axios.get(`${API_URL}/inventory`);
-  return response.data.filter(item => item.is_active);
+  const rows = await getAllPages(`${API_URL}/inventory`);
+  return rows.filter(item => item.is_active);
 };
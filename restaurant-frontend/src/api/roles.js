@@ -1,12 +1,12 @@
 // roles.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app"; // Cambia si tu backend está en otra URL
 
 // Obtener todos los roles
 export const getRoles = async () => {
-  const response = await axios.get(`${API_URL}/roles/`);
-  return response.data;
+  return getAllPages(`${API_URL}/roles/`);
 };
 
 // Crear rol
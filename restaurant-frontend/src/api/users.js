@@ -1,12 +1,12 @@
 // users.js
 import axios from "axios";
+import { getAllPages } from "./pagination";
 
 const API_URL = "https://proyectoaseguramiento-production.up.railway.app"; // Cambia si tu backend está en otra URL
 
 // Obtener todos los usuarios
 export const getUsers = async () => {
-  const response = await axios.get(`${API_URL}/users/`);
-  return response.data;
+  return getAllPages(`${API_URL}/users/`);
 };
 
 // Crear usuario
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { getAllPages } from "../api/pagination";
 import { colors } from "../theme";
 
 const apiUrl = "https://api-restaurante-h08h.onrender.com";
@@ -13,8 +14,8 @@ export default function MenuCategoriesPage() {
 
   // Cargar categorías
   useEffect(() => {
-    axios.get(`${apiUrl}/menu_categories`).then((res) => {
-      setCategories(res.data.filter(c => c.is_active));
+    getAllPages(`${apiUrl}/menu_categories`).then((rows) => {
+      setCategories(rows.filter(c => c.is_active));
     });
   }, []);
 
@@ -37,8 +38,8 @@ export default function MenuCategoriesPage() {
       await axios.post(`${apiUrl}/menu_categories`, payload);
     }
 
-    const res = await axios.get(`${apiUrl}/menu_categories`);
-    setCategories(res.data.filter(c => c.is_active));
+    const rows = await getAllPages(`${apiUrl}/menu_categories`);
+    setCategories(rows.filter(c => c.is_active));
     clearForm();
   };
 
@@ -11,6 +11,7 @@ import {
   deleteOrderItem,
 } from "../api/orders";
 import axios from "axios";
+import { getAllPages } from "../api/pagination";
 import { colors } from "../theme";
 
 const apiUrl = "https://api-restaurante-h08h.onrender.com";
@@ -25,8 +26,8 @@ export default function OrdersPOSPage() {
 
   useEffect(() => {
     axios.get(`${apiUrl}/tables`).then(res => setTables(res.data.filter(t => t.is_active)));
-    axios.get(`${apiUrl}/customers`).then(res => setCustomers(res.data.filter(c => c.is_active)));
-    axios.get(`${apiUrl}/menu_items`).then(res => setMenuItems(res.data.filter(m => m.is_active)));
+    getAllPages(`${apiUrl}/customers`).then(rows => setCustomers(rows.filter(c => c.is_active)));
+    getAllPages(`${apiUrl}/menu_items`).then(rows => setMenuItems(rows.filter(m => m.is_active)));
   }, []);
 
   // Orders
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { getUsers, createUser, updateUser, deleteUser } from "../api/users";
-import axios from "axios";
+import { getAllPages } from "../api/pagination";
 import { colors } from "../theme";
 
 const apiUrl = "https://api-restaurante-h08h.onrender.com";
@@ -22,8 +22,8 @@ export default function UsersPage() {
   // Roles
   const [roles, setRoles] = useState([]);
   useEffect(() => {
-    axios.get(`${apiUrl}/roles`)
-      .then(res => setRoles(res.data.filter(r => r.is_active)))
+    getAllPages(`${apiUrl}/roles`)
+      .then(rows => setRoles(rows.filter(r => r.is_active)))
       .catch(err => console.error("Error cargando roles:", err));
   }, []);
 